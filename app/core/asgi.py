@@ -2,6 +2,7 @@
 ASGI config for hello_django project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Websocket connections to settings.LIVE_PATH receive live events, see `utils.live`.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
@@ -9,8 +10,23 @@ https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# apps have to be loaded first
+from courses.live import CoursesLiveConsumer  # noqa: E402
+
+live_application = CoursesLiveConsumer()
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        if scope['path'] == settings.LIVE_PATH:
+            return await live_application(scope, receive, send)
+        await receive()
+        return await send({'type': 'websocket.close'})
+    return await django_application(scope, receive, send)
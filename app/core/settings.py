@@ -1,6 +1,7 @@
+import datetime
 import os
-import pickle
 import sys
+import tempfile
 
 from django.utils.translation import gettext_lazy as _
 
@@ -42,6 +43,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'users.middleware.PresenceMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'django.middleware.locale.LocaleMiddleware',
@@ -83,28 +85,120 @@ REST_FRAMEWORK = {
 
 ROOT_URLCONF = 'core.urls'
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [
             os.path.join(BASE_DIR, 'templates'),
         ],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'utils.context_processors.live',
             ],
+            'loaders': TEMPLATE_LOADERS if DEBUG else [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)],
         },
     },
 ]
 
 WSGI_APPLICATION = 'core.wsgi.application'
 
+TESTING = 'test' in sys.argv or 'pytest' in sys.modules
+
+# the cache has to be shared by all processes, as versioned keys (see `utils.cache.bump_version`) and changes
+# markers (see `utils.cache.touch`) are bumped only by the process changing the data. Redis is required
+# as the Celery broker anyway, a per-process LocMemCache is used by default only by tests
+USE_REDIS_CACHE = int(os.environ.get("USE_REDIS_CACHE", default=not TESTING))
+
+if USE_REDIS_CACHE:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': os.environ.get("REDIS_CACHE_URL", "redis://redis:6379/1"),
+            'KEY_PREFIX': 'raven',
+            'OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+                # the cache is an optimization only, pages are rendered from the database when redis is down
+                'IGNORE_EXCEPTIONS': True,
+            },
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# sessions are read from the cache and written through to the database, a per-process cache
+# would keep sessions deleted by other processes (ex. at logout) valid
+if USE_REDIS_CACHE:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# users are online for PRESENCE_TTL seconds after their last request
+if USE_REDIS_CACHE:
+    PRESENCE_BACKEND = 'users.presence.RedisPresence'
+else:
+    PRESENCE_BACKEND = 'users.presence.CachePresence'
+PRESENCE_TTL = 60 * 5
+# max number of users whose presence is returned by a single request
+PRESENCE_MAX_USERS = 200
+
+# events (new notices, marks and assignments) are pushed to browsers over websockets at LIVE_PATH,
+# which requires serving the ASGI application (core.asgi)
+LIVE_ENABLED = int(os.environ.get("LIVE_ENABLED", default=0))
+LIVE_PATH = '/ws/live/'
+if USE_REDIS_CACHE:
+    LIVE_BROKER = 'utils.live.RedisBroker'
+else:
+    LIVE_BROKER = 'utils.live.LocalBroker'
+LIVE_REDIS_URL = os.environ.get("LIVE_REDIS_URL", "redis://redis:6379/2")
+# number of events waiting to be sent to a single connection, further events are dropped
+LIVE_QUEUE_SIZE = 100
+
+# number of seconds for which data of read-mostly objects (ex. course's detail page) is cached
+COURSE_CACHE_TIMEOUT = 60 * 15
+
 CELERY_BROKER_URL = "redis://redis:6379"
 CELERY_RESULT_BACKEND = "redis://redis:6379"
+CELERY_TASK_ALWAYS_EAGER = int(os.environ.get("CELERY_TASK_ALWAYS_EAGER", default=0))
+CELERY_BEAT_SCHEDULE = {
+    'send-reminders': {
+        'task': 'courses.tasks.send_reminders',
+        'schedule': 60 * 5,
+    },
+    # retries failed rows of the calendar outbox and rows left by workers which died while sending them
+    'sync-calendar-events': {
+        'task': 'courses.tasks.sync_calendar_events',
+        'schedule': 60 * 5,
+    },
+    'collect-file-blobs': {
+        'task': 'courses.tasks.collect_file_blobs',
+        'schedule': 60 * 60 * 6,
+    },
+    'collect-sync-tombstones': {
+        'task': 'courses.tasks.collect_sync_tombstones',
+        'schedule': 60 * 60 * 24,
+    },
+}
+
+# reminders are sent this long before lectures, laboratories and deadlines of assignments
+EVENT_REMINDER_LEAD_TIME = datetime.timedelta(days=1)
+ASSIGNMENT_REMINDER_LEAD_TIME = datetime.timedelta(days=1)
+# max number of objects reminded about by a single task, the task schedules itself again for the rest
+REMINDERS_BATCH_SIZE = 1000
+# number of days for which sent reminders are kept in the ledger
+REMINDERS_LEDGER_RETENTION_DAYS = 30
+# number of days for which rows deleted from lists of the read API are reported by `since`, see courses.SyncTombstone
+SYNC_TOMBSTONES_RETENTION_DAYS = 30
 
 # Database
 # https://docs.djangoproject.com/en/3.0/ref/settings/#databases
@@ -157,6 +251,12 @@ LANGUAGES = [
 ]
 
 UPLOAD_FILES_DIR = 'uploads/'
+# directory of contents of course files stored by their hash, see `courses.models.FileBlob`
+BLOBS_DIR = 'blobs/'
+# unreferenced blobs and files are kept for this long, ex. files of uploads which aren't attached yet
+FILE_BLOBS_GRACE_PERIOD = datetime.timedelta(days=1)
+# max number of files stored before content addressing which are moved to blobs by a single run of the task
+FILE_BLOBS_LEGACY_BATCH_SIZE = 100
 
 if USE_S3:
     STATICFILES_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
@@ -174,12 +274,24 @@ if USE_S3:
     AWS_PUBLIC_MEDIA_LOCATION = 'media'
     MEDIA_URL = f'https://{AWS_S3_CUSTOM_DOMAIN}/{AWS_PUBLIC_MEDIA_LOCATION}/'
     DEFAULT_FILE_STORAGE = 'core.storage_backends.PublicMediaStorage'
+    EXPORTS_STORAGE = 'core.storage_backends.PrivateMediaStorage'
+    DIRECT_UPLOAD_BACKEND = 'courses.uploads.S3DirectUpload'
 else:
     STATIC_ROOT = os.path.join(BASE_DIR, '/files/staticfiles')
     STATIC_URL = "/files/staticfiles/"
 
     MEDIA_URL = "/files/mediafiles/"
     MEDIA_ROOT = os.path.join(BASE_DIR, "files/mediafiles")
+    EXPORTS_STORAGE = 'django.core.files.storage.FileSystemStorage'
+    DIRECT_UPLOAD_BACKEND = 'courses.uploads.LocalDirectUpload'
+
+# max size of directly uploaded files in bytes and number of seconds for which upload forms are valid
+DIRECT_UPLOAD_MAX_SIZE = 2 * 1024 ** 3
+DIRECT_UPLOAD_EXPIRES = 60 * 60
+
+# prefix of the nginx internal location serving MEDIA_ROOT, files of the filesystem are sent by nginx
+# with X-Accel-Redirect if set, streamed by the application otherwise
+FILES_ACCEL_REDIRECT_PREFIX = os.environ.get("FILES_ACCEL_REDIRECT_PREFIX", "")
 
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, "files/staticfiles")
@@ -196,9 +308,19 @@ EMAIL_USE_TLS = True
 EMAIL_PORT = 587
 EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD")
+# max number of recipients handled by a single email task
+EMAIL_BATCH_SIZE = 50
+# number of seconds for which rendered emails are shared between the batches of recipients
+EMAIL_RENDER_CACHE_TIMEOUT = 60 * 10
+# number of seconds for which recipients already mailed by an email task are remembered, so retries of the task
+# don't mail them again; it has to outlast all retries, see utils.emails.EMAIL_TASK_OPTIONS
+EMAIL_SENT_CACHE_TIMEOUT = 60 * 60 * 2
 
 LOGIN_URL = 'users:login'
 
+# number of seconds after which precomputed dashboard is rebuilt even if nothing has changed
+DASHBOARD_SNAPSHOT_TTL = 60 * 15
+
 PASSWORD_HASHERS = (
     'django.contrib.auth.hashers.MD5PasswordHasher',
 )
@@ -210,13 +332,34 @@ GOOGLE_API_ID = os.environ.get('GOOGLE_API_ID')
 GOOGLE_API_SECRET = os.environ.get('GOOGLE_API_SECRET')
 GOOGLE_API_PROJECT_ID = os.environ.get('GOOGLE_API_PROJECT_ID')
 
-GOOGLE_API_CREDENTIALS = None
-
-if USE_GOOGLE_API:
-    try:
-        GOOGLE_API_CREDENTIALS = pickle.load(open('./core/token/token.pkl', 'rb'))
-    except (FileExistsError, FileNotFoundError):
-        raise FileNotFoundError("Can't open 'token/token.pkl'. Before using google API please generate your api token!")
+# pickled credentials, see core/generate_api_token.py; they are loaded on the first use of the calendar
+GOOGLE_API_CREDENTIALS_PATH = os.environ.get('GOOGLE_API_CREDENTIALS_PATH', './core/token/token.pkl')
+# id of the calendar events are created in, the first calendar of the account is used if not set
+GOOGLE_CALENDAR_ID = os.environ.get('GOOGLE_CALENDAR_ID')
+# discovery documents of google APIs are cached on disk, so building a client doesn't need to fetch them
+GOOGLE_API_DISCOVERY_CACHE_DIR = os.environ.get(
+    'GOOGLE_API_DISCOVERY_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'raven-google-discovery')
+)
+GOOGLE_API_DISCOVERY_CACHE_TTL = 60 * 60 * 24
+
+# backend applying changes of lectures and laboratories to the calendar, see utils.meetings.backends
+CALENDAR_SYNC_BACKEND = 'utils.meetings.backends.GoogleCalendarBackend' if USE_GOOGLE_API else None
+# max number of outbox rows processed by a single calendar sync task (and events sent in one batch request)
+CALENDAR_SYNC_BATCH_SIZE = 50
+# number of failed attempts after which an outbox row is given up
+CALENDAR_SYNC_MAX_ATTEMPTS = 5
+# time for which a worker claims outbox rows of events it sends to the backend, rows of workers which died
+# meanwhile are processed again after it
+CALENDAR_SYNC_CLAIM_TIMEOUT = datetime.timedelta(minutes=10)
+
+# number of rows fetched from the database at once while exporting marks
+EXPORT_CHUNK_SIZE = 2000
+# directory of marks exports built in the background within EXPORTS_STORAGE
+EXPORTS_DIR = 'exports/'
+
+# max number of marks imported from a single sheet
+MARKS_IMPORT_MAX_ROWS = 5000
+MARKS_IMPORT_BATCH_SIZE = 500
 
 if 'test' in sys.argv:
     try:
@@ -11,6 +11,7 @@ urlpatterns = [
     path('', include('users.urls', namespace='users')),
     path('', include('courses.urls', namespace='courses')),
     path('support/', include('support.urls', namespace='support')),
+    path('api/v1/', include('users.api.urls', namespace='api-v1')),
 
     path('schema/', get_schema_view(title='API Docs', description='Raven app API'), name='api-schema'),
     path('docs/', include_docs_urls(title='API Docs'), name='docs'),
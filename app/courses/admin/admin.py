@@ -212,3 +212,43 @@ class CourseNoticeAdmin(admin.ModelAdmin):
     autocomplete_fields = ('course', 'sender')
     filter_horizontal = ('not_viewed',)
     list_display = ('course', 'title', 'sender', 'created_at',)
+
+
+@admin.register(models.CalendarSyncOutbox)
+class CalendarSyncOutboxAdmin(admin.ModelAdmin):
+    """
+    CalendarSyncOutboxAdmin is customized admin.ModelAdmin class
+    """
+    list_display = ('event_type', 'event_pk', 'action', 'created_at', 'processed_at', 'attempts',)
+    list_filter = ('event_type', 'action',)
+    readonly_fields = ('event_type', 'event_pk', 'action', 'calendar_event_id', 'created_at', 'processed_at',
+                       'attempts', 'error',)
+
+
+@admin.register(models.ReminderLedger)
+class ReminderLedgerAdmin(admin.ModelAdmin):
+    """
+    ReminderLedgerAdmin is customized admin.ModelAdmin class
+    """
+    list_display = ('kind', 'object_pk', 'scheduled_for', 'created_at',)
+    list_filter = ('kind',)
+    readonly_fields = ('kind', 'object_pk', 'scheduled_for', 'created_at',)
+
+
+@admin.register(models.FileBlob)
+class FileBlobAdmin(admin.ModelAdmin):
+    """
+    FileBlobAdmin is customized admin.ModelAdmin class
+    """
+    list_display = ('sha256', 'size', 'created_at',)
+    search_fields = ('sha256',)
+    readonly_fields = ('sha256', 'path', 'size', 'created_at',)
+
+
+@admin.register(models.MarksExport)
+class MarksExportAdmin(admin.ModelAdmin):
+    """
+    MarksExportAdmin is customized admin.ModelAdmin class
+    """
+    list_display = ('teacher', 'created_at', 'finished_at',)
+    readonly_fields = ('teacher', 'courses', 'path', 'created_at', 'finished_at',)
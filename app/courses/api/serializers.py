@@ -1,16 +1,40 @@
+from typing import Optional, Set
+
+from django.urls import reverse
 from rest_framework import serializers
 
 from courses import models
 from users.api.serializers import StudentSerializer, TeacherSerializer
 
 
-class CourseSerializer(serializers.ModelSerializer):
+def get_requested_fields(request) -> Optional[Set[str]]:
+    fields = request.query_params.get('fields')
+    if not fields:
+        return None
+    return {field.strip() for field in fields.split(',') if field.strip()}
+
+
+class SparseFieldsMixin:
+    """
+    Limits serialized fields to the ones listed in the `fields` query param, ex. `?fields=name,slug`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        fields = get_requested_fields(request) if request is not None else None
+        if fields:
+            for name in set(self.fields) - fields:
+                self.fields.pop(name)
+
+
+class CourseSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     teachers = TeacherSerializer(many=True)
     head_teacher = TeacherSerializer()
 
     class Meta:
         model = models.Course
-        fields = ('name', 'teachers', 'head_teacher', 'has_exam', 'ects', 'slug',
+        fields = ('name', 'description', 'teachers', 'head_teacher', 'has_exam', 'ects', 'slug',
                   'language', 'semester', 'is_actual', 'calculated_semester')
         lookup_field = 'slug'
 
@@ -22,3 +46,23 @@ class CourseAdditionalStudentsSerializer(serializers.ModelSerializer):
         model = models.Course
         fields = ('name', 'slug', 'additional_students',)
         lookup_field = 'slug'
+
+
+class SearchDocumentSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source='object_pk')
+    course = serializers.SlugRelatedField(slug_field='slug', read_only=True)
+    rank = serializers.IntegerField(read_only=True)
+    url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = models.SearchDocument
+        fields = ('kind', 'id', 'title', 'course', 'rank', 'url',)
+
+    def get_url(self, obj: models.SearchDocument) -> Optional[str]:
+        if obj.kind == 'user':
+            return reverse('users:profile-detail', args=(obj.object_pk,))
+        if obj.kind == 'notice':
+            return reverse('courses:notices', args=(obj.course.slug,))
+        if obj.course is not None:
+            return reverse('courses:courses-detail', args=(obj.course.slug,))
+        return None
@@ -1,43 +1,99 @@
+import csv
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from rest_framework import generics, mixins, viewsets
 from rest_framework.decorators import api_view
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from courses import models
+from courses import imports, models, search, tasks, uploads
+from courses.gradebook import GradeBook
+from courses.membership import get_membership
 from users import models as users_models
+from users import presence
 
 from .permissions import IsTeacherOrReadOnly
-from .serializers import CourseAdditionalStudentsSerializer, CourseSerializer
+from .serializers import (CourseAdditionalStudentsSerializer, CourseSerializer,
+                          SearchDocumentSerializer, get_requested_fields)
+
+
+def get_int_param(request, name: str) -> int:
+    """
+    Returns the number given as the query parameter, 0 if it's missing. Raises ValidationError if it isn't a number.
+    """
+    value = request.query_params.get(name)
+    if not value:
+        return 0
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError({name: 'Niepoprawna liczba.'})
+
+
+class CourseCursorPagination(CursorPagination):
+    ordering = ('name', 'pk')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
 
 
 class CourseListView(mixins.ListModelMixin, generics.GenericAPIView):
+    """
+    Lists courses of the user, paginated with a cursor. Accepts `name`, `teacher`, `exam`, `language`,
+    `semester` and `actual` filters and `fields`, a comma separated list of fields to return.
+    """
     queryset = models.Course.objects.all()
     serializer_class = CourseSerializer
     permission_classes = (IsAuthenticated,)
+    pagination_class = CourseCursorPagination
 
     def get(self, request, *args, **kwargs):
         return self.list(request, *args, **kwargs)
 
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        context = self.get_serializer_context()
+        fields = get_requested_fields(request)
+        # presence of teachers of all courses of the page is looked up at once
+        teachers_ids = set()
+        for course in page:
+            if fields is None or 'head_teacher' in fields:
+                teachers_ids.add(course.head_teacher_id)
+            if fields is None or 'teachers' in fields:
+                teachers_ids.update(teacher.pk for teacher in course.teachers.all())
+        context['online_users'] = presence.get_online(teachers_ids)
+        serializer = self.get_serializer_class()(page, many=True, context=context)
+        return self.get_paginated_response(serializer.data)
+
     def get_queryset(self):
         user = self.request.user
-        qs = models.Course.objects.all()
+        qs = models.Course.objects.with_calculated_fields().select_related('head_teacher', 'grade')
+        fields = get_requested_fields(self.request)
+        if fields is None or 'teachers' in fields:
+            qs = qs.prefetch_related('teachers')
         if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(pk=user.pk)
-            qs = qs.filter(teachers__in=[teacher.pk])
+            qs = qs.filter(teachers=user.pk)
         if user.is_student:
-            student = users_models.Student.objects.get(pk=user.pk)
-            qs = qs.filter(grade__students__in=[student.pk])
+            qs = qs.filter(grade__students=user.pk)
 
         name = self.request.query_params.get('name')
         teacher = self.request.query_params.get('teacher')
-        has_exam = int(self.request.query_params.get('exam', 0))
+        has_exam = get_int_param(self.request, 'exam')
         language = self.request.query_params.get('language')
+        semester = get_int_param(self.request, 'semester')
         actual = self.request.query_params.get('actual')
 
         if name:
-            qs = qs.filter(name__icontains=name)
+            qs = qs.filter(pk__in=search.search_ids('course', name))
         if teacher:
-            qs = qs.filter(teachers__last_name__icontains=teacher)
+            qs = qs.filter(pk__in=models.Course.teachers.through.objects.filter(
+                teacher__in=search.search_ids('user', teacher)
+            ).values('course_id'))
         if has_exam and has_exam > 0:
             if has_exam == 1:
                 qs = qs.filter(has_exam=True)
@@ -45,11 +101,33 @@ class CourseListView(mixins.ListModelMixin, generics.GenericAPIView):
                 qs = qs.filter(has_exam=False)
         if language:
             qs = qs.filter(language=language.upper())
+        if semester:
+            qs = qs.filter(annotated_semester=semester)
         if actual and actual == 'true':
-            qs = [q for q in qs if q.is_actual]
+            qs = qs.actual()
         return qs
 
 
+class SearchPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class SearchView(generics.ListAPIView):
+    """
+    Searches courses, notices, assignments and files of the user's courses and users. Accepts `q`, the searched
+    text, and `kind`, a comma separated list of kinds of results. Results are ranked and paginated.
+    """
+    serializer_class = SearchDocumentSerializer
+    permission_classes = (IsAuthenticated,)
+    pagination_class = SearchPagination
+
+    def get_queryset(self):
+        kinds = [kind for kind in self.request.query_params.get('kind', '').split(',') if kind in search.SEARCH_KINDS]
+        return search.search(self.request.user, self.request.query_params.get('q', ''), kinds)
+
+
 class CourseViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
     queryset = models.Course.objects.all()
     serializer_class = CourseAdditionalStudentsSerializer
@@ -81,3 +159,128 @@ def additional_course_student(request, the_slug):
             return Response(status=200, data={'message': 'Pomyślnie dodano uzytkownika do kursu.'})
         return Response(status=400)
     return Response(status=401)
+
+
+@api_view(['GET'])
+def course_gradebook(request, the_slug):
+    if not request.user.is_authenticated or not request.user.is_teacher:
+        return Response(status=401)
+    course = get_object_or_404(models.Course.objects.select_related('grade'), slug=the_slug)
+    if not get_membership(request).is_teacher(course):
+        return Response(status=403)
+    return Response(status=200, data=GradeBook(course).as_dict())
+
+
+@api_view(['POST'])
+def course_marks_import(request, the_slug):
+    """
+    Adds marks of many students of the course at once. Marks are given either as `marks`, a list of objects
+    with `email`, `mark` and optional `description` and `type` keys, or as an uploaded CSV `file`.
+    Nothing is saved if any of the rows is invalid, errors of all invalid rows are returned.
+    """
+    if not request.user.is_authenticated or not request.user.is_teacher:
+        return Response(status=401)
+    course = get_object_or_404(models.Course.objects.select_related('grade'), slug=the_slug)
+    if not get_membership(request).is_teacher(course):
+        return Response(status=403)
+
+    if 'file' in request.FILES:
+        try:
+            rows = imports.read_marks_csv(request.FILES['file'])
+        except (UnicodeDecodeError, csv.Error):
+            return Response(status=400, data={'errors': [{'line': 0, 'message': 'Niepoprawny plik z ocenami.'}]})
+    else:
+        rows = request.data.get('marks')
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            return Response(status=400, data={'errors': [{'line': 0, 'message': 'Niepoprawna lista ocen.'}]})
+        rows = [{key: str(value) for key, value in row.items() if value is not None} for row in rows]
+
+    marks_import = imports.MarksImport(course, request.user, rows, first_line=1 if 'file' not in request.FILES else 2)
+    if not marks_import.is_valid():
+        return Response(status=400, data={'errors': [error.as_dict() for error in marks_import.errors]})
+    marks_import.save()
+    return Response(status=200, data={'created': marks_import.created, 'updated': marks_import.updated})
+
+
+def get_marks_export_data(export: models.MarksExport) -> dict:
+    return {
+        'id': export.pk,
+        'finished': export.is_finished,
+        'url': reverse('courses:marks-export-download', args=(export.pk,)) if export.is_finished else None,
+    }
+
+
+@api_view(['POST'])
+def marks_export_create(request):
+    """
+    Schedules the CSV export of marks of the teacher's courses given by `courses` slugs (all courses by default).
+    """
+    if not request.user.is_authenticated or not request.user.is_teacher:
+        return Response(status=401)
+    courses = models.Course.objects.filter(teachers=request.user.pk)
+    slugs = request.data.get('courses')
+    if slugs:
+        courses = courses.filter(slug__in=slugs)
+    courses_ids = list(courses.values_list('pk', flat=True))
+    if not courses_ids:
+        return Response(status=400, data={'message': 'Nie wybrano żadnego kursu.'})
+
+    export = models.MarksExport.objects.create(teacher_id=request.user.pk)
+    export.courses.set(courses_ids)
+    transaction.on_commit(lambda: tasks.export_courses_marks.delay(export.pk))
+    return Response(status=202, data=get_marks_export_data(export))
+
+
+@api_view(['GET'])
+def marks_export(request, pk):
+    if not request.user.is_authenticated or not request.user.is_teacher:
+        return Response(status=401)
+    export = get_object_or_404(models.MarksExport, pk=pk, teacher_id=request.user.pk)
+    return Response(status=200, data=get_marks_export_data(export))
+
+
+@api_view(['POST'])
+def file_upload_create(request):
+    """
+    Starts a direct upload of a file of the teacher's `lecture` or `laboratory` given by `event` and `pk`.
+    Returns the `token` of the upload and the `upload` form, the file is posted with fields of the form
+    to its url and the upload is completed with the token, see `file_upload_complete`.
+    """
+    if not request.user.is_authenticated or not request.user.is_teacher:
+        return Response(status=401)
+    data = {field: request.data.get(field) or '' for field in ('event', 'name', 'filename', 'description')}
+    if not all(isinstance(value, str) for value in data.values()) or data['event'] not in uploads.UPLOAD_EVENTS \
+            or not data['name'] or not data['filename']:
+        return Response(status=400, data={'message': 'Podaj nazwę pliku oraz wykład lub laboratorium.'})
+    try:
+        pk = int(request.data.get('pk'))
+    except (TypeError, ValueError):
+        return Response(status=400, data={'message': 'Niepoprawny wykład lub laboratorium.'})
+    event = get_object_or_404(uploads.UPLOAD_EVENTS[data['event']].objects.select_related('course'), pk=pk)
+    if not get_membership(request).is_teacher(event.course):
+        return Response(status=403)
+    upload = uploads.create_upload(request.user, event, data['name'][:50], data['filename'], data['description'])
+    return Response(status=201, data=upload)
+
+
+@api_view(['POST'])
+def file_upload_complete(request):
+    """
+    Completes the direct upload of the `token`, the uploaded file is added to the lecture or the laboratory.
+    """
+    if not request.user.is_authenticated or not request.user.is_teacher:
+        return Response(status=401)
+    token = request.data.get('token')
+    upload = uploads.load_upload(token, request.user) if isinstance(token, str) else None
+    if upload is None:
+        return Response(status=400, data={'message': 'Niepoprawny lub nieaktualny token.'})
+    try:
+        course_file = uploads.complete_upload(upload)
+    except ObjectDoesNotExist:
+        return Response(status=404, data={'message': 'Wykład lub laboratorium zostało usunięte.'})
+    if course_file is None:
+        return Response(status=409, data={'message': 'Plik nie został jeszcze przesłany.'})
+    return Response(status=201, data={
+        'id': course_file.pk, 'name': course_file.name,
+        'url': reverse('courses:file-download', args=(course_file.pk,)),
+    })
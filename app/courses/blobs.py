@@ -0,0 +1,65 @@
+import datetime
+from typing import Optional
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from courses import models
+
+
+def store_file_blob(course_file: models.CourseFile):
+    """
+    Moves the content of a file stored at its own path (ex. a direct upload or a file uploaded before
+    content addressing) to the blob of the content, the file at the former path is deleted.
+    """
+    path = course_file.file.name
+    if course_file.blob_id is not None or not default_storage.exists(path):
+        return
+    with transaction.atomic():
+        with default_storage.open(path, 'rb') as content:
+            blob = models.FileBlob.objects.store(content, course_file.filename)
+        models.CourseFile.objects.filter(pk=course_file.pk).update(
+            blob=blob, file=blob.path, original_name=course_file.filename
+        )
+    if blob.path != path:
+        default_storage.delete(path)
+
+
+def store_legacy_file_blobs(limit: Optional[int] = None) -> int:
+    """
+    Moves at most `limit` (settings.FILE_BLOBS_LEGACY_BATCH_SIZE by default) files without a blob to blobs.
+    """
+    files = models.CourseFile.objects.filter(blob=None).order_by('pk')[:limit or settings.FILE_BLOBS_LEGACY_BATCH_SIZE]
+    for course_file in files:
+        store_file_blob(course_file)
+    return len(files)
+
+
+def collect_file_blobs(now: Optional[datetime.datetime] = None) -> int:
+    """
+    Deletes blobs which aren't referenced by attached files, together with their unattached files,
+    and unattached files without a blob. Returns the number of deleted blobs and files.
+    """
+    before = (now or timezone.now()) - settings.FILE_BLOBS_GRACE_PERIOD
+    collected = 0
+    for pk in list(models.FileBlob.objects.unreferenced(before).values_list('pk', flat=True)):
+        with transaction.atomic():
+            # checked again with the lock, the blob might have been reused in the meantime
+            blob = models.FileBlob.objects.unreferenced(before).select_for_update().filter(pk=pk).first()
+            if blob is None:
+                continue
+            blob.files.all().delete()
+            blob.delete()
+        default_storage.delete(blob.path)
+        collected += 1
+
+    files = models.CourseFile.objects.filter(blob=None, created_at__lt=before).exclude(
+        pk__in=models.CourseFile.objects.filter(models.FILE_ATTACHMENTS).values('pk')
+    )
+    for course_file in files:
+        course_file.delete()
+        default_storage.delete(course_file.file.name)
+        collected += 1
+    return collected
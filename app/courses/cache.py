@@ -0,0 +1,39 @@
+from typing import Any, Dict
+
+from django.conf import settings
+
+from courses import models
+from utils import cache as cache_utils
+
+
+def build_course_detail(course_pk: int) -> Dict[str, Any]:
+    """
+    Fetches everything `CoursesDetailView` renders: the course with its head teacher, teachers and grade,
+    lectures and laboratories with their files and the students' groups.
+    """
+    course = models.Course.objects.select_related('head_teacher', 'grade').prefetch_related('teachers').get(
+        pk=course_pk
+    )
+    lectures = list(course.lectures.prefetch_related('files').order_by('date'))
+    laboratories = list(course.laboratories.prefetch_related('files').order_by('date'))
+    student_groups = models.CourseGroup.students.through.objects.filter(coursegroup__course=course).values_list(
+        'student_id', 'coursegroup_id'
+    )
+    return {
+        'course': course,
+        'lectures': lectures,
+        'laboratories': laboratories,
+        'student_groups': dict(student_groups),
+        'ungrouped_students': dict(course.ungrouped_students().values_list('pk', 'email')),
+    }
+
+
+def get_course_detail(course: models.Course) -> Dict[str, Any]:
+    """
+    Returns `build_course_detail` of the course from the cache. Cached data is versioned per course
+    and invalidated by signals whenever anything it contains changes, see `models.invalidate_course_cache`.
+    """
+    return cache_utils.get_or_set_versioned(
+        models.COURSE_CACHE_NAMESPACE, course.pk, 'detail',
+        lambda: build_course_detail(course.pk), settings.COURSE_CACHE_TIMEOUT
+    )
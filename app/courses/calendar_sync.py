@@ -0,0 +1,173 @@
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from courses import models
+from utils.meetings import backends, meetings
+
+EVENT_MODELS = {
+    'lecture': models.Lecture,
+    'laboratory': models.Laboratory,
+}
+
+
+def get_attendees(event: models.Event) -> List[str]:
+    if isinstance(event, models.Laboratory):
+        students = event.group.students.all() if event.group_id else []
+    else:
+        students = event.course.grade.students.all()
+    return [student.email for student in students]
+
+
+def build_body(event: models.Event, create_meet: bool) -> Dict:
+    return meetings.build_event_body(
+        title=event.title,
+        location=event.location or '',
+        description=event.description or '',
+        start_date=event.date,
+        end_date=event.end_date,
+        organizer_email=event.course.head_teacher.email,
+        attendees=get_attendees(event),
+        create_meet=create_meet,
+    )
+
+
+def build_operation(row: models.CalendarSyncOutbox,
+                    event: Optional[models.Event]) -> Optional[backends.CalendarOperation]:
+    """
+    Returns the operation bringing the calendar up to date with the current state of the event,
+    `row` is the latest outbox row of the event.
+    """
+    if event is None or row.action == 'delete':
+        event_id = event.event_id if event else row.calendar_event_id
+        return backends.CalendarOperation('delete', event_id) if event_id else None
+    if event.create_event and event.event_id:
+        return backends.CalendarOperation('update', event.event_id, build_body(event, create_meet=False))
+    if event.create_event:
+        return backends.CalendarOperation('create', body=build_body(event, create_meet=True))
+    if event.event_id:
+        return backends.CalendarOperation('delete', event.event_id)
+    return None
+
+
+def fetch_events(keys: List[Tuple[str, int]]) -> Dict[Tuple[str, int], models.Event]:
+    events = {}
+    for event_type, model in EVENT_MODELS.items():
+        pks = [pk for key_type, pk in keys if key_type == event_type]
+        if pks:
+            queryset = model.objects.filter(pk__in=pks).select_related('course__head_teacher', 'course__grade')
+            events.update({(event_type, event.pk): event for event in queryset})
+    return events
+
+
+def write_back(event_type: str, event: models.Event, operation: backends.CalendarOperation, result: Dict):
+    """
+    Saves the calendar's event id and meeting link. `update()` is used, so the outbox isn't fed again.
+    """
+    queryset = EVENT_MODELS[event_type].objects.filter(pk=event.pk)
+    now = timezone.now()
+    if operation.action == 'delete':
+        queryset.update(event_id='', hangout_link='', updated_at=now)
+    elif not queryset.update(
+        event_id=result.get('id', ''), hangout_link=result.get('hangoutLink', ''), updated_at=now
+    ):
+        # the event was deleted while it was being created in the calendar
+        event.event_id = result.get('id')
+        models.CalendarSyncOutbox.objects.enqueue(event, action='delete')
+
+
+def claim_rows(batch_size: int) -> List[models.CalendarSyncOutbox]:
+    """
+    Claims a batch of pending rows for settings.CALENDAR_SYNC_CLAIM_TIMEOUT and returns them.
+
+    Rows of events with rows claimed by another worker are left pending, so operations of an event are never
+    sent by two workers at once (ex. the event would be created twice). Events are locked while rows are
+    claimed, so workers claiming rows of the same event are serialized and see each other's claims.
+    """
+    now = timezone.now()
+    pending = models.CalendarSyncOutbox.objects.claimable(now)
+    if connection.features.has_select_for_update_skip_locked:
+        pending = pending.select_for_update(skip_locked=True)
+
+    with transaction.atomic():
+        rows = list(pending[:batch_size])
+        keys = {(row.event_type, row.event_pk) for row in rows}
+        for event_type, model in EVENT_MODELS.items():
+            pks = sorted(pk for key_type, pk in keys if key_type == event_type)
+            if not pks:
+                continue
+            list(model.objects.select_for_update().filter(pk__in=pks).order_by('pk').values_list('pk'))
+            keys -= set(models.CalendarSyncOutbox.objects.claimed(now).filter(
+                event_type=event_type, event_pk__in=pks
+            ).values_list('event_type', 'event_pk'))
+        rows = [row for row in rows if (row.event_type, row.event_pk) in keys]
+        models.CalendarSyncOutbox.objects.filter(pk__in=[row.pk for row in rows]).update(
+            claimed_until=now + settings.CALENDAR_SYNC_CLAIM_TIMEOUT
+        )
+    return rows
+
+
+def process_outbox(batch_size: int = None) -> int:
+    """
+    Processes a batch of pending outbox rows and returns the number of processed rows.
+
+    Rows of the same event are coalesced into a single operation built from the current
+    state of the event, then all operations are sent to the backend at once, outside of
+    a transaction. Failed rows stay pending until they reach settings.CALENDAR_SYNC_MAX_ATTEMPTS
+    and are retried by the periodic `tasks.sync_calendar_events`. If the whole batch fails, every
+    operation counts as failed and the error is raised once the claims are released.
+    """
+    rows = claim_rows(batch_size or settings.CALENDAR_SYNC_BATCH_SIZE)
+    if not rows:
+        return 0
+
+    rows_by_event: Dict[Tuple[str, int], List[models.CalendarSyncOutbox]] = {}
+    for row in rows:
+        rows_by_event.setdefault((row.event_type, row.event_pk), []).append(row)
+    events = fetch_events(list(rows_by_event))
+
+    operations = {}
+    for key, event_rows in rows_by_event.items():
+        operation = build_operation(event_rows[-1], events.get(key))
+        if operation:
+            operations[key] = operation
+    results = {}
+    batch_error = None
+    if operations:
+        try:
+            results = dict(zip(operations, backends.get_backend().execute(list(operations.values()))))
+        except Exception as error:
+            batch_error = error
+            results = dict.fromkeys(operations, error)
+
+    with transaction.atomic():
+        now = timezone.now()
+        for key, event_rows in rows_by_event.items():
+            result = results.get(key)
+            for row in event_rows:
+                row.claimed_until = None
+            if isinstance(result, Exception):
+                for row in event_rows:
+                    row.attempts += 1
+                    row.error = repr(result)
+                    if row.attempts >= settings.CALENDAR_SYNC_MAX_ATTEMPTS:
+                        row.processed_at = now
+                continue
+            if key in results and key in events:
+                write_back(key[0], events[key], operations[key], result)
+            for row in event_rows:
+                row.processed_at = now
+                row.error = ''
+        models.CalendarSyncOutbox.objects.bulk_update(rows, ['processed_at', 'claimed_until', 'attempts', 'error'])
+
+        # rows added while the events were processed were skipped by other workers
+        if models.CalendarSyncOutbox.objects.pending().filter(
+            event_type__in={row.event_type for row in rows}, event_pk__in={row.event_pk for row in rows}
+        ).exclude(pk__in=[row.pk for row in rows]).exists():
+            from courses import tasks
+            transaction.on_commit(tasks.sync_calendar_events.delay)
+    if batch_error is not None:
+        raise batch_error
+    return len(rows)
@@ -15,6 +15,9 @@ class NewCourseNoticeEmail(emails.BaseEmailFactory):
         self.notice = notice
         self.bcc = bcc
 
+    def get_cache_key(self):
+        return self.notice.pk
+
     def get_context_data(self):
         return {
             'notice': self.notice
@@ -33,6 +36,53 @@ class NewAssignmentEmail(emails.BaseEmailFactory):
         self.assignment = assignment
         self.bcc = bcc
 
+    def get_cache_key(self):
+        return self.assignment.pk
+
+    def get_context_data(self):
+        return {
+            'assignment': self.assignment
+        }
+
+
+class EventReminderEmail(emails.BaseEmailFactory):
+    """
+    EventReminderEmail is used to create and send email instances
+    reminding about an upcoming Lecture or Laboratory.
+    """
+    subject_template_name = 'reminders/event_reminder_subject.txt'
+    email_template_name = 'reminders/event_reminder.html'
+
+    def __init__(self, event, kind: str, bcc: List[str] = None):
+        self.event = event
+        self.kind = kind
+        self.bcc = bcc
+
+    def get_cache_key(self):
+        return f'{self.kind}:{self.event.pk}:{self.event.date.isoformat()}'
+
+    def get_context_data(self):
+        return {
+            'event': self.event,
+            'kind': self.kind,
+        }
+
+
+class AssignmentReminderEmail(emails.BaseEmailFactory):
+    """
+    AssignmentReminderEmail is used to create and send email instances
+    reminding about an approaching deadline of an Assignment.
+    """
+    subject_template_name = 'reminders/assignment_reminder_subject.txt'
+    email_template_name = 'reminders/assignment_reminder.html'
+
+    def __init__(self, assignment, bcc: List[str] = None):
+        self.assignment = assignment
+        self.bcc = bcc
+
+    def get_cache_key(self):
+        return f'{self.assignment.pk}:{self.assignment.deadline.isoformat()}'
+
     def get_context_data(self):
         return {
             'assignment': self.assignment
@@ -0,0 +1,82 @@
+import codecs
+import csv
+import tempfile
+from typing import Iterable, Iterator, Sequence
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import Storage, get_storage_class
+from django.utils import timezone
+
+from courses import models
+
+MARKS_EXPORT_HEADER = (
+    'course', 'type', 'student_email', 'student_first_name', 'student_last_name',
+    'mark', 'mark_decimal', 'date', 'description',
+)
+
+MARKS_EXPORT_FIELDS = (
+    'course__slug', 'student__email', 'student__first_name', 'student__last_name', 'mark', 'date', 'description',
+)
+
+
+class Echo:
+    """
+    File-like object returning written rows instead of buffering them, so `csv.writer` can be used as a generator.
+    """
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def get_exports_storage() -> Storage:
+    return get_storage_class(settings.EXPORTS_STORAGE)()
+
+
+def iter_marks_rows(courses_ids: Iterable[int]) -> Iterator[Sequence]:
+    """
+    Yields partial and final marks of the courses as rows of `MARKS_EXPORT_HEADER`.
+
+    Rows are fetched as tuples in chunks of settings.EXPORT_CHUNK_SIZE, so memory used by the export
+    doesn't depend on the number of marks.
+    """
+    courses_ids = list(courses_ids)
+    for mark_type, model in (('partial', models.CourseMark), ('final', models.FinalCourseMark)):
+        rows = model.objects.filter(course_id__in=courses_ids).order_by(
+            'course__slug', 'student__last_name', 'student__first_name', 'date'
+        ).values_list(*MARKS_EXPORT_FIELDS).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+        for slug, email, first_name, last_name, mark, date, description in rows:
+            yield (
+                slug, mark_type, email, first_name, last_name,
+                mark, models.mark_to_decimal(mark), date.isoformat(), description,
+            )
+
+
+def iter_marks_csv(courses_ids: Iterable[int]) -> Iterator[str]:
+    """
+    Yields lines of the CSV export of marks of the courses, header included.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(MARKS_EXPORT_HEADER)
+    for row in iter_marks_rows(courses_ids):
+        yield writer.writerow(row)
+
+
+def get_marks_export_filename(export: models.MarksExport) -> str:
+    return f'marks-{export.pk}-{export.created_at:%Y%m%d%H%M%S}.csv'
+
+
+def build_marks_export(export: models.MarksExport):
+    """
+    Writes the CSV of all marks of the export's courses to the exports storage
+    through a temporary file and marks the export as finished.
+    """
+    storage = get_exports_storage()
+    courses_ids = export.courses.values_list('pk', flat=True)
+    with tempfile.TemporaryFile() as file:
+        writer = codecs.getwriter('utf-8')(file)
+        for line in iter_marks_csv(courses_ids):
+            writer.write(line)
+        file.seek(0)
+        path = storage.save(settings.EXPORTS_DIR + get_marks_export_filename(export), File(file))
+    models.MarksExport.objects.filter(pk=export.pk).update(path=path, finished_at=timezone.now())
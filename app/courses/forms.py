@@ -75,6 +75,13 @@ class CourseGroupModelForm(forms.ModelForm):
         }
 
 
+class CourseGroupAutoAssignForm(forms.Form):
+    """
+    CourseGroupAutoAssignForm is used to assign students without groups to `courses.CourseGroup` objects
+    """
+    group_size = forms.IntegerField(min_value=1, widget=forms.NumberInput(attrs={'class': tailwind_form}))
+
+
 class CourseNoticeModelForm(forms.ModelForm):
     """
     CourseNoticeModelForm is used to create/edit `courses.CourseNotice` objects
@@ -110,6 +117,16 @@ class CourseMarkModelForm(forms.ModelForm):
         }
 
 
+class MarksImportForm(forms.Form):
+    """
+    MarksImportForm is used to upload a CSV sheet of marks at `courses.views.course_marks_import_view`.
+    """
+    file = forms.FileField(widget=forms.FileInput(attrs={
+        'class': tailwind_form,
+        'accept': '.csv',
+    }))
+
+
 class CourseSetFinalMarkModelForm(forms.ModelForm):
     """
     CourseSetFinalMarkModelForm is used to create/edit `courses.FinalCourseMark` objects
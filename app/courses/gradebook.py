@@ -0,0 +1,130 @@
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.utils.functional import cached_property
+
+from courses import models
+
+GRADEBOOK_PERCENTILES = (25, 50, 75, 90)
+
+
+def percentile(values: List[float], rank: float) -> Optional[float]:
+    """
+    Returns the `rank` percentile of sorted `values` using linear interpolation.
+    """
+    if not values:
+        return None
+    position = (len(values) - 1) * rank / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class GradeBookRow:
+    """
+    GradeBookRow holds partial marks and the final mark of a single student within a GradeBook.
+    """
+
+    def __init__(self, student, marks: List[int], final_mark: Optional[models.FinalCourseMark]):
+        self.student = student
+        self.marks = marks
+        self.final_mark = final_mark
+        self.count = len(marks)
+        self.sum = sum(marks)
+        self.avg = self.sum / self.count if self.count else None
+        self.avg_decimal = models.mark_to_decimal(self.avg) if self.count else None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'student': {
+                'id': self.student.pk,
+                'first_name': self.student.first_name,
+                'last_name': self.student.last_name,
+            },
+            'marks': self.marks,
+            'count': self.count,
+            'sum': self.sum,
+            'avg': self.avg,
+            'avg_decimal': self.avg_decimal,
+            'final_mark': self.final_mark.mark if self.final_mark else None,
+            'final_mark_decimal': self.final_mark.mark_decimal if self.final_mark else None,
+        }
+
+
+class GradeBook:
+    """
+    GradeBook is a summary of marks of the Course's students.
+
+    All partial marks of the course are fetched with a single query (and final marks with
+    another one), then averages, decimal grades, percentiles and the grades distribution
+    are computed in one pass over the fetched rows.
+    """
+
+    def __init__(self, course: models.Course, students: Iterable = None):
+        self.course = course
+        if students is None:
+            students = course.grade.students.all()
+        self.students = list(students)
+        self.rows = self._build_rows()
+
+    def _build_rows(self) -> List[GradeBookRow]:
+        students_pks = [student.pk for student in self.students]
+        marks = defaultdict(list)
+        for student_id, mark in models.CourseMark.objects.filter(
+            course=self.course, student_id__in=students_pks
+        ).order_by('date', 'pk').values_list('student_id', 'mark'):
+            marks[student_id].append(mark)
+
+        final_marks = {
+            final_mark.student_id: final_mark for final_mark in models.FinalCourseMark.objects.filter(
+                course=self.course, student_id__in=students_pks
+            )
+        }
+        return [
+            GradeBookRow(student, marks[student.pk], final_marks.get(student.pk)) for student in self.students
+        ]
+
+    @cached_property
+    def averages(self) -> List[float]:
+        return sorted(row.avg for row in self.rows if row.count)
+
+    @property
+    def avg(self) -> Optional[float]:
+        averages = self.averages
+        return sum(averages) / len(averages) if averages else None
+
+    @property
+    def avg_decimal(self) -> Optional[float]:
+        avg = self.avg
+        return models.mark_to_decimal(avg) if avg is not None else None
+
+    @property
+    def percentiles(self) -> Dict[int, Optional[float]]:
+        averages = self.averages
+        return {rank: percentile(averages, rank) for rank in GRADEBOOK_PERCENTILES}
+
+    @property
+    def distribution(self) -> Dict[float, int]:
+        """
+        Returns the number of students per decimal grade of their average mark, from the highest grade.
+        """
+        distribution = {decimal: 0 for _, decimal in models.MARK_DECIMAL_THRESHOLDS}
+        distribution[models.MARK_DECIMAL_DEFAULT] = 0
+        for row in self.rows:
+            if row.count:
+                distribution[row.avg_decimal] += 1
+        return distribution
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'course': self.course.slug,
+            'students': [row.as_dict() for row in self.rows],
+            'summary': {
+                'students': len(self.rows),
+                'graded_students': len(self.averages),
+                'avg': self.avg,
+                'avg_decimal': self.avg_decimal,
+                'percentiles': {str(rank): value for rank, value in self.percentiles.items()},
+                'distribution': {str(decimal): count for decimal, count in self.distribution.items()},
+            }
+        }
@@ -0,0 +1,112 @@
+import datetime
+import hashlib
+from typing import Callable, Iterator, Optional, Tuple
+
+import pytz
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from courses import models, schedule
+from utils import cache as cache_utils
+
+FEED_PAST_DAYS = 30
+FEED_FUTURE_DAYS = schedule.SCHEDULE_RANGES['semester']
+ICAL_LINE_LENGTH = 75
+
+
+def escape_text(value: Optional[str]) -> str:
+    """
+    Escapes a TEXT value according to RFC 5545.
+    """
+    if not value:
+        return ''
+    return (value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def fold(line: str) -> str:
+    """
+    Splits `line` into CRLF terminated lines of at most 75 octets, continuation lines start with a space.
+    """
+    parts, current, size = [], '', 0
+    for char in line:
+        char_size = len(char.encode('utf-8'))
+        if size + char_size > ICAL_LINE_LENGTH:
+            parts.append(current)
+            current, size = ' ', 1
+        current += char
+        size += char_size
+    parts.append(current)
+    return '\r\n'.join(parts) + '\r\n'
+
+
+def format_datetime(value: datetime.datetime) -> str:
+    return value.astimezone(pytz.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def get_feed_schedule(user) -> schedule.Schedule:
+    today = schedule.local_date(timezone.now())
+    return schedule.Schedule(
+        user,
+        schedule.start_of_day(today - datetime.timedelta(days=FEED_PAST_DAYS)),
+        schedule.start_of_day(today + datetime.timedelta(days=FEED_FUTURE_DAYS)),
+    )
+
+
+def get_feed_version(user_schedule: schedule.Schedule) -> Tuple[str, datetime.datetime]:
+    """
+    Returns the ETag and the Last-Modified date of the feed.
+
+    Last-Modified is the latest `updated_at` of the feed's events, or the date of the last change of the user's
+    schedule which `updated_at` can't tell (an event was deleted or the user joined or left a course or a group),
+    see `models.SCHEDULE_CHANGES_NAMESPACE`. The number of events is a part of the ETag too,
+    so it changes when an event leaves the feed's range.
+    """
+    versions = [
+        queryset.order_by().aggregate(updated_at=Max('updated_at'), count=Count('pk'))
+        for queryset in (user_schedule.get_lectures(), user_schedule.get_laboratories())
+    ]
+    changed_at = cache_utils.get_changed_at(models.SCHEDULE_CHANGES_NAMESPACE, user_schedule.user.pk)
+    last_modified = max([changed_at] + [version['updated_at'] for version in versions if version['updated_at']])
+    key = ':'.join(
+        [str(user_schedule.user.calendar_token), user_schedule.start.date().isoformat(), changed_at.isoformat()] +
+        [f'{version["count"]}:{version["updated_at"] and version["updated_at"].isoformat()}' for version in versions]
+    )
+    return f'"{hashlib.md5(key.encode()).hexdigest()}"', last_modified
+
+
+def iter_event(event, kind: str, url: str) -> Iterator[str]:
+    yield 'BEGIN:VEVENT'
+    yield f'UID:{kind}-{event.pk}@raven'
+    yield f'DTSTAMP:{format_datetime(event.updated_at)}'
+    yield f'LAST-MODIFIED:{format_datetime(event.updated_at)}'
+    yield f'DTSTART:{format_datetime(event.date)}'
+    yield f'DTEND:{format_datetime(event.end_date)}'
+    yield f'SUMMARY:{escape_text(f"{event.course.name}: {event.title}")}'
+    yield f'LOCATION:{escape_text(event.location)}'
+    if event.description:
+        yield f'DESCRIPTION:{escape_text(event.description)}'
+    yield f'URL:{url}'
+    yield 'END:VEVENT'
+
+
+def iter_calendar(user_schedule: schedule.Schedule, build_url: Callable[[str, int], str]) -> Iterator[str]:
+    """
+    Yields folded lines of the iCalendar feed of the schedule's events.
+    Events are read with `iterator()`, so the feed is never built in memory as a whole.
+
+    build_url: function returning the absolute url of the event from its url name and pk
+    """
+    header = ['BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//raven//schedule//PL', 'CALSCALE:GREGORIAN',
+              'X-WR-CALNAME:Raven', f'X-WR-TIMEZONE:{schedule.get_schedule_timezone().zone}']
+    for line in header:
+        yield fold(line)
+    events = (
+        ('lecture', 'courses:lectures-detail', user_schedule.get_lectures()),
+        ('laboratory', 'courses:laboratory-detail', user_schedule.get_laboratories()),
+    )
+    for kind, url_name, queryset in events:
+        for event in queryset.iterator():
+            for line in iter_event(event, kind, build_url(url_name, event.pk)):
+                yield fold(line)
+    yield fold('END:VCALENDAR')
@@ -0,0 +1,169 @@
+import csv
+import io
+from typing import Dict, Iterable, List, NamedTuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from courses import models
+from users import models as users_models
+from utils import live
+
+MARKS_IMPORT_TYPES = ('partial', 'final')
+
+
+class MarksImportError(NamedTuple):
+    line: int
+    message: str
+
+    def as_dict(self) -> Dict:
+        return {'line': self.line, 'message': self.message}
+
+
+class MarksImportRow(NamedTuple):
+    line: int
+    student_id: int
+    mark: int
+    description: str
+    mark_type: str
+
+
+def read_marks_csv(file) -> List[Dict[str, str]]:
+    """
+    Reads rows of an uploaded CSV file with `email`, `mark` and optional `description` and `type` columns.
+    """
+    return list(csv.DictReader(io.TextIOWrapper(file, encoding='utf-8-sig')))
+
+
+class MarksImport:
+    """
+    MarksImport validates a sheet of marks of a Course and saves them at once.
+
+    Students are looked up by email within the course's roster (grade and additional students) with a single
+    query. Rows are validated all together, so every invalid row is reported and nothing is saved unless
+    the whole sheet is valid. Partial marks are created with `bulk_create`, final marks are created or
+    updated with `bulk_create`/`bulk_update`, all in one transaction.
+    """
+
+    def __init__(self, course: models.Course, teacher: users_models.Teacher, rows: Iterable[Dict[str, str]],
+                 first_line: int = 2):
+        self.course = course
+        self.teacher = teacher
+        self.rows = list(rows)
+        # number of the first row reported in errors, by default line 1 of a sheet is the header
+        self.first_line = first_line
+        self.errors: List[MarksImportError] = []
+        self.valid_rows: List[MarksImportRow] = []
+        self.created = 0
+        self.updated = 0
+
+    def get_roster(self) -> Dict[str, int]:
+        students = users_models.Student.objects.filter(
+            Q(grades=self.course.grade_id) | Q(additional_courses=self.course.pk)
+        ).values_list('email', 'pk').distinct()
+        return {email.lower(): pk for email, pk in students}
+
+    def is_valid(self) -> bool:
+        self.errors = []
+        self.valid_rows = []
+        if not self.rows:
+            self.errors.append(MarksImportError(0, 'Plik nie zawiera żadnych ocen.'))
+            return False
+        if len(self.rows) > settings.MARKS_IMPORT_MAX_ROWS:
+            self.errors.append(MarksImportError(
+                0, f'Można zaimportować najwyżej {settings.MARKS_IMPORT_MAX_ROWS} ocen naraz.'
+            ))
+            return False
+
+        roster = self.get_roster()
+        final_marks_students = set()
+        for line, row in enumerate(self.rows, start=self.first_line):
+            try:
+                valid_row = self.parse_row(line, row, roster)
+            except ValueError as error:
+                self.errors.append(MarksImportError(line, str(error)))
+                continue
+            if valid_row.mark_type == 'final':
+                if valid_row.student_id in final_marks_students:
+                    self.errors.append(MarksImportError(line, 'Ocena końcowa studenta została już podana.'))
+                    continue
+                final_marks_students.add(valid_row.student_id)
+            self.valid_rows.append(valid_row)
+        return not self.errors
+
+    def parse_row(self, line: int, row: Dict[str, str], roster: Dict[str, int]) -> MarksImportRow:
+        """
+        Returns the validated row, raises ValueError with a message for the teacher if the row is invalid.
+        """
+        email = (row.get('email') or '').strip().lower()
+        if not email:
+            raise ValueError('Brak adresu email studenta.')
+        if email not in roster:
+            raise ValueError(f'Nie znaleziono studenta {email} w kursie.')
+        try:
+            mark = int((row.get('mark') or '').strip())
+        except ValueError:
+            raise ValueError('Ocena musi być liczbą całkowitą.')
+        if not 0 <= mark <= 100:
+            raise ValueError('Ocena musi być z przedziału 0-100.')
+        mark_type = (row.get('type') or '').strip() or 'partial'
+        if mark_type not in MARKS_IMPORT_TYPES:
+            raise ValueError('Nieznany rodzaj oceny.')
+        return MarksImportRow(line, roster[email], mark, (row.get('description') or '').strip(), mark_type)
+
+    @transaction.atomic
+    def save(self):
+        """
+        Saves marks of the valid sheet, `is_valid` has to be called first.
+        """
+        if self.errors:
+            raise ValueError('Invalid marks import cannot be saved.')
+
+        partial_marks = [
+            models.CourseMark(
+                course=self.course, teacher_id=self.teacher.pk, student_id=row.student_id,
+                mark=row.mark, description=row.description,
+            ) for row in self.valid_rows if row.mark_type == 'partial'
+        ]
+        models.CourseMark.objects.bulk_create(partial_marks, batch_size=settings.MARKS_IMPORT_BATCH_SIZE)
+
+        final_rows = {row.student_id: row for row in self.valid_rows if row.mark_type == 'final'}
+        existing = {
+            final_mark.student_id: final_mark
+            for final_mark in models.FinalCourseMark.objects.select_for_update().filter(
+                course=self.course, student_id__in=final_rows
+            )
+        }
+        new_final_marks, updated_final_marks = [], []
+        now = timezone.now()
+        for student_id, row in final_rows.items():
+            final_mark = existing.get(student_id)
+            if final_mark is None:
+                new_final_marks.append(models.FinalCourseMark(
+                    course=self.course, teacher_id=self.teacher.pk, student_id=student_id,
+                    mark=row.mark, description=row.description,
+                ))
+                continue
+            final_mark.mark = row.mark
+            final_mark.description = row.description
+            final_mark.teacher_id = self.teacher.pk
+            # bulk_update doesn't set auto_now fields
+            final_mark.updated_at = now
+            updated_final_marks.append(final_mark)
+        models.FinalCourseMark.objects.bulk_create(new_final_marks, batch_size=settings.MARKS_IMPORT_BATCH_SIZE)
+        models.FinalCourseMark.objects.bulk_update(
+            updated_final_marks, ('mark', 'description', 'teacher', 'updated_at'),
+            batch_size=settings.MARKS_IMPORT_BATCH_SIZE,
+        )
+
+        self.created = len(partial_marks) + len(new_final_marks)
+        self.updated = len(updated_final_marks)
+        # bulk operations don't send signals, see `models.course_mark_changed` and `models.mark_published`
+        students = {row.student_id for row in self.valid_rows}
+        users_models.DashboardSnapshot.objects.invalidate(students)
+        live.publish_on_commit(
+            [live.get_channel('user', student_id) for student_id in students],
+            {'type': 'marks', 'course': self.course.pk},
+        )
@@ -0,0 +1,29 @@
+from typing import List
+
+from django.db import close_old_connections
+from django.db.models import Q
+
+from courses import models
+from utils import live
+
+
+class CoursesLiveConsumer(live.LiveConsumer):
+    """
+    Students listen to their own channel (marks), channels of their courses (notices)
+    and channels of their laboratory groups (assignments).
+    """
+
+    def get_channels(self, user) -> List[str]:
+        channels = [live.get_channel('user', user.pk)]
+        if not user.is_student:
+            return channels
+        try:
+            courses = models.Course.objects.filter(
+                Q(grade__students=user.pk) | Q(additional_students=user.pk)
+            ).values_list('pk', flat=True).distinct()
+            channels.extend(live.get_channel('course', pk) for pk in courses)
+            groups = models.CourseGroup.objects.filter(students=user.pk).values_list('pk', flat=True)
+            channels.extend(live.get_channel('group', pk) for pk in groups)
+        finally:
+            close_old_connections()
+        return channels
@@ -0,0 +1,108 @@
+from typing import Callable, Dict, Tuple
+
+from django.db.models import Q, QuerySet
+
+from courses import models
+
+
+class CourseMembership:
+    """
+    CourseMembership answers whether a user is a teacher, a student or an additional student
+    of a specific Course (or a student of a specific CourseGroup).
+
+    Every answer is resolved with a single EXISTS query against the relation table
+    and memoized, so asking the same question twice within a request is free.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._cache: Dict[Tuple[str, int], bool] = {}
+
+    def _resolve(self, key: Tuple[str, int], query: Callable[[], bool]) -> bool:
+        if not self.user.is_authenticated:
+            return False
+        if key not in self._cache:
+            self._cache[key] = query()
+        return self._cache[key]
+
+    def is_teacher(self, course: models.Course) -> bool:
+        return self._resolve(('teacher', course.pk), lambda: models.Course.teachers.through.objects.filter(
+            course_id=course.pk, teacher_id=self.user.pk
+        ).exists())
+
+    def is_student(self, course: models.Course) -> bool:
+        return self._resolve(('student', course.pk), lambda: models.Grade.students.through.objects.filter(
+            grade_id=course.grade_id, student_id=self.user.pk
+        ).exists())
+
+    def is_additional_student(self, course: models.Course) -> bool:
+        return self._resolve(('additional_student', course.pk),
+                             lambda: models.Course.additional_students.through.objects.filter(
+                                 course_id=course.pk, student_id=self.user.pk
+                             ).exists())
+
+    def is_group_student(self, group: models.CourseGroup) -> bool:
+        if group is None:
+            return False
+        return self._resolve(('group_student', group.pk), lambda: models.CourseGroup.students.through.objects.filter(
+            coursegroup_id=group.pk, student_id=self.user.pk
+        ).exists())
+
+    def is_member(self, course: models.Course) -> bool:
+        if self.user.is_teacher:
+            return self.is_teacher(course)
+        if self.user.is_student:
+            return self.is_student(course)
+        return False
+
+
+def get_user_courses(user) -> QuerySet:
+    """
+    Returns ids of courses the user teaches or attends, as a subquery.
+    """
+    if user.is_teacher:
+        courses = models.Course.objects.filter(Q(teachers=user.pk) | Q(head_teacher=user.pk))
+    elif user.is_student:
+        courses = models.Course.objects.filter(Q(grade__students=user.pk) | Q(additional_students=user.pk))
+    else:
+        courses = models.Course.objects.none()
+    return courses.values('pk')
+
+
+def get_user_files(user) -> QuerySet:
+    """
+    Returns files attached to courses, lectures or laboratories of the user's courses.
+    """
+    courses = get_user_courses(user)
+    return models.CourseFile.objects.filter(
+        Q(course__in=courses) | Q(lecture__course__in=courses) | Q(laboratory__course__in=courses)
+    ).distinct()
+
+
+def get_membership(request) -> CourseMembership:
+    """
+    Returns CourseMembership of the request's user, shared by every caller within the request.
+    """
+    membership = getattr(request, '_course_membership', None)
+    if membership is None or membership.user != request.user:
+        membership = CourseMembership(request.user)
+        request._course_membership = membership
+    return membership
+
+
+class CourseMembershipMixin:
+    """
+    CourseMembershipMixin exposes the request's CourseMembership as `self.membership`
+    and memoizes `get_object`, which the views call several times per request.
+    """
+
+    @property
+    def membership(self) -> CourseMembership:
+        return get_membership(self.request)
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if getattr(self, '_object', None) is None:
+            self._object = super().get_object()
+        return self._object
@@ -0,0 +1,40 @@
+# Generated by Django 3.0.7 on 2026-10-18 02:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def count_unread_notices(apps, schema_editor):
+    CourseNotice = apps.get_model('courses', 'CourseNotice')
+    UnreadNoticeCounter = apps.get_model('courses', 'UnreadNoticeCounter')
+    rows = CourseNotice.not_viewed.through.objects.values('coursenotice__course', 'student').annotate(
+        count=models.Count('pk')
+    )
+    UnreadNoticeCounter.objects.bulk_create([
+        UnreadNoticeCounter(course_id=row['coursenotice__course'], student_id=row['student'], count=row['count'])
+        for row in rows
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0011_dashboardsnapshot'),
+        ('courses', '0026_auto_20210110_1401'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadNoticeCounter',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='unread_notice_counters', to='courses.Course')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='unread_notice_counters', to='users.Student')),
+            ],
+            options={
+                'unique_together': {('student', 'course')},
+            },
+        ),
+        migrations.RunPython(count_unread_notices, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.0.7 on 2026-10-18 02:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0027_unreadnoticecounter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(fields=['laboratory', 'deadline'], name='assignment_lab_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='coursemark',
+            index=models.Index(fields=['course', 'student'], name='coursemark_course_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='coursenotice',
+            index=models.Index(fields=['course', '-created_at'], name='notice_course_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='laboratory',
+            index=models.Index(fields=['course', 'group', 'date'], name='lab_course_group_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lecture',
+            index=models.Index(fields=['course', 'date'], name='lecture_course_date_idx'),
+        ),
+    ]
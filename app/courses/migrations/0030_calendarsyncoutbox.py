@@ -0,0 +1,31 @@
+# Generated by Django 3.0.7 on 2026-10-18 02:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0029_event_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarSyncOutbox',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('lecture', 'Lecture'), ('laboratory', 'Laboratory')], max_length=10)),
+                ('event_pk', models.PositiveIntegerField()),
+                ('action', models.CharField(choices=[('sync', 'Synchronize'), ('delete', 'Delete')], default='sync', max_length=10)),
+                ('calendar_event_id', models.CharField(blank=True, max_length=500, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='calendarsyncoutbox',
+            index=models.Index(fields=['processed_at', 'id'], name='calendar_outbox_pending_idx'),
+        ),
+    ]
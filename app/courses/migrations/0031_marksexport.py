@@ -0,0 +1,29 @@
+# Generated by Django 3.0.7 on 2026-10-18 03:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0014_remove_user_is_online'),
+        ('courses', '0030_calendarsyncoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarksExport',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(blank=True, default='', max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('courses', models.ManyToManyField(related_name='marks_exports', to='courses.Course')),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='marks_exports', to='users.Teacher')),
+            ],
+            options={
+                'ordering': ('-created_at',),
+            },
+        ),
+    ]
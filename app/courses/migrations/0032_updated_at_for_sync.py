@@ -0,0 +1,41 @@
+# Generated by Django 3.0.7 on 2026-10-18 03:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0031_marksexport'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assignment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='coursemark',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='coursenotice',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='finalcoursemark',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='coursemark',
+            index=models.Index(fields=['student', 'updated_at'], name='coursemark_student_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='coursenotice',
+            index=models.Index(fields=['course', 'updated_at'], name='notice_course_updated_idx'),
+        ),
+    ]
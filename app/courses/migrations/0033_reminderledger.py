@@ -0,0 +1,43 @@
+# Generated by Django 3.0.7 on 2026-10-18 03:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0032_updated_at_for_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReminderLedger',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('lecture', 'Lecture'), ('laboratory', 'Laboratory'), ('assignment', 'Assignment')], max_length=10)),
+                ('object_pk', models.PositiveIntegerField()),
+                ('scheduled_for', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(fields=['deadline'], name='assignment_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='laboratory',
+            index=models.Index(fields=['date'], name='lab_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lecture',
+            index=models.Index(fields=['date'], name='lecture_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reminderledger',
+            index=models.Index(fields=['scheduled_for'], name='reminder_scheduled_for_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='reminderledger',
+            unique_together={('kind', 'object_pk', 'scheduled_for')},
+        ),
+    ]
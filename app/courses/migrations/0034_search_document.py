@@ -0,0 +1,84 @@
+# Generated by Django 3.0.7 on 2026-10-18 03:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils import timezone
+
+from utils.search import normalize
+
+
+def build_search_index(apps, schema_editor):
+    SearchDocument = apps.get_model('courses', 'SearchDocument')
+    sources = (
+        ('course', apps.get_model('courses', 'Course'), ('name', 'code_meu', 'description'), 'pk'),
+        ('notice', apps.get_model('courses', 'CourseNotice'), ('title', 'content'), 'course_id'),
+        ('assignment', apps.get_model('courses', 'Assignment'), ('title', 'content'), 'laboratory__course_id'),
+        ('file', apps.get_model('courses', 'CourseFile'), ('name', 'description', 'file'), None),
+        ('user', apps.get_model('users', 'User'), ('first_name', 'last_name', 'email'), None),
+    )
+    now = timezone.now()
+    for kind, model, fields, course_field in sources:
+        queryset = model.objects.all()
+        if kind == 'user':
+            queryset = queryset.filter(is_active=True)
+        documents = []
+        for row in queryset.values('pk', *fields, *filter(None, [course_field])).iterator():
+            texts = [str(row[field]) for field in fields if row[field]]
+            if kind == 'user':
+                texts = [f'{row["first_name"]} {row["last_name"]}', row['email']]
+            title = texts[0] if texts else ''
+            documents.append(SearchDocument(
+                kind=kind, object_pk=row['pk'], course_id=row[course_field] if course_field else None,
+                title=title[:255], title_search=normalize(title)[:255], document=normalize(' '.join(texts)),
+                updated_at=now,
+            ))
+        SearchDocument.objects.bulk_create(documents, batch_size=1000)
+
+
+def create_trigram_index(apps, schema_editor):
+    # LIKE patterns of searches use the trigram index, other databases scan the documents table
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX search_document_trgm_idx ON courses_searchdocument USING gin (document gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS search_document_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0014_remove_user_is_online'),
+        ('courses', '0033_reminderledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('course', 'Course'), ('notice', 'Notice'), ('assignment', 'Assignment'), ('file', 'File'), ('user', 'User')], max_length=10)),
+                ('object_pk', models.PositiveIntegerField()),
+                ('title', models.CharField(max_length=255)),
+                ('title_search', models.CharField(max_length=255)),
+                ('document', models.TextField()),
+                ('updated_at', models.DateTimeField()),
+                ('course', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='courses.Course')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='searchdocument',
+            index=models.Index(fields=['course', 'kind'], name='search_course_kind_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='searchdocument',
+            unique_together={('kind', 'object_pk')},
+        ),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
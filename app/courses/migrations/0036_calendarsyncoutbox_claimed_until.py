@@ -0,0 +1,18 @@
+# Generated by Django 3.0.7 on 2026-10-18 04:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0035_file_blobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='calendarsyncoutbox',
+            name='claimed_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.0.7 on 2026-10-18 04:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0036_calendarsyncoutbox_claimed_until'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coursefile',
+            name='upload_path',
+            field=models.CharField(blank=True, editable=False, max_length=255, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.0.7 on 2026-10-18 04:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0037_coursefile_upload_path'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncTombstone',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_pk', models.PositiveIntegerField()),
+                ('kind', models.CharField(blank=True, choices=[('mark', 'Mark'), ('final_mark', 'Final mark'), ('notice', 'Notice'), ('assignment', 'Assignment'), ('lecture', 'Lecture'), ('laboratory', 'Laboratory')], max_length=20)),
+                ('object_pk', models.PositiveIntegerField(blank=True, null=True)),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='synctombstone',
+            index=models.Index(fields=['user_pk', 'deleted_at'], name='tombstone_user_deleted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='synctombstone',
+            index=models.Index(fields=['deleted_at'], name='tombstone_deleted_idx'),
+        ),
+    ]
@@ -1,18 +1,32 @@
 import datetime
 import os
+import re
 import uuid
-from typing import Any, List, Optional
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
 
 from django.conf import settings
 from django.core import validators
 from django.core.exceptions import ValidationError
-from django.db import models
-from django.db.models import QuerySet
+from django.core.files.storage import default_storage
+from django.db import models, transaction
+from django.db.models import (Avg, BooleanField, Case, Count, Exists,
+                              ExpressionWrapper, F, FloatField, Func,
+                              IntegerField, OuterRef, Q, QuerySet, Sum, Value,
+                              When)
+from django.db.models.functions import Greatest
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
 from django.template.defaultfilters import slugify
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from users import models as users_models
+from utils import cache as cache_utils
+from utils import files as files_utils
+from utils import live
+from utils import search as search_utils
 
 PROFILE_CHOICES = (
     ('CS', _('Computer Science')),
@@ -26,6 +40,34 @@ LANGUAGE_CHOICES = (
     ('PL', _('Polish')),
 )
 
+# (minimal mark, decimal mark) pairs in descending order, marks below the last threshold are 2.0
+MARK_DECIMAL_THRESHOLDS = (
+    (90, 5.0),
+    (80, 4.5),
+    (70, 4.0),
+    (60, 3.5),
+    (50, 3.0),
+)
+MARK_DECIMAL_DEFAULT = 2.0
+
+# number of days after the start date for which the course is actual
+COURSE_ACTUAL_DAYS = 180
+
+# names of groups created by `Course.assign_students_to_groups`, numbered from 1
+GROUP_NAME_TEMPLATE = 'Grupa {}'
+GROUP_NAME_RE = re.compile(r'^Grupa (\d+)$')
+# length of a semester in days and number of semesters of studies, see `Course.calculated_semester`
+SEMESTER_DAYS = 183
+SEMESTERS_COUNT = 7
+
+COURSE_CACHE_NAMESPACE = 'courses:course'
+# fields of teachers shown with cached courses, other changes (ex. `last_login`) don't invalidate the cache
+COURSE_CACHE_USER_FIELDS = {'first_name', 'last_name', 'email', 'image', 'role', 'is_active'}
+# marks changes of users' schedules which `updated_at` of events can't tell, see `utils.cache.get_changed_at`
+SCHEDULE_CHANGES_NAMESPACE = 'courses:schedule'
+# marks deletions of rows listed by the read API which `updated_at` can't tell, see `users.api.views.SyncListView`
+SYNC_CHANGES_NAMESPACE = 'courses:sync'
+
 
 def get_file_path(instance: Any, filename: str) -> str:
     """
@@ -37,13 +79,75 @@ def get_file_path(instance: Any, filename: str) -> str:
     return os.path.join(settings.UPLOAD_FILES_DIR, today, str(uuid.uuid4()) + filename)
 
 
+# files attached to a course, a lecture or a laboratory
+FILE_ATTACHMENTS = Q(course__isnull=False) | Q(lecture__isnull=False) | Q(laboratory__isnull=False)
+
+
+def get_blob_path(sha256: str, filename: str) -> str:
+    """
+    Returns the path of the content with the given hash, the extension of the filename is kept for browsers.
+    """
+    extension = os.path.splitext(filename)[1].lower()[:10]
+    return os.path.join(settings.BLOBS_DIR, sha256[:2], sha256 + extension)
+
+
+class FileBlobQuerySet(models.QuerySet):
+    def store(self, content, filename: str) -> 'FileBlob':
+        """
+        Returns the blob of the content. The content is hashed while it's read in chunks
+        and written to the storage only if there is no blob with the same hash yet.
+        """
+        sha256, size = files_utils.hash_file(content)
+        # the lock keeps `tasks.collect_file_blobs` from deleting the blob until the referencing file is saved
+        blob = self.select_for_update().filter(sha256=sha256).first()
+        if blob is not None:
+            return blob
+        path = default_storage.save(get_blob_path(sha256, filename), content)
+        blob, created = self.get_or_create(sha256=sha256, defaults={'path': path, 'size': size})
+        if not created and blob.path != path:
+            # the same content was stored concurrently
+            default_storage.delete(path)
+        return blob
+
+    def unreferenced(self, before: datetime.datetime) -> QuerySet:
+        """
+        Returns blobs created before `before` whose files aren't attached to any course, lecture or laboratory.
+        Files created after `before` count as references, they may be attached yet.
+        """
+        references = CourseFile.objects.filter(blob=OuterRef('pk')).filter(
+            FILE_ATTACHMENTS | Q(created_at__gte=before)
+        )
+        return self.filter(created_at__lt=before).exclude(Exists(references))
+
+
+class FileBlob(models.Model):
+    """
+    FileBlob is a content of course files stored once by its SHA-256 hash, many CourseFiles may share it.
+    Blobs which aren't referenced by attached files are deleted by `tasks.collect_file_blobs`.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    path = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = FileBlobQuerySet.as_manager()
+
+    def __str__(self):
+        return f'File Blob: {self.sha256}'
+
+
 class CourseFile(models.Model):
     """
     CourseFile is a model used to store files in Course application.
+    Contents of uploaded files are stored once per content, see `FileBlob`.
     """
     name = models.CharField(max_length=50)
     description = models.TextField(null=True, blank=True)
-    file = models.FileField(upload_to=get_file_path, verbose_name=_('File'))
+    file = models.FileField(upload_to=get_file_path, max_length=255, verbose_name=_('File'))
+    blob = models.ForeignKey('FileBlob', on_delete=models.PROTECT, related_name='files', null=True, blank=True)
+    original_name = models.CharField(max_length=255, blank=True)
+    # path of the direct upload the file was created from, kept after the file is moved to its blob
+    upload_path = models.CharField(max_length=255, null=True, blank=True, unique=True, editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -56,9 +160,19 @@ class CourseFile(models.Model):
     def __str__(self):
         return f"{self.name} - {self.filename}"
 
+    @transaction.atomic
+    def save(self, *args, **kwargs):
+        if self.file and not self.file._committed:
+            # the upload is stored as a blob instead of a new file at `get_file_path`
+            self.original_name = self.original_name or os.path.basename(self.file.name)
+            self.blob = FileBlob.objects.store(self.file.file, self.original_name)
+            self.file.name = self.blob.path
+            self.file._committed = True
+        super().save(*args, **kwargs)
+
     @property
     def filename(self) -> str:
-        return self.file.name.split('/')[-1]
+        return self.original_name or self.file.name.split('/')[-1]
 
 
 class Grade(models.Model):
@@ -96,6 +210,54 @@ class Grade(models.Model):
         return self.start_year + datetime.timedelta(days=365 * 3)
 
 
+class DaysBetween(Func):
+    """
+    Number of whole days between two dates, the first one minus the second one.
+    """
+    template = '(%(expressions)s)'
+    arg_joiner = ' - '
+    output_field = IntegerField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super().as_sql(
+            compiler, connection, template='CAST(julianday(%(expressions)s) AS INTEGER)',
+            arg_joiner=') - julianday(', **extra_context
+        )
+
+
+class CourseQuerySet(models.QuerySet):
+    def actual(self) -> QuerySet:
+        """
+        Filters courses which are actual today, see `Course.is_actual`.
+        """
+        return self.filter(self._actual_q())
+
+    def _actual_q(self) -> Q:
+        today = timezone.now().date()
+        return Q(start_date__lte=today, start_date__gte=today - datetime.timedelta(days=COURSE_ACTUAL_DAYS))
+
+    def with_calculated_fields(self) -> QuerySet:
+        """
+        Annotates courses with `annotated_is_actual` and `annotated_semester` computed by the database,
+        used by `Course.is_actual` and `Course.calculated_semester` instead of computing them in python.
+        """
+        semester_offset = ExpressionWrapper(
+            DaysBetween('start_date', 'grade__start_year') / SEMESTER_DAYS, output_field=IntegerField()
+        )
+        return self.annotate(semester_offset=semester_offset).annotate(
+            annotated_is_actual=Case(
+                When(self._actual_q(), then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+            annotated_semester=Case(
+                When(semester_offset__gte=0, semester_offset__lt=SEMESTERS_COUNT, then=F('semester_offset') + 1),
+                default=Value(None),
+                output_field=IntegerField(),
+            ),
+        )
+
+
 class Course(models.Model):
     """
     A Course is a model that represents a specific university course for a given grade.
@@ -136,6 +298,8 @@ class Course(models.Model):
 
     start_date = models.DateField(default=timezone.now())
 
+    objects = CourseQuerySet.as_manager()
+
     class Meta:
         ordering = ('name',)
         verbose_name = _('Course')
@@ -164,25 +328,70 @@ class Course(models.Model):
     def total_students(self) -> QuerySet:
         return self.grade.students.all() | self.additional_students.all()
 
+    def ungrouped_students(self) -> QuerySet:
+        """
+        Returns students of the course's grade who don't belong to any of the course's groups.
+        """
+        grouped = CourseGroup.students.through.objects.filter(coursegroup__course=self).values('student_id')
+        return self.grade.students.exclude(pk__in=grouped)
+
     @property
     def students_without_groups(self) -> List[users_models.Student]:
-        groups = self.groups.all()
-        students = []
-        for group in groups:
-            for student in group.students.all():
-                students.append(student)
-        return [student for student in self.grade.students.all() if student not in students]
+        return list(self.ungrouped_students())
+
+    def get_next_group_number(self) -> int:
+        """
+        Returns the number following the highest number of the course's numbered groups,
+        so names stay unique after groups are deleted or renamed.
+        """
+        numbers = [
+            int(match.group(1)) for match in map(GROUP_NAME_RE.match, self.groups.values_list('name', flat=True))
+            if match
+        ]
+        return max(numbers, default=0) + 1
+
+    @transaction.atomic
+    def assign_students_to_groups(self, group_size: int) -> int:
+        """
+        Assigns students without groups to groups of at most `group_size` students, filling
+        existing groups first and creating new ones for the rest. Returns number of assigned students.
+        """
+        # concurrent assignments of the course would pick the same students and names of new groups
+        Course.objects.select_for_update().filter(pk=self.pk).first()
+        students = list(self.ungrouped_students().order_by('last_name', 'first_name').values_list('pk', flat=True))
+        assigned = 0
+        groups = list(self.groups.annotate(size=Count('students')).order_by('pk'))
+        number = self.get_next_group_number()
+        while assigned < len(students):
+            if groups:
+                group = groups.pop(0)
+                free_places = group_size - group.size
+            else:
+                group = CourseGroup.objects.create(course=self, name=GROUP_NAME_TEMPLATE.format(number))
+                number += 1
+                free_places = group_size
+            if free_places <= 0:
+                continue
+            batch = students[assigned:assigned + free_places]
+            group.students.add(*batch)
+            assigned += len(batch)
+        return assigned
 
     @property
     def is_actual(self) -> bool:
-        return self.start_date <= timezone.now().date() <= self.start_date + datetime.timedelta(days=180)
+        if hasattr(self, 'annotated_is_actual'):
+            return self.annotated_is_actual
+        end_date = self.start_date + datetime.timedelta(days=COURSE_ACTUAL_DAYS)
+        return self.start_date <= timezone.now().date() <= end_date
 
     @property
     def calculated_semester(self) -> Optional[int]:
+        if hasattr(self, 'annotated_semester'):
+            return self.annotated_semester
         grade_start_date: datetime.date = self.grade.start_year
         delta: datetime.timedelta = self.start_date - grade_start_date
-        semester = int(delta.days / 183) + 1
-        if 0 < semester <= 7:
+        semester = int(delta.days / SEMESTER_DAYS) + 1
+        if 0 < semester <= SEMESTERS_COUNT:
             return semester
         return None
 
@@ -221,6 +430,7 @@ class Event(models.Model):
     event_id = models.CharField(max_length=500, null=True, blank=True)
     meeting_link = models.CharField(max_length=500, null=True, blank=True)
     hangout_link = models.CharField(max_length=500, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ('date',)
@@ -253,6 +463,12 @@ class Lecture(Event):
     def __str__(self) -> str:
         return f'Lecture: {self.title}({self.date})'
 
+    class Meta(Event.Meta):
+        indexes = [
+            models.Index(fields=['course', 'date'], name='lecture_course_date_idx'),
+            models.Index(fields=['date'], name='lecture_date_idx'),
+        ]
+
     @property
     def students(self):
         return self.course.grade.students.all()
@@ -272,6 +488,66 @@ class Laboratory(Event):
         verbose_name = _('Laboratory')
         verbose_name_plural = _('Laboratories')
         ordering = ('date',)
+        indexes = [
+            models.Index(fields=['course', 'group', 'date'], name='lab_course_group_date_idx'),
+            models.Index(fields=['date'], name='lab_date_idx'),
+        ]
+
+
+def mark_to_decimal(mark: float) -> float:
+    """
+    Converts a percentage mark to the decimal grade scale.
+    """
+    for threshold, decimal in MARK_DECIMAL_THRESHOLDS:
+        if mark >= threshold:
+            return decimal
+    return MARK_DECIMAL_DEFAULT
+
+
+def mark_decimal_expression(field: str = 'mark') -> Case:
+    """
+    SQL counterpart of `mark_to_decimal`.
+    """
+    return Case(
+        *[When(**{f'{field}__gte': threshold}, then=Value(decimal)) for threshold, decimal in MARK_DECIMAL_THRESHOLDS],
+        default=Value(MARK_DECIMAL_DEFAULT),
+        output_field=FloatField(),
+    )
+
+
+class CourseMarkQuerySet(models.QuerySet):
+    def with_decimal_mark(self) -> QuerySet:
+        """
+        Annotates marks with `decimal_mark` computed by the database.
+        """
+        return self.annotate(decimal_mark=mark_decimal_expression())
+
+    def summary_by_course(self) -> QuerySet:
+        """
+        Returns one row per course with `sum`, `count` and `avg` of marks and `avg_decimal` of decimal marks.
+        """
+        return self.order_by().values('course').annotate(
+            sum=Sum('mark'),
+            count=Count('pk'),
+            avg=Avg('mark'),
+            avg_decimal=Avg(mark_decimal_expression()),
+        )
+
+    def summary_by_grade(self) -> QuerySet:
+        """
+        Returns one row per course's grade with `sum`, `count` and `avg` of marks.
+        """
+        return self.order_by().values('course__grade').annotate(
+            sum=Sum('mark'),
+            count=Count('pk'),
+            avg=Avg('mark'),
+        )
+
+    def by_course(self) -> Dict[int, 'CourseMarkBase']:
+        """
+        Returns marks mapped by their course's pk, useful for marks unique per course, ex. final marks of a student.
+        """
+        return {mark.course_id: mark for mark in self}
 
 
 class CourseMarkBase(models.Model):
@@ -282,26 +558,16 @@ class CourseMarkBase(models.Model):
                                                       validators.MaxValueValidator(100)])
     date = models.DateTimeField(auto_now_add=True)
     description = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         abstract = True
 
+    objects = CourseMarkQuerySet.as_manager()
+
     @property
     def mark_decimal(self) -> float:
-        if self.mark < 50:
-            return 2.0
-        elif 50 <= self.mark < 60:
-            return 3.0
-        elif 60 <= self.mark < 70:
-            return 3.5
-        elif 70 <= self.mark < 80:
-            return 4.0
-        elif 80 <= self.mark < 90:
-            return 4.5
-        elif self.mark >= 90:
-            return 5.0
-        else:
-            return 2.0
+        return mark_to_decimal(self.mark)
 
 
 class CourseMark(CourseMarkBase):
@@ -317,6 +583,10 @@ class CourseMark(CourseMarkBase):
 
     class Meta:
         ordering = ('-date',)
+        indexes = [
+            models.Index(fields=['course', 'student'], name='coursemark_course_student_idx'),
+            models.Index(fields=['student', 'updated_at'], name='coursemark_student_updated_idx'),
+        ]
 
 
 class FinalCourseMark(CourseMarkBase):
@@ -335,6 +605,14 @@ class FinalCourseMark(CourseMarkBase):
         ordering = ('-date',)
 
 
+class CourseNoticeQuerySet(models.QuerySet):
+    def mark_as_read(self, student: users_models.Student):
+        """
+        Removes the student from `not_viewed` of all notices, with a single delete of relation rows.
+        """
+        student.not_viewed_notices.remove(*self.filter(not_viewed=student).values_list('pk', flat=True))
+
+
 class CourseNotice(models.Model):
     """
     CourseNotice is a model that represents a notice that can be made public as part of a Course.
@@ -349,12 +627,71 @@ class CourseNotice(models.Model):
     content = models.TextField()
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = CourseNoticeQuerySet.as_manager()
 
     def __str__(self):
         return f'Course Notice: {self.course}, {self.title}'
 
     class Meta:
         ordering = ('-created_at', 'title',)
+        indexes = [
+            models.Index(fields=['course', '-created_at'], name='notice_course_created_idx'),
+            models.Index(fields=['course', 'updated_at'], name='notice_course_updated_idx'),
+        ]
+
+    def publish(self):
+        """
+        Marks the notice as not viewed by every student of the course's grade,
+        with a single bulk insert of relation rows.
+        """
+        self.not_viewed.add(*Grade.students.through.objects.filter(
+            grade_id=self.course.grade_id
+        ).values_list('student_id', flat=True))
+
+
+class UnreadNoticeCounterQuerySet(models.QuerySet):
+    def change(self, course_id: int, students_ids: List[int], delta: int):
+        """
+        Changes by `delta` the counters of the students in the course, creating missing ones.
+        """
+        if delta > 0:
+            self.bulk_create([
+                UnreadNoticeCounter(course_id=course_id, student_id=student_id) for student_id in students_ids
+            ], ignore_conflicts=True)
+        self.filter(course_id=course_id, student_id__in=students_ids).update(count=Greatest(F('count') + delta, 0))
+
+    def change_by_relations(self, relations: QuerySet, delta: int):
+        """
+        Changes the counters by `delta` for every given `CourseNotice.not_viewed` relation row.
+        """
+        changes = defaultdict(list)
+        for row in relations.values('coursenotice__course', 'student').annotate(count=Count('pk')):
+            changes[(row['coursenotice__course'], row['count'])].append(row['student'])
+        for (course_id, count), students_ids in changes.items():
+            self.change(course_id, students_ids, delta * count)
+
+    def total(self, user) -> int:
+        return self.filter(student_id=user.pk).aggregate(total=Sum('count'))['total'] or 0
+
+
+class UnreadNoticeCounter(models.Model):
+    """
+    UnreadNoticeCounter is a number of the Course's notices not viewed yet by a student,
+    kept in sync with `CourseNotice.not_viewed`.
+    """
+    student = models.ForeignKey('users.Student', related_name='unread_notice_counters', on_delete=models.CASCADE)
+    course = models.ForeignKey('Course', related_name='unread_notice_counters', on_delete=models.CASCADE)
+    count = models.PositiveIntegerField(default=0)
+
+    objects = UnreadNoticeCounterQuerySet.as_manager()
+
+    def __str__(self):
+        return f'Unread Notice Counter: {self.student}, {self.course}'
+
+    class Meta:
+        unique_together = ('student', 'course',)
 
 
 class Assignment(models.Model):
@@ -366,10 +703,17 @@ class Assignment(models.Model):
     deadline = models.DateTimeField()
     title = models.CharField(max_length=100)
     content = models.TextField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f'Assignment: {self.title} {self.deadline}'
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['laboratory', 'deadline'], name='assignment_lab_deadline_idx'),
+            models.Index(fields=['deadline'], name='assignment_deadline_idx'),
+        ]
+
     @property
     def is_actual(self) -> bool:
         if self.deadline:
@@ -379,3 +723,578 @@ class Assignment(models.Model):
     @property
     def timedelta(self) -> datetime.timedelta:
         return self.deadline - timezone.now()
+
+
+CALENDAR_SYNC_EVENT_TYPES = (
+    ('lecture', _('Lecture')),
+    ('laboratory', _('Laboratory')),
+)
+
+CALENDAR_SYNC_ACTIONS = (
+    ('sync', _('Synchronize')),
+    ('delete', _('Delete')),
+)
+
+
+class CalendarSyncOutboxQuerySet(models.QuerySet):
+    def pending(self) -> QuerySet:
+        return self.filter(processed_at__isnull=True).order_by('pk')
+
+    def claimed(self, now: datetime.datetime) -> QuerySet:
+        """
+        Returns pending rows being processed by a worker, see `courses.calendar_sync.claim_rows`.
+        """
+        return self.pending().filter(claimed_until__gte=now)
+
+    def claimable(self, now: datetime.datetime) -> QuerySet:
+        return self.pending().filter(Q(claimed_until__isnull=True) | Q(claimed_until__lt=now))
+
+    def enqueue(self, event: Event, action: str = 'sync'):
+        """
+        Adds the event to the outbox and schedules the synchronization after the transaction is committed.
+        """
+        if not settings.CALENDAR_SYNC_BACKEND:
+            return
+        self.create(
+            event_type=event._meta.model_name, event_pk=event.pk, action=action, calendar_event_id=event.event_id
+        )
+        from courses import tasks
+        transaction.on_commit(tasks.sync_calendar_events.delay)
+
+
+class CalendarSyncOutbox(models.Model):
+    """
+    CalendarSyncOutbox is a queue of changes of lectures and laboratories to be applied to the calendar backend,
+    see `courses.calendar_sync`. Rows are processed in batches, multiple rows of the same event are coalesced.
+    """
+    event_type = models.CharField(max_length=10, choices=CALENDAR_SYNC_EVENT_TYPES)
+    event_pk = models.PositiveIntegerField()
+    action = models.CharField(max_length=10, choices=CALENDAR_SYNC_ACTIONS, default='sync')
+    # id of the event in the calendar, kept as the event may be already deleted when the row is processed
+    calendar_event_id = models.CharField(max_length=500, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    # rows are claimed by a worker while their operations are sent to the backend, so other workers skip the event
+    claimed_until = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+
+    objects = CalendarSyncOutboxQuerySet.as_manager()
+
+    def __str__(self):
+        return f'Calendar Sync Outbox: {self.action} {self.event_type} {self.event_pk}'
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['processed_at', 'id'], name='calendar_outbox_pending_idx'),
+        ]
+
+
+REMINDER_KINDS = (
+    ('lecture', _('Lecture')),
+    ('laboratory', _('Laboratory')),
+    ('assignment', _('Assignment')),
+)
+
+
+class ReminderLedger(models.Model):
+    """
+    ReminderLedger records reminders already sent, see `courses.reminders`. A reminder is identified
+    by the reminded object and its date, so a rescheduled event is reminded about again.
+    """
+    kind = models.CharField(max_length=10, choices=REMINDER_KINDS)
+    object_pk = models.PositiveIntegerField()
+    scheduled_for = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'Reminder Ledger: {self.kind} {self.object_pk} {self.scheduled_for}'
+
+    class Meta:
+        unique_together = ('kind', 'object_pk', 'scheduled_for',)
+        indexes = [
+            models.Index(fields=['scheduled_for'], name='reminder_scheduled_for_idx'),
+        ]
+
+
+SYNC_KINDS = (
+    ('mark', _('Mark')),
+    ('final_mark', _('Final mark')),
+    ('notice', _('Notice')),
+    ('assignment', _('Assignment')),
+    ('lecture', _('Lecture')),
+    ('laboratory', _('Laboratory')),
+)
+
+
+class SyncTombstoneQuerySet(models.QuerySet):
+    def record(self, kind: str, object_pk: Optional[int], users_ids: List[int]):
+        """
+        Records the object deleted from lists of the users, or rows leaving and joining all lists of the users
+        if `object_pk` is None.
+        """
+        self.bulk_create([
+            SyncTombstone(user_pk=user_pk, kind=kind, object_pk=object_pk) for user_pk in set(users_ids) if user_pk
+        ])
+
+    def get_retained_since(self, now: Optional[datetime.datetime] = None) -> datetime.datetime:
+        """
+        Returns the date of the oldest tombstones which are kept, changes before it can't be synced with `since`.
+        """
+        return (now or timezone.now()) - datetime.timedelta(days=settings.SYNC_TOMBSTONES_RETENTION_DAYS)
+
+    def collect(self, now: Optional[datetime.datetime] = None) -> int:
+        return self.filter(deleted_at__lt=self.get_retained_since(now)).delete()[0]
+
+
+class SyncTombstone(models.Model):
+    """
+    SyncTombstone records a row deleted from a list of the user's read API (see `users.api.views.SyncListView`),
+    so clients syncing changes with `since` drop it too. A tombstone without `kind` and `object_pk` is recorded when
+    rows can leave or join lists without being changed (ex. the user left a course), clients fetch lists again.
+    Tombstones are kept for settings.SYNC_TOMBSTONES_RETENTION_DAYS days.
+    """
+    # not a foreign key, tombstones are recorded while users' rows are deleted in cascade
+    user_pk = models.PositiveIntegerField()
+    kind = models.CharField(max_length=20, choices=SYNC_KINDS, blank=True)
+    object_pk = models.PositiveIntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    objects = SyncTombstoneQuerySet.as_manager()
+
+    def __str__(self):
+        return f'Sync Tombstone: {self.user_pk} {self.kind} {self.object_pk}'
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user_pk', 'deleted_at'], name='tombstone_user_deleted_idx'),
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_idx'),
+        ]
+
+
+SEARCH_KINDS = (
+    ('course', _('Course')),
+    ('notice', _('Notice')),
+    ('assignment', _('Assignment')),
+    ('file', _('File')),
+    ('user', _('User')),
+)
+
+
+class SearchDocumentQuerySet(models.QuerySet):
+    def index(self, kind: str, pk: int, title: str, *texts: Optional[str], course_id: Optional[int] = None,
+              updated_at: Optional[datetime.datetime] = None):
+        """
+        Creates or updates the search document of the object.
+        """
+        title = title or ''
+        self.update_or_create(kind=kind, object_pk=pk, defaults={
+            'course_id': course_id,
+            'title': title[:255],
+            'title_search': search_utils.normalize(title)[:255],
+            'document': search_utils.normalize(' '.join(filter(None, (title, *texts)))),
+            'updated_at': updated_at or timezone.now(),
+        })
+
+    def unindex(self, kind: str, pk: int):
+        self.filter(kind=kind, object_pk=pk).delete()
+
+    def search(self, text: str) -> QuerySet:
+        """
+        Returns documents containing every term of the text, ranked by matches of their titles
+        (`rank` annotation) and then by the time of the last change.
+
+        Terms are matched with `LIKE '%term%'` patterns on normalized text,
+        which use the trigram index of the documents on PostgreSQL.
+        """
+        terms = search_utils.get_terms(text)
+        if not terms:
+            return self.none()
+        rank = Value(0, output_field=IntegerField())
+        for term in terms:
+            rank = rank + Case(
+                When(title_search__startswith=term, then=Value(3)),
+                When(title_search__contains=term, then=Value(2)),
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+        queryset = self
+        for term in terms:
+            queryset = queryset.filter(document__contains=term)
+        return queryset.annotate(rank=rank).order_by('-rank', '-updated_at', 'pk')
+
+
+class SearchDocument(models.Model):
+    """
+    SearchDocument is a row of the search index of courses, notices, assignments, files and users.
+
+    Documents are kept up to date by signal receivers and hold normalized text (see `utils.search.normalize`),
+    `course` is used to limit results to courses of the user.
+    """
+    kind = models.CharField(max_length=10, choices=SEARCH_KINDS)
+    object_pk = models.PositiveIntegerField()
+    course = models.ForeignKey('Course', on_delete=models.CASCADE, related_name='+', null=True, blank=True)
+    title = models.CharField(max_length=255)
+    title_search = models.CharField(max_length=255)
+    document = models.TextField()
+    updated_at = models.DateTimeField()
+
+    objects = SearchDocumentQuerySet.as_manager()
+
+    def __str__(self):
+        return f'Search Document: {self.kind} {self.object_pk}'
+
+    class Meta:
+        unique_together = ('kind', 'object_pk',)
+        indexes = [
+            models.Index(fields=['course', 'kind'], name='search_course_kind_idx'),
+        ]
+
+
+class MarksExport(models.Model):
+    """
+    MarksExport is a CSV export of marks of multiple courses built in the background, see `courses.exports`.
+    The file is kept in the exports storage under `path` once the export is finished.
+    """
+    teacher = models.ForeignKey('users.Teacher', on_delete=models.CASCADE, related_name='marks_exports')
+    courses = models.ManyToManyField('Course', related_name='marks_exports')
+    path = models.CharField(max_length=255, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'Marks Export: {self.teacher}, {self.created_at}'
+
+    @property
+    def is_finished(self) -> bool:
+        return self.finished_at is not None
+
+    class Meta:
+        ordering = ('-created_at',)
+
+
+def invalidate_course_cache(course_id: int):
+    """
+    Invalidates cached data of the specified course, see `courses.cache`. The version is bumped again
+    after commit, so data cached from the old state while the transaction was running is dropped too.
+    """
+    cache_utils.bump_version(COURSE_CACHE_NAMESPACE, course_id)
+    transaction.on_commit(lambda: cache_utils.bump_version(COURSE_CACHE_NAMESPACE, course_id))
+
+
+def get_related_courses_ids(model, pks) -> List[int]:
+    """
+    Returns ids of courses the objects of `model` with the given pks belong to.
+    """
+    if issubclass(model, Course):
+        return list(pks)
+    if issubclass(model, Grade):
+        return list(Course.objects.filter(grade__in=pks).values_list('pk', flat=True))
+    return list(model.objects.filter(pk__in=pks).values_list('course_id', flat=True))
+
+
+def invalidate_course_dashboards(course_id: int):
+    """
+    Marks dashboards of all students and teachers of the specified course as stale.
+    """
+    snapshots = users_models.DashboardSnapshot.objects
+    snapshots.invalidate(Grade.students.through.objects.filter(grade__courses=course_id).values('student_id'))
+    snapshots.invalidate(Course.teachers.through.objects.filter(course_id=course_id).values('teacher_id'))
+
+
+def get_course_users_ids(course_id: int) -> List[int]:
+    """
+    Returns ids of all students and teachers of the specified course.
+    """
+    return list(users_models.User.objects.filter(
+        Q(pk__in=Grade.students.through.objects.filter(grade__courses=course_id).values('student_id')) |
+        Q(pk__in=Course.additional_students.through.objects.filter(course_id=course_id).values('student_id')) |
+        Q(pk__in=Course.teachers.through.objects.filter(course_id=course_id).values('teacher_id')) |
+        Q(pk__in=Course.objects.filter(pk=course_id).values('head_teacher_id'))
+    ).values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=CourseMark)
+@receiver(post_delete, sender=CourseMark)
+def course_mark_changed(sender, instance, **kwargs):
+    users_models.DashboardSnapshot.objects.invalidate([instance.student_id])
+
+
+@receiver(post_save, sender=Course)
+def course_changed(sender, instance, **kwargs):
+    invalidate_course_dashboards(instance.pk)
+    invalidate_course_cache(instance.pk)
+
+
+@receiver(post_save, sender=Lecture)
+@receiver(post_delete, sender=Lecture)
+@receiver(post_save, sender=Laboratory)
+@receiver(post_delete, sender=Laboratory)
+@receiver(post_save, sender=CourseGroup)
+@receiver(post_delete, sender=CourseGroup)
+def course_detail_changed(sender, instance, **kwargs):
+    invalidate_course_cache(instance.course_id)
+
+
+@receiver(post_save, sender=CourseFile)
+@receiver(pre_delete, sender=CourseFile)
+def course_file_changed(sender, instance, **kwargs):
+    courses = Course.objects.filter(
+        models.Q(lectures__files=instance) | models.Q(laboratories__files=instance)
+    ).values_list('pk', flat=True).distinct()
+    for course_id in courses:
+        invalidate_course_cache(course_id)
+
+
+@receiver(post_save, sender=users_models.User)
+@receiver(post_save, sender=users_models.Teacher)
+def teacher_changed(sender, instance, update_fields=None, **kwargs):
+    if not instance.is_teacher:
+        return
+    if update_fields and not COURSE_CACHE_USER_FIELDS.intersection(update_fields):
+        return
+    courses = Course.objects.filter(
+        models.Q(teachers=instance) | models.Q(head_teacher=instance)
+    ).values_list('pk', flat=True).distinct()
+    for course_id in courses:
+        invalidate_course_cache(course_id)
+
+
+@receiver(m2m_changed, sender=Course.teachers.through)
+@receiver(m2m_changed, sender=CourseGroup.students.through)
+@receiver(m2m_changed, sender=Grade.students.through)
+@receiver(m2m_changed, sender=Lecture.files.through)
+@receiver(m2m_changed, sender=Laboratory.files.through)
+def course_detail_relation_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        model, pks = type(instance), [instance.pk]
+    elif action == 'pre_clear':
+        field = next(field for field in sender._meta.fields if field.related_model is model)
+        instance_field = next(other for other in sender._meta.fields if other.is_relation and other is not field)
+        pks = sender.objects.filter(**{instance_field.attname: instance.pk}).values_list(field.attname, flat=True)
+    else:
+        pks = pk_set
+    for course_id in get_related_courses_ids(model, pks):
+        invalidate_course_cache(course_id)
+
+
+@receiver(post_save, sender=CourseNotice)
+@receiver(post_delete, sender=CourseNotice)
+@receiver(post_save, sender=Lecture)
+@receiver(post_delete, sender=Lecture)
+@receiver(post_save, sender=Laboratory)
+@receiver(post_delete, sender=Laboratory)
+def course_event_changed(sender, instance, **kwargs):
+    invalidate_course_dashboards(instance.course_id)
+
+
+@receiver(post_save, sender=Lecture)
+@receiver(post_save, sender=Laboratory)
+def calendar_event_saved(sender, instance, **kwargs):
+    if instance.create_event or instance.event_id:
+        CalendarSyncOutbox.objects.enqueue(instance)
+
+
+@receiver(post_delete, sender=Lecture)
+@receiver(post_delete, sender=Laboratory)
+def calendar_event_deleted(sender, instance, **kwargs):
+    if instance.event_id:
+        CalendarSyncOutbox.objects.enqueue(instance, action='delete')
+
+
+@receiver(post_save, sender=Assignment)
+@receiver(post_delete, sender=Assignment)
+def assignment_changed(sender, instance, **kwargs):
+    students = CourseGroup.students.through.objects.filter(coursegroup__laboratory=instance.laboratory_id)
+    users_models.DashboardSnapshot.objects.invalidate(students.values('student_id'))
+
+
+@receiver(post_save, sender=CourseNotice)
+def notice_published(sender, instance, created, **kwargs):
+    if created:
+        live.publish_on_commit([live.get_channel('course', instance.course_id)], {
+            'type': 'notice', 'id': instance.pk, 'course': instance.course_id, 'title': instance.title,
+        })
+
+
+@receiver(post_save, sender=CourseMark)
+@receiver(post_save, sender=FinalCourseMark)
+def mark_published(sender, instance, created, **kwargs):
+    if created:
+        live.publish_on_commit([live.get_channel('user', instance.student_id)], {
+            'type': 'final_mark' if sender is FinalCourseMark else 'mark',
+            'id': instance.pk, 'course': instance.course_id, 'mark': instance.mark,
+        })
+
+
+@receiver(post_save, sender=Assignment)
+def assignment_published(sender, instance, created, **kwargs):
+    if not created:
+        return
+    laboratory = instance.laboratory
+    if laboratory.group_id is None:
+        channel = live.get_channel('course', laboratory.course_id)
+    else:
+        channel = live.get_channel('group', laboratory.group_id)
+    live.publish_on_commit([channel], {
+        'type': 'assignment', 'id': instance.pk, 'course': laboratory.course_id, 'title': instance.title,
+    })
+
+
+@receiver(m2m_changed, sender=CourseNotice.not_viewed.through)
+def not_viewed_notices_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'pre_remove', 'pre_clear'):
+        return
+    relations = sender.objects.filter(**{'student_id' if reverse else 'coursenotice_id': instance.pk})
+    if action != 'pre_clear':
+        relations = relations.filter(**{'coursenotice_id__in' if reverse else 'student_id__in': pk_set})
+    UnreadNoticeCounter.objects.change_by_relations(relations, 1 if action == 'post_add' else -1)
+
+
+@receiver(m2m_changed, sender=CourseNotice.not_viewed.through)
+def not_viewed_notices_touched(sender, instance, action, reverse, pk_set, **kwargs):
+    # read state is listed by the read API, so reading a notice has to bump its `updated_at`
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        notices = [instance.pk]
+    elif action == 'pre_clear':
+        notices = sender.objects.filter(student_id=instance.pk).values('coursenotice_id')
+    else:
+        notices = pk_set
+    CourseNotice.objects.filter(pk__in=notices).update(updated_at=timezone.now())
+
+
+@receiver(pre_delete, sender=CourseNotice)
+@receiver(pre_delete, sender=users_models.Student)
+@receiver(pre_delete, sender=users_models.User)
+def not_viewed_notices_deleted(sender, instance, **kwargs):
+    # relation rows deleted in cascade don't send `m2m_changed`
+    field = 'coursenotice_id' if sender is CourseNotice else 'student_id'
+    relations = CourseNotice.not_viewed.through.objects.filter(**{field: instance.pk})
+    UnreadNoticeCounter.objects.change_by_relations(relations, -1)
+
+
+def get_changed_users(sender, instance, action: str, reverse: bool, pk_set) -> List[int]:
+    """
+    Returns ids of users whose relation rows are changed by the `m2m_changed` signal of a membership relation.
+    """
+    if reverse:
+        return [instance.pk]
+    if action == 'pre_clear':
+        user_field = 'teacher_id' if sender is Course.teachers.through else 'student_id'
+        return list(sender.objects.filter(**{instance._meta.model_name: instance.pk}).values_list(
+            user_field, flat=True
+        ))
+    return list(pk_set)
+
+
+@receiver(m2m_changed, sender=CourseNotice.not_viewed.through)
+@receiver(m2m_changed, sender=CourseGroup.students.through)
+@receiver(m2m_changed, sender=Grade.students.through)
+@receiver(m2m_changed, sender=Course.teachers.through)
+def course_membership_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    users_models.DashboardSnapshot.objects.invalidate(get_changed_users(sender, instance, action, reverse, pk_set))
+
+
+@receiver(m2m_changed, sender=CourseGroup.students.through)
+@receiver(m2m_changed, sender=Grade.students.through)
+@receiver(m2m_changed, sender=Course.teachers.through)
+@receiver(m2m_changed, sender=Course.additional_students.through)
+def schedule_membership_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    # events leaving or joining a schedule keep their `updated_at`, see `courses.ical.get_feed_version`
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    users_ids = get_changed_users(sender, instance, action, reverse, pk_set)
+    cache_utils.touch(SCHEDULE_CHANGES_NAMESPACE, users_ids)
+    cache_utils.touch(SYNC_CHANGES_NAMESPACE, users_ids)
+    SyncTombstone.objects.record('', None, users_ids)
+
+
+@receiver(post_delete, sender=Lecture)
+@receiver(post_delete, sender=Laboratory)
+def schedule_event_deleted(sender, instance, **kwargs):
+    users_ids = get_course_users_ids(instance.course_id)
+    cache_utils.touch(SCHEDULE_CHANGES_NAMESPACE, users_ids)
+    SyncTombstone.objects.record(sender._meta.model_name, instance.pk, users_ids)
+
+
+@receiver(post_delete, sender=CourseMark)
+@receiver(post_delete, sender=FinalCourseMark)
+def sync_mark_deleted(sender, instance, **kwargs):
+    users_ids = [instance.student_id, instance.teacher_id]
+    cache_utils.touch(SYNC_CHANGES_NAMESPACE, users_ids)
+    SyncTombstone.objects.record('final_mark' if sender is FinalCourseMark else 'mark', instance.pk, users_ids)
+
+
+@receiver(post_delete, sender=CourseNotice)
+def sync_notice_deleted(sender, instance, **kwargs):
+    users_ids = get_course_users_ids(instance.course_id)
+    cache_utils.touch(SYNC_CHANGES_NAMESPACE, users_ids)
+    SyncTombstone.objects.record('notice', instance.pk, users_ids)
+
+
+@receiver(post_delete, sender=Assignment)
+def sync_assignment_deleted(sender, instance, **kwargs):
+    # laboratories are deleted after their assignments, so the course is still known in cascades
+    courses_ids = Laboratory.objects.filter(pk=instance.laboratory_id).values_list('course_id', flat=True)
+    for course_id in courses_ids:
+        users_ids = get_course_users_ids(course_id)
+        cache_utils.touch(SYNC_CHANGES_NAMESPACE, users_ids)
+        SyncTombstone.objects.record('assignment', instance.pk, users_ids)
+
+
+# fields of users which are indexed for search, other changes (ex. `last_login`) don't update the index
+USER_SEARCH_FIELDS = {'first_name', 'last_name', 'email', 'is_active'}
+
+
+@receiver(post_save, sender=Course)
+def course_indexed(sender, instance, **kwargs):
+    SearchDocument.objects.index('course', instance.pk, instance.name, instance.code_meu, instance.description,
+                                 course_id=instance.pk)
+
+
+@receiver(post_save, sender=CourseNotice)
+def notice_indexed(sender, instance, **kwargs):
+    SearchDocument.objects.index('notice', instance.pk, instance.title, instance.content,
+                                 course_id=instance.course_id, updated_at=instance.updated_at)
+
+
+@receiver(post_save, sender=Assignment)
+def assignment_indexed(sender, instance, **kwargs):
+    SearchDocument.objects.index('assignment', instance.pk, instance.title, instance.content,
+                                 course_id=instance.laboratory.course_id, updated_at=instance.updated_at)
+
+
+@receiver(post_save, sender=CourseFile)
+def file_indexed(sender, instance, **kwargs):
+    SearchDocument.objects.index('file', instance.pk, instance.name, instance.description, instance.filename,
+                                 updated_at=instance.updated_at)
+
+
+@receiver(post_save, sender=users_models.User)
+@receiver(post_save, sender=users_models.Student)
+@receiver(post_save, sender=users_models.Teacher)
+def user_indexed(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not USER_SEARCH_FIELDS.intersection(update_fields):
+        return
+    if not instance.is_active:
+        SearchDocument.objects.unindex('user', instance.pk)
+        return
+    SearchDocument.objects.index('user', instance.pk, f'{instance.first_name} {instance.last_name}', instance.email)
+
+
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=CourseNotice)
+@receiver(post_delete, sender=Assignment)
+@receiver(post_delete, sender=CourseFile)
+@receiver(post_delete, sender=users_models.User)
+@receiver(post_delete, sender=users_models.Student)
+@receiver(post_delete, sender=users_models.Teacher)
+def search_document_deleted(sender, instance, **kwargs):
+    kinds = {Course: 'course', CourseNotice: 'notice', Assignment: 'assignment', CourseFile: 'file'}
+    SearchDocument.objects.unindex(kinds.get(sender, 'user'), instance.pk)
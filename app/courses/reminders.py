@@ -0,0 +1,116 @@
+import datetime
+from typing import Dict, List, NamedTuple, Optional, Type
+
+from django.conf import settings
+from django.db import models as db_models
+from django.db import transaction
+from django.db.models import Exists, OuterRef, QuerySet
+from django.utils import timezone
+
+from courses import models
+from courses.emails import factories
+from users import models as users_models
+from utils import emails
+
+
+class ReminderKind(NamedTuple):
+    model: Type[db_models.Model]
+    # name of the reminded date field
+    date_field: str
+    lead_time_setting: str
+
+    def get_lead_time(self) -> datetime.timedelta:
+        return getattr(settings, self.lead_time_setting)
+
+
+REMINDERS: Dict[str, ReminderKind] = {
+    'lecture': ReminderKind(models.Lecture, 'date', 'EVENT_REMINDER_LEAD_TIME'),
+    'laboratory': ReminderKind(models.Laboratory, 'date', 'EVENT_REMINDER_LEAD_TIME'),
+    'assignment': ReminderKind(models.Assignment, 'deadline', 'ASSIGNMENT_REMINDER_LEAD_TIME'),
+}
+
+
+def get_due(kind: str, now: datetime.datetime) -> QuerySet:
+    """
+    Returns `(pk, date)` of objects of the kind whose date is within the reminder's lead time from now
+    and which weren't reminded about yet.
+
+    The window is a range lookup on the indexed date field, so only upcoming rows are read,
+    sent reminders are excluded with a lookup of the ledger's unique index.
+    """
+    reminder = REMINDERS[kind]
+    sent = models.ReminderLedger.objects.filter(
+        kind=kind, object_pk=OuterRef('pk'), scheduled_for=OuterRef(reminder.date_field)
+    )
+    queryset = reminder.model.objects.filter(**{
+        f'{reminder.date_field}__gt': now,
+        f'{reminder.date_field}__lte': now + reminder.get_lead_time(),
+    })
+    if kind != 'assignment':
+        queryset = queryset.filter(reminders=True)
+    return queryset.exclude(Exists(sent)).order_by(reminder.date_field).values_list('pk', reminder.date_field)
+
+
+def schedule_reminders(now: Optional[datetime.datetime] = None, limit: int = None) -> int:
+    """
+    Records due reminders in the ledger and schedules sending them after the transaction is committed.
+    Returns the number of scheduled reminders, at most `limit` (settings.REMINDERS_BATCH_SIZE by default).
+    """
+    from courses import tasks
+
+    now = now or timezone.now()
+    limit = limit or settings.REMINDERS_BATCH_SIZE
+    scheduled = 0
+    with transaction.atomic():
+        for kind in REMINDERS:
+            due = list(get_due(kind, now)[:limit - scheduled])
+            # the ledger's unique constraint makes concurrent ticks fail instead of sending reminders twice
+            models.ReminderLedger.objects.bulk_create([
+                models.ReminderLedger(kind=kind, object_pk=pk, scheduled_for=date) for pk, date in due
+            ])
+            for pk, date in due:
+                transaction.on_commit(
+                    lambda kind=kind, pk=pk, date=date: tasks.send_reminder_email.delay(kind, pk, date.isoformat())
+                )
+            scheduled += len(due)
+            if scheduled >= limit:
+                break
+        models.ReminderLedger.objects.filter(
+            scheduled_for__lt=now - datetime.timedelta(days=settings.REMINDERS_LEDGER_RETENTION_DAYS)
+        ).delete()
+    return scheduled
+
+
+def get_recipients(kind: str, obj) -> List[str]:
+    """
+    Returns emails of students of the lecture's course, the laboratory's group or the assignment's laboratory group.
+    """
+    if kind == 'lecture':
+        students = users_models.Student.objects.filter(
+            db_models.Q(grades=obj.course.grade_id) | db_models.Q(additional_courses=obj.course_id)
+        )
+    else:
+        laboratory = obj.laboratory if kind == 'assignment' else obj
+        if laboratory.group_id is None:
+            students = users_models.Student.objects.filter(grades=laboratory.course.grade_id)
+        else:
+            students = users_models.Student.objects.filter(laboratories=laboratory.group_id)
+    return list(students.filter(is_active=True).order_by('pk').values_list('email', flat=True).distinct())
+
+
+def get_reminded(kind: str, pk: int, scheduled_for: datetime.datetime) -> Optional[db_models.Model]:
+    """
+    Returns the reminded object, None if it was deleted or rescheduled since the reminder was scheduled.
+    """
+    reminder = REMINDERS[kind]
+    related = 'laboratory__course' if kind == 'assignment' else 'course'
+    obj = reminder.model.objects.select_related(related).filter(pk=pk).first()
+    if obj is None or getattr(obj, reminder.date_field) != scheduled_for:
+        return None
+    return obj
+
+
+def get_email(kind: str, obj) -> emails.BaseEmailFactory:
+    if kind == 'assignment':
+        return factories.AssignmentReminderEmail(obj)
+    return factories.EventReminderEmail(obj, kind)
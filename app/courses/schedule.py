@@ -0,0 +1,124 @@
+import datetime
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import pytz
+from django.conf import settings
+from django.db.models import QuerySet
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from courses import models
+
+SCHEDULE_RANGES = {
+    'week': 7,
+    'month': 30,
+    'semester': 183,
+}
+SCHEDULE_DEFAULT_RANGE = 'week'
+
+
+def get_schedule_timezone() -> datetime.tzinfo:
+    return pytz.timezone(settings.DEFAULT_TIMEZONE)
+
+
+def local_date(value: datetime.datetime) -> datetime.date:
+    """
+    Returns the date of `value` in `settings.DEFAULT_TIMEZONE`.
+    """
+    return timezone.localtime(value, get_schedule_timezone()).date()
+
+
+def start_of_day(date: datetime.date) -> datetime.datetime:
+    """
+    Returns the aware datetime of the midnight starting `date` in `settings.DEFAULT_TIMEZONE`.
+    """
+    return get_schedule_timezone().localize(datetime.datetime.combine(date, datetime.time.min))
+
+
+def get_user_courses(user) -> QuerySet:
+    """
+    Returns courses taught by the teacher or attended by the student.
+    """
+    if user.is_teacher:
+        return models.Course.objects.filter(teachers=user)
+    return models.Course.objects.filter(grade__students=user)
+
+
+class ScheduleDay:
+    """
+    ScheduleDay holds the lectures and laboratories of a single (local) day of a Schedule.
+    """
+
+    def __init__(self, date: datetime.date, lectures: List[models.Lecture], labs: List[models.Laboratory]):
+        self.date = date
+        self.lectures = lectures
+        self.labs = labs
+        self.is_weekend = date.weekday() >= 5
+
+
+class Schedule:
+    """
+    Schedule is a list of the user's lectures and laboratories between `start` and `end`.
+
+    Events of the whole range are fetched with a single query per event type,
+    then bucketed by their date in `settings.DEFAULT_TIMEZONE`.
+    Students get only laboratories of the groups they belong to.
+    """
+
+    def __init__(self, user, start: datetime.datetime, end: datetime.datetime):
+        self.user = user
+        self.start = start
+        self.end = end
+
+    @classmethod
+    def for_range(cls, user, range_name: str = SCHEDULE_DEFAULT_RANGE, page: int = 0,
+                  today: Optional[datetime.date] = None) -> 'Schedule':
+        """
+        Returns the `page`-th range of `SCHEDULE_RANGES[range_name]` days counting from today,
+        negative pages go back in time.
+        """
+        days = SCHEDULE_RANGES[range_name]
+        first_day = (today or local_date(timezone.now())) + datetime.timedelta(days=days * page)
+        return cls(user, start_of_day(first_day), start_of_day(first_day + datetime.timedelta(days=days)))
+
+    @classmethod
+    def upcoming(cls, user, days: int) -> 'Schedule':
+        now = timezone.now()
+        return cls(user, now, now + datetime.timedelta(days=days))
+
+    def get_lectures(self) -> QuerySet:
+        return models.Lecture.objects.filter(
+            course__in=get_user_courses(self.user), date__gte=self.start, date__lt=self.end
+        ).select_related('course__grade').order_by('date')
+
+    def get_laboratories(self) -> QuerySet:
+        laboratories = models.Laboratory.objects.filter(
+            course__in=get_user_courses(self.user), date__gte=self.start, date__lt=self.end
+        ).select_related('course__grade').order_by('date')
+        if self.user.is_student:
+            laboratories = laboratories.filter(group__students=self.user)
+        return laboratories
+
+    @cached_property
+    def lectures(self) -> List[models.Lecture]:
+        return list(self.get_lectures())
+
+    @cached_property
+    def laboratories(self) -> List[models.Laboratory]:
+        return list(self.get_laboratories())
+
+    @property
+    def dates(self) -> List[datetime.date]:
+        first_day, last_day = local_date(self.start), local_date(self.end - datetime.timedelta(microseconds=1))
+        return [first_day + datetime.timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+
+    @cached_property
+    def days(self) -> List[ScheduleDay]:
+        lectures: Dict[datetime.date, list] = defaultdict(list)
+        labs: Dict[datetime.date, list] = defaultdict(list)
+        for lecture in self.lectures:
+            lectures[local_date(lecture.date)].append(lecture)
+        for lab in self.laboratories:
+            labs[local_date(lab.date)].append(lab)
+        return [ScheduleDay(date, lectures[date], labs[date]) for date in self.dates]
@@ -0,0 +1,30 @@
+from typing import Iterable, Optional
+
+from django.db.models import Q, QuerySet
+
+from courses import models
+from courses.membership import get_user_courses, get_user_files
+
+SEARCH_KINDS = tuple(kind for kind, _ in models.SEARCH_KINDS)
+
+
+def search(user, text: str, kinds: Optional[Iterable[str]] = None) -> QuerySet:
+    """
+    Returns ranked search documents visible to the user: users and objects of the user's courses.
+    Files are visible if they are attached to a course, a lecture or a laboratory of the user's courses.
+    """
+    courses = get_user_courses(user)
+    files = get_user_files(user).values('pk')
+    documents = models.SearchDocument.objects.search(text).filter(
+        Q(kind='user') | Q(kind='file', object_pk__in=files) | Q(course__in=courses)
+    )
+    if kinds:
+        documents = documents.filter(kind__in=kinds)
+    return documents.select_related('course')
+
+
+def search_ids(kind: str, text: str) -> QuerySet:
+    """
+    Returns ids of objects of the kind matching the text, as a subquery.
+    """
+    return models.SearchDocument.objects.search(text).filter(kind=kind).order_by().values('object_pk')
@@ -1,34 +1,149 @@
 from typing import List
 
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+
 from core import celery
+from courses import blobs, calendar_sync, exports, reminders
 from courses.emails import factories
+from utils import emails
 
 from . import models
 
 
-@celery.app.task(shared=True)
-def send_new_notice_notification_email(notice: models.CourseNotice, bcc: List[str], email_to: List[str]):
+@celery.app.task(shared=True, bind=True, **emails.EMAIL_TASK_OPTIONS)
+def send_new_notice_notification_email(self, notice_pk: int, bcc: List[str], email_to: List[str]):
     """
     send_new_notice_notification_email is used to send factories.NewCourseNoticeEmail
-    email instance using celery.
+    email instances using celery. Recipients are split into batches of settings.EMAIL_BATCH_SIZE
+    handled by separate tasks, each sending its messages over a single SMTP connection.
+    Retries skip recipients already mailed by the task.
 
-    :param notice: models.CourseNotice
+    :param notice_pk: int
     :param bcc: List[str]
     :param email_to: List[str]
     """
+    if len(email_to) > settings.EMAIL_BATCH_SIZE:
+        for i, batch in enumerate(emails.batches(email_to)):
+            # `bcc` recipients get a single copy, with the first batch
+            send_new_notice_notification_email.delay(notice_pk, bcc if i == 0 else [], batch)
+        return
+    notice = models.CourseNotice.objects.select_related('course', 'sender').filter(pk=notice_pk).first()
+    if notice is None:
+        return
     email = factories.NewCourseNoticeEmail(notice, bcc)
-    email.send(email_to)
+    email.send_separately(email_to, sent_key=emails.get_sent_key(self.request.id))
 
 
-@celery.app.task(shared=True)
-def send_new_assignment_notification_email(assignment: models.Assignment, bcc: List[str], email_to: List[str]):
+@celery.app.task(shared=True, bind=True, **emails.EMAIL_TASK_OPTIONS)
+def send_new_assignment_notification_email(self, assignment_pk: int, bcc: List[str], email_to: List[str]):
     """
     send_new_assignment_notification_email is used to send factories.NewAssignmentEmail
-    email instance using celery.
+    email instances using celery. Recipients are split into batches of settings.EMAIL_BATCH_SIZE
+    handled by separate tasks, each sending its messages over a single SMTP connection.
+    Retries skip recipients already mailed by the task.
 
-    :param assignment: models.Assignment
+    :param assignment_pk: int
     :param bcc: List[str]
     :param email_to: List[str]
     """
+    if len(email_to) > settings.EMAIL_BATCH_SIZE:
+        for i, batch in enumerate(emails.batches(email_to)):
+            # `bcc` recipients get a single copy, with the first batch
+            send_new_assignment_notification_email.delay(assignment_pk, bcc if i == 0 else [], batch)
+        return
+    assignment = models.Assignment.objects.select_related(
+        'laboratory__course', 'teacher'
+    ).filter(pk=assignment_pk).first()
+    if assignment is None:
+        return
     email = factories.NewAssignmentEmail(assignment, bcc)
-    email.send(email_to)
+    email.send_separately(email_to, sent_key=emails.get_sent_key(self.request.id))
+
+
+@celery.app.task(shared=True, autoretry_for=(OSError,), retry_backoff=True, max_retries=5)
+def sync_calendar_events():
+    """
+    sync_calendar_events applies pending `models.CalendarSyncOutbox` rows to the calendar backend.
+    It is scheduled whenever an event changes and schedules itself again until the outbox is drained,
+    failed rows are retried by the periodic run.
+    """
+    if calendar_sync.process_outbox() == settings.CALENDAR_SYNC_BATCH_SIZE:
+        sync_calendar_events.delay()
+
+
+@celery.app.task(shared=True)
+def export_courses_marks(export_pk: int):
+    """
+    export_courses_marks writes the CSV of marks of `models.MarksExport` courses to the exports storage,
+    used for exports too big to be streamed within a request.
+    """
+    export = models.MarksExport.objects.filter(pk=export_pk, finished_at__isnull=True).first()
+    if export is None:
+        return
+    exports.build_marks_export(export)
+
+
+@celery.app.task(shared=True)
+def send_reminders():
+    """
+    send_reminders is run periodically by celery beat, see settings.CELERY_BEAT_SCHEDULE. It schedules reminders
+    of upcoming lectures, laboratories and deadlines of assignments and schedules itself again until all due
+    reminders are scheduled.
+    """
+    if reminders.schedule_reminders() == settings.REMINDERS_BATCH_SIZE:
+        send_reminders.delay()
+
+
+@celery.app.task(shared=True, bind=True, **emails.EMAIL_TASK_OPTIONS)
+def send_reminder_email(self, kind: str, pk: int, scheduled_for: str, email_to: List[str] = None):
+    """
+    send_reminder_email is used to send a reminder about the object of the given kind (see `reminders.REMINDERS`)
+    to its students. Recipients are split into batches of settings.EMAIL_BATCH_SIZE handled by separate tasks,
+    each sending its messages over a single SMTP connection. Retries skip recipients already mailed by the task.
+
+    :param kind: str
+    :param pk: int
+    :param scheduled_for: str - ISO formatted date of the object the reminder was scheduled for
+    :param email_to: List[str] - recipients of the batch, all students of the object if not given
+    """
+    obj = reminders.get_reminded(kind, pk, parse_datetime(scheduled_for))
+    if obj is None:
+        return
+    if email_to is None:
+        for batch in emails.batches(reminders.get_recipients(kind, obj)):
+            send_reminder_email.delay(kind, pk, scheduled_for, batch)
+        return
+    reminders.get_email(kind, obj).send_separately(email_to, sent_key=emails.get_sent_key(self.request.id))
+
+
+@celery.app.task(shared=True)
+def store_course_file_blob(course_file_pk: int):
+    """
+    store_course_file_blob is used to move the content of a directly uploaded file to its blob.
+
+    :param course_file_pk: int
+    """
+    course_file = models.CourseFile.objects.filter(pk=course_file_pk).first()
+    if course_file is not None:
+        blobs.store_file_blob(course_file)
+
+
+@celery.app.task(shared=True)
+def collect_file_blobs():
+    """
+    collect_file_blobs is run periodically by celery beat, see settings.CELERY_BEAT_SCHEDULE. It deletes
+    contents of files which aren't attached to any course, lecture or laboratory and moves a batch of files
+    uploaded before content addressing to blobs.
+    """
+    blobs.collect_file_blobs()
+    blobs.store_legacy_file_blobs()
+
+
+@celery.app.task(shared=True)
+def collect_sync_tombstones():
+    """
+    collect_sync_tombstones is run periodically by celery beat, see settings.CELERY_BEAT_SCHEDULE. It deletes
+    tombstones older than settings.SYNC_TOMBSTONES_RETENTION_DAYS.
+    """
+    models.SyncTombstone.objects.collect()
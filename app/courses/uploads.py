@@ -0,0 +1,113 @@
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+from courses import models, tasks
+
+UPLOAD_TOKEN_SALT = 'courses.uploads'
+
+# events files can be uploaded to, by the name used in upload requests
+UPLOAD_EVENTS = {
+    'lecture': models.Lecture,
+    'laboratory': models.Laboratory,
+}
+
+
+class BaseDirectUpload:
+    """
+    Direct uploads let browsers send files straight to the storage, so large files (ex. lecture recordings)
+    don't go through application workers. An upload is described by a signed token, the browser posts
+    the file with `fields` of the upload as a multipart form to its `url`.
+    """
+
+    def get_upload(self, path: str, token: str) -> Dict:
+        raise NotImplementedError
+
+
+class S3DirectUpload(BaseDirectUpload):
+    """
+    Returns presigned POST forms of S3 limited to the path of the upload and settings.DIRECT_UPLOAD_MAX_SIZE.
+    """
+
+    def get_upload(self, path: str, token: str) -> Dict:
+        storage = default_storage
+        key = storage._normalize_name(storage._clean_name(path))
+        return storage.bucket.meta.client.generate_presigned_post(
+            storage.bucket_name, key,
+            Fields={'acl': storage.default_acl},
+            Conditions=[{'acl': storage.default_acl}, ['content-length-range', 1, settings.DIRECT_UPLOAD_MAX_SIZE]],
+            ExpiresIn=settings.DIRECT_UPLOAD_EXPIRES,
+        )
+
+
+class LocalDirectUpload(BaseDirectUpload):
+    """
+    Stand-in of S3 uploads used with the filesystem storage, ex. in tests and local development.
+    Files are posted to the `courses:file-upload-local` view.
+    """
+
+    def get_upload(self, path: str, token: str) -> Dict:
+        return {'url': reverse('courses:file-upload-local'), 'fields': {'token': token}}
+
+
+def get_direct_upload() -> BaseDirectUpload:
+    return import_string(settings.DIRECT_UPLOAD_BACKEND)()
+
+
+def create_upload(teacher, event: models.Event, name: str, filename: str, description: str = '') -> Dict:
+    """
+    Returns the token and the form of the direct upload of a file of the event.
+    """
+    path = models.get_file_path(None, default_storage.get_valid_name(filename))
+    token = signing.dumps({
+        'teacher': teacher.pk,
+        'event': event._meta.model_name,
+        'event_pk': event.pk,
+        'path': path,
+        'filename': filename,
+        'name': name,
+        'description': description,
+    }, salt=UPLOAD_TOKEN_SALT)
+    return {'token': token, 'upload': get_direct_upload().get_upload(path, token)}
+
+
+def load_upload(token: str, teacher) -> Optional[Dict]:
+    """
+    Returns the upload of the valid token issued to the teacher, None otherwise.
+    """
+    try:
+        upload = signing.loads(token, salt=UPLOAD_TOKEN_SALT, max_age=settings.DIRECT_UPLOAD_EXPIRES)
+    except signing.BadSignature:
+        return None
+    return upload if upload['teacher'] == teacher.pk else None
+
+
+@transaction.atomic
+def complete_upload(upload: Dict) -> Optional[models.CourseFile]:
+    """
+    Creates the CourseFile of the uploaded file and attaches it to the event of the upload.
+    Returns None if the file wasn't uploaded, completing an upload twice returns the same file.
+    Raises ObjectDoesNotExist if the event was deleted after the upload was started.
+    """
+    # the uploaded file is moved to its blob in the background, so files are looked up by `upload_path`
+    course_file = models.CourseFile.objects.filter(upload_path=upload['path']).first()
+    if course_file is not None:
+        return course_file
+    if not default_storage.exists(upload['path']):
+        return None
+    event = UPLOAD_EVENTS[upload['event']].objects.get(pk=upload['event_pk'])
+    course_file, created = models.CourseFile.objects.get_or_create(upload_path=upload['path'], defaults={
+        'name': upload['name'], 'description': upload['description'], 'file': upload['path'],
+        'original_name': upload['filename'][:255],
+    })
+    if not created:
+        return course_file
+    event.files.add(course_file)
+    # the content is hashed in the background, see `models.FileBlob`
+    transaction.on_commit(lambda: tasks.store_course_file_blob.delay(course_file.pk))
+    return course_file
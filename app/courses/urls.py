@@ -2,8 +2,11 @@ from django.urls import include, path
 from rest_framework import routers
 
 from courses import views
-from courses.api.views import (CourseListView, CourseViewSet,
-                               additional_course_student)
+from courses.api.views import (CourseListView, CourseViewSet, SearchView,
+                               additional_course_student, course_gradebook,
+                               course_marks_import, file_upload_complete,
+                               file_upload_create, marks_export,
+                               marks_export_create)
 
 app_name = 'courses'
 
@@ -21,11 +24,17 @@ urlpatterns = [
     path('courses/<slug:the_slug>/my-marks/', views.MyCourseMarksView.as_view(), name='my-marks'),
     path('courses/<slug:the_slug>/marks/delete/<int:num>/', views.delete_course_mark, name='courses-marks-delete'),
     path('courses/marks/edit/<int:pk>/', views.CourseMarkEditView.as_view(), name='courses-marks-edit'),
+    path('courses/<slug:the_slug>/marks/export/', views.course_marks_export_view, name='courses-marks-export'),
+    path('courses/<slug:the_slug>/marks/import/', views.course_marks_import_view, name='courses-marks-import'),
+    path('courses/marks/exports/<int:pk>/', views.marks_export_download_view, name='marks-export-download'),
 
     path('courses/<slug:the_slug>/marks/final/set/<int:pk>/', views.set_final_course_mark_view, name='set-final-mark'),
     path('courses/<slug:the_slug>/marks/final/edit/<int:pk>/', views.edit_final_course_mark_view,
          name='edit-final-mark'),
 
+    path('courses/files/<int:pk>/', views.course_file_download_view, name='file-download'),
+    path('courses/files/upload/', views.file_upload_local_view, name='file-upload-local'),
+
     path('courses/lecture/<int:pk>/detail/', views.LectureDetailView.as_view(), name='lectures-detail'),
     path('courses/lecture/<int:pk>/edit/', views.LectureEditView.as_view(), name='lectures-edit'),
     path('courses/lecture/<int:pk>/file/add/', views.lecture_add_file, name='lectures-file-add'),
@@ -48,12 +57,21 @@ urlpatterns = [
     path('courses/<slug:the_slug>/groups/', views.CourseGroupJoinListView.as_view(), name='group'),
     path('courses/<slug:the_slug>/groups/create/', views.course_group_create_view, name='group-create'),
     path('courses/<slug:the_slug>/groups/join/<int:num>', views.course_group_join_view, name='group-join-group'),
+    path('courses/<slug:the_slug>/groups/auto-assign/', views.course_group_auto_assign_view,
+         name='group-auto-assign'),
     path('courses/groups/<int:pk>/', views.CourseGroupEditView.as_view(), name='group-edit'),
     path('courses/<slug:the_slug>/groups/<int:num>/delete/', views.course_group_delete_view, name='group-delete'),
 
     path('courses/<slug:the_slug>/notices/', views.CourseNoticeView.as_view(), name='notices'),
 
     path('', include(router.urls)),
-    path('api/list/courses/', CourseListView.as_view()),
+    path('api/list/courses/', CourseListView.as_view(), name='api-courses-list'),
+    path('api/search/', SearchView.as_view(), name='api-search'),
+    path('api/files/uploads/', file_upload_create, name='api-file-upload'),
+    path('api/files/uploads/complete/', file_upload_complete, name='api-file-upload-complete'),
     path('api/courses/<slug:the_slug>/additional-student/', additional_course_student),
+    path('api/courses/<slug:the_slug>/gradebook/', course_gradebook, name='api-gradebook'),
+    path('api/courses/<slug:the_slug>/marks/import/', course_marks_import, name='api-marks-import'),
+    path('api/marks/exports/', marks_export_create, name='api-marks-export-create'),
+    path('api/marks/exports/<int:pk>/', marks_export, name='api-marks-export'),
 ]
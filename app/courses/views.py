@@ -1,30 +1,39 @@
+import csv
 import datetime
+import mimetypes
 from typing import List
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.files.storage import default_storage
+from django.http import (FileResponse, HttpResponse, HttpResponseBadRequest,
+                         StreamingHttpResponse)
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views import generic
 from django.views.generic.detail import DetailView
 
-from core import settings
-from courses import forms, models, tasks
+from courses import cache as course_cache
+from courses import exports, forms, imports, models, search, tasks, uploads
+from courses.gradebook import GradeBook
+from courses.membership import (CourseMembership, CourseMembershipMixin,
+                                get_membership, get_user_files)
 from users import models as users_models
-from utils.meetings import meetings
+from users import presence
+from utils import responses
 
+# max number of invalid rows of a marks import listed to the teacher
+MARKS_IMPORT_MAX_MESSAGES = 10
 
-class CoursesGuardianPermissionMixin(LoginRequiredMixin, DetailView):
+
+class CoursesGuardianPermissionMixin(CourseMembershipMixin, LoginRequiredMixin, DetailView):
     def get(self, request, *args, **kwargs):
         user = request.user
-        if user.is_student:
-            student = users_models.Student.objects.get(email=user.email)
-            if student not in self.get_object().grade.students.all():
-                return redirect('courses:courses')
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-            if teacher not in self.get_object().teachers.all():
-                return redirect('courses:courses')
-        return super().get(self, request, *args, **kwargs)
+        if user.is_student and not self.membership.is_student(self.get_object()):
+            return redirect('courses:courses')
+        if user.is_teacher and not self.membership.is_teacher(self.get_object()):
+            return redirect('courses:courses')
+        return super().get(request, *args, **kwargs)
 
 
 class CourseView(LoginRequiredMixin, generic.View):
@@ -75,11 +84,13 @@ class CourseView(LoginRequiredMixin, generic.View):
         query = request.GET
         if 'name' in query:
             name = query.get('name')
-            courses_qs = courses_qs.filter(name__icontains=name)
+            if name:
+                courses_qs = courses_qs.filter(pk__in=search.search_ids('course', name))
             context['q_name'] = name
         if 'teacher' in query:
             teacher = query.get('teacher')
-            courses_qs = courses_qs.filter(head_teacher__last_name__icontains=teacher)
+            if teacher:
+                courses_qs = courses_qs.filter(head_teacher__in=search.search_ids('user', teacher))
             context['q_teacher'] = teacher
         if 'has_exam' in query:
             has_exam = query.get('has_exam')
@@ -123,22 +134,21 @@ class CoursesDetailView(CoursesGuardianPermissionMixin):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['available_lectures'] = [lecture for lecture in self.object.lectures.all() if lecture.is_available]
-        labs = self.object.laboratories.all().order_by('date')
+        detail = course_cache.get_course_detail(self.object)
+        context['course'] = detail['course']
+        context['available_lectures'] = [lecture for lecture in detail['lectures'] if lecture.is_available]
+        labs = detail['laboratories']
+        students_without_groups = detail['ungrouped_students']
         if self.request.user.is_teacher:
             context['available_labs'] = [lab for lab in labs if lab.is_available]
         else:
             user = self.request.user
-            student = users_models.Student.objects.get(pk=user.pk)
-            course = self.get_object()
-            if student in course.students_without_groups:
+            if user.pk in students_without_groups:
                 context['available_labs'] = []
             else:
-                student_group = models.CourseGroup.objects.filter(
-                    course=course, students__email__contains=student.email
-                ).first()
-                context['available_labs'] = [lab for lab in labs if (lab.is_available and student_group == lab.group)]
-        context['student_without_groups_emails'] = [student.email for student in self.object.students_without_groups]
+                group_id = detail['student_groups'].get(user.pk)
+                context['available_labs'] = [lab for lab in labs if (lab.is_available and group_id == lab.group_id)]
+        context['student_without_groups_emails'] = list(students_without_groups.values())
         return context
 
 
@@ -198,10 +208,8 @@ def course_group_create_view(request, the_slug):
         return redirect('courses:courses')
     if not user.is_authenticated or user.is_student:
         return redirect('courses:courses')
-    if user.is_teacher:
-        teacher = users_models.Teacher.objects.get(email=user.email)
-        if teacher not in course.teachers.all():
-            return redirect('courses:courses')
+    if user.is_teacher and not get_membership(request).is_teacher(course):
+        return redirect('courses:courses')
 
     form = forms.CourseGroupModelForm(request.POST)
     form.fields['students'].queryset = course.grade.students.all()
@@ -234,15 +242,38 @@ def course_group_delete_view(request, the_slug, num):
         return redirect('courses:courses')
     if not user.is_authenticated or user.is_student:
         return redirect('courses:courses')
-    if user.is_teacher:
-        teacher = users_models.Teacher.objects.get(email=user.email)
-        if teacher not in group.course.teachers.all():
-            return redirect('courses:courses')
+    if user.is_teacher and not get_membership(request).is_teacher(group.course):
+        return redirect('courses:courses')
     group.delete()
     messages.info(request, 'Pomyślnie usunięto grupe.')
     return redirect('courses:group', the_slug=the_slug)
 
 
+def course_group_auto_assign_view(request, the_slug):
+    """
+    View used to handle /courses/<slug:the_slug>/groups/auto-assign/ POST requests.
+    View is used by teachers to assign all students without groups to groups of the given size.
+
+    **Template:**
+
+    :template:`None`
+    """
+    user = request.user
+    if not user.is_authenticated or not user.is_teacher:
+        return redirect('courses:courses')
+    course = get_object_or_404(models.Course, slug=the_slug)
+    if not get_membership(request).is_teacher(course):
+        return redirect('courses:courses')
+    if request.method == 'POST':
+        form = forms.CourseGroupAutoAssignForm(request.POST)
+        if form.is_valid():
+            assigned = course.assign_students_to_groups(form.cleaned_data['group_size'])
+            messages.info(request, f'Pomyślnie przydzielono studentów do grup ({assigned}).')
+        else:
+            messages.error(request, 'Spróbuj ponownie.')
+    return redirect('courses:group', the_slug=the_slug)
+
+
 def course_group_join_view(request, the_slug, num):
     """
     View used to handle /courses/<slug:the_slug>/groups/join/<int:num> GET requests.
@@ -262,7 +293,8 @@ def course_group_join_view(request, the_slug, num):
         course_group = course.groups.all()[num]
         if course_group:
             student = users_models.Student.objects.get(email=user.email)
-            if student in course.grade.students.all() and student in course.students_without_groups:
+            if get_membership(request).is_student(course) and \
+                    course.ungrouped_students().filter(pk=student.pk).exists():
                 course_group.students.add(student)
                 course_group.save()
                 messages.info(request, 'Pomyślnie dołączyłeś do grupy.')
@@ -296,6 +328,12 @@ class CourseEditView(CoursesDetailView):
     ``student_without_groups_emails``
         An instance of `users.Student` - all students without group
 
+    ``students``
+        A list of `users.Student` - all students of the course's grade
+
+    ``online_students``
+        A set of ids of the online students
+
     **Template:**
 
     :template:`courses/courses-detail-edit.html`
@@ -306,26 +344,24 @@ class CourseEditView(CoursesDetailView):
         context = super().get_context_data(**kwargs)
         context['lectures'] = self.object.lectures.all()
         context['laboratories'] = self.object.laboratories.all()
+        context['students'] = list(self.object.grade.students.all())
+        context['online_students'] = presence.get_online(student.pk for student in context['students'])
         return context
 
     def get(self, request, *args, **kwargs):
         user = request.user
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-            if teacher not in self.get_object().teachers.all():
-                return redirect('courses:courses')
+        if user.is_teacher and not self.membership.is_teacher(self.get_object()):
+            return redirect('courses:courses')
         if user.is_student:
             return redirect('courses:courses')
         return super().get(request, *args, **kwargs)
 
     def post(self, request, *args, **kwargs):
         user = request.user
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-            if teacher not in self.get_object().teachers.all():
-                return redirect('courses:courses')
+        if user.is_teacher and not self.membership.is_teacher(self.get_object()):
+            return redirect('courses:courses')
 
-        course = models.Course.objects.get(slug=kwargs.get('the_slug'))
+        course = self.get_object()
         data = request.POST
         if data:
             course_name = data.get('name')
@@ -340,7 +376,7 @@ class CourseEditView(CoursesDetailView):
         return super().get(request, *args, **kwargs)
 
 
-class CourseGroupEditView(DetailView):
+class CourseGroupEditView(CourseMembershipMixin, DetailView):
     """
     View used to handle /courses/groups/<int:pk>/ GET/POST requests.
     View is used by teachers to edit specified group within the course.
@@ -377,20 +413,16 @@ class CourseGroupEditView(DetailView):
         user = request.user
         if not user.is_authenticated or user.is_student:
             return redirect('courses:courses')
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-            if teacher not in self.get_object().course.teachers.all():
-                return redirect('courses:courses')
+        if user.is_teacher and not self.membership.is_teacher(self.get_object().course):
+            return redirect('courses:courses')
         return super().get(request, *args, **kwargs)
 
     def post(self, request, *args, **kwargs):
         user = request.user
         if not user.is_authenticated or user.is_student:
             return redirect('courses:courses')
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-            if teacher not in self.get_object().course.teachers.all():
-                return redirect('courses:courses')
+        if user.is_teacher and not self.membership.is_teacher(self.get_object().course):
+            return redirect('courses:courses')
         group = self.get_object()
         form = forms.CourseGroupModelForm(request.POST)
         if form.is_valid():
@@ -406,7 +438,7 @@ class CourseGroupEditView(DetailView):
         return super().get(request, *args, **kwargs)
 
 
-class LectureDetailView(LoginRequiredMixin, DetailView):
+class LectureDetailView(CourseMembershipMixin, LoginRequiredMixin, DetailView):
     """
     View used to handle /courses/lecture/<int:pk>/detail/ GET requests.
 
@@ -437,14 +469,10 @@ class LectureDetailView(LoginRequiredMixin, DetailView):
         user = request.user
         if not user.is_authenticated:
             return redirect('courses:courses')
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-            if teacher not in self.get_object().course.teachers.all():
-                return redirect('courses:courses')
-        if user.is_student:
-            student = users_models.Student.objects.get(email=user.email)
-            if student not in self.get_object().course.grade.students.all():
-                return redirect('courses:courses')
+        if user.is_teacher and not self.membership.is_teacher(self.get_object().course):
+            return redirect('courses:courses')
+        if user.is_student and not self.membership.is_student(self.get_object().course):
+            return redirect('courses:courses')
         return super().get(request, *args, **kwargs)
 
 
@@ -479,18 +507,14 @@ class LaboratoryDetailView(LectureDetailView):
         user = request.user
         if not user.is_authenticated:
             return redirect('courses:courses')
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-            if teacher not in self.get_object().course.teachers.all():
-                return redirect('courses:courses')
-        if user.is_student:
-            student = users_models.Student.objects.get(email=user.email)
-            if student not in self.get_object().group.students.all():
-                return redirect('courses:courses')
+        if user.is_teacher and not self.membership.is_teacher(self.get_object().course):
+            return redirect('courses:courses')
+        if user.is_student and not self.membership.is_group_student(self.get_object().group):
+            return redirect('courses:courses')
         return super().get(request, *args, **kwargs)
 
 
-class LaboratoryEditView(LoginRequiredMixin, DetailView):
+class LaboratoryEditView(CourseMembershipMixin, LoginRequiredMixin, DetailView):
     """
     View used to handle /courses/laboratory/<int:pk>/edit/ GET/POST requests.
     Views is used by teachers to edit specified laboratory.
@@ -535,20 +559,16 @@ class LaboratoryEditView(LoginRequiredMixin, DetailView):
         user = request.user
         if not user.is_authenticated or user.is_student:
             return redirect('courses:courses')
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-            if teacher not in self.get_object().course.teachers.all():
-                return redirect('courses:courses')
+        if user.is_teacher and not self.membership.is_teacher(self.get_object().course):
+            return redirect('courses:courses')
         return super().get(request, *args, **kwargs)
 
     def post(self, request, *args, **kwargs):
         user = request.user
         if not user.is_authenticated or user.is_student:
             return redirect('courses:courses')
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-            if teacher not in self.get_object().course.teachers.all():
-                return redirect('courses:courses')
+        if user.is_teacher and not self.membership.is_teacher(self.get_object().course):
+            return redirect('courses:courses')
 
         context = self.get_context_data(**kwargs)
         form = forms.LaboratoryCreateForm(request.POST)
@@ -597,40 +617,6 @@ class LaboratoryEditView(LoginRequiredMixin, DetailView):
                 laboratory.group = group
                 laboratory.save()
 
-                if laboratory.event_id and laboratory.create_event and settings.USE_GOOGLE_API:
-                    meeting = meetings.update_google_calendar_event(
-                        event_id=laboratory.event_id,
-                        data={
-                            'start': laboratory.date,
-                            'end': laboratory.date + laboratory.duration,
-                            'description': laboratory.description,
-                            'location': laboratory.location
-                        }
-                    )
-                    laboratory.event_id = meeting.get('id', '')
-                    laboratory.hangout_link = meeting.get('hangoutLink', '')
-                elif not laboratory.create_event and laboratory.event_id and settings.USE_GOOGLE_API:
-                    meetings.delete_google_calendar_event(laboratory.event_id)
-                    laboratory.event_id = ''
-                    laboratory.hangout_link = ''
-                    laboratory.save()
-                    messages.info(request, 'Pomyślnie zaktualizowano laboratorium! Usunieto wydarzenie!')
-                    return redirect('courses:laboratory-edit', pk=laboratory.pk)
-                elif laboratory.create_event and settings.USE_GOOGLE_API:
-                    meeting = meetings.create_google_calendar_event(
-                        title=laboratory.title,
-                        location=laboratory.location or '',
-                        description=laboratory.description or '',
-                        start_date=laboratory.date,
-                        end_date=laboratory.date + laboratory.duration,
-                        organizer_email=laboratory.course.head_teacher.email,
-                        attendees=[student.email for student in laboratory.group.students.all()],
-                        create_meet=True
-                    )
-                    laboratory.event_id = meeting.get('id', '')
-                    laboratory.hangout_link = meeting.get('hangoutLink', '')
-                laboratory.save()
-
                 messages.info(request, 'Pomyślnie utworzono nowe laboratorium!')
                 return redirect('courses:laboratory-edit', pk=laboratory.pk)
             else:
@@ -640,7 +626,7 @@ class LaboratoryEditView(LoginRequiredMixin, DetailView):
         return render(request, self.template_name, context)
 
 
-class LectureEditView(LoginRequiredMixin, DetailView):
+class LectureEditView(CourseMembershipMixin, LoginRequiredMixin, DetailView):
     """
     View used to handle /courses/lecture/<int:pk>/edit/ GET/POST requests.
     Views is used by teachers to edit specified lecture.
@@ -682,20 +668,16 @@ class LectureEditView(LoginRequiredMixin, DetailView):
         user = request.user
         if not user.is_authenticated or user.is_student:
             return redirect('courses:courses')
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-            if teacher not in self.get_object().course.teachers.all():
-                return redirect('courses:courses')
+        if user.is_teacher and not self.membership.is_teacher(self.get_object().course):
+            return redirect('courses:courses')
         return super().get(request, *args, **kwargs)
 
     def post(self, request, *args, **kwargs):
         user = request.user
         if not user.is_authenticated or user.is_student:
             return redirect('courses:courses')
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-            if teacher not in self.get_object().course.teachers.all():
-                return redirect('courses:courses')
+        if user.is_teacher and not self.membership.is_teacher(self.get_object().course):
+            return redirect('courses:courses')
 
         context = self.get_context_data(**kwargs)
         form = forms.LectureCreateForm(request.POST)
@@ -738,41 +720,6 @@ class LectureEditView(LoginRequiredMixin, DetailView):
                 lecture.create_event = meeting == 'on'
 
                 lecture.save()
-
-                if lecture.create_event and lecture.event_id and lecture.create_event and \
-                        settings.USE_GOOGLE_API:
-                    meeting = meetings.update_google_calendar_event(
-                        event_id=lecture.event_id,
-                        data={
-                            'start': lecture.date,
-                            'end': lecture.date + lecture.duration,
-                            'description': lecture.description,
-                            'location': lecture.location
-                        }
-                    )
-                    lecture.event_id = meeting.get('id', '')
-                    lecture.hangout_link = meeting.get('hangoutLink', '')
-                elif not lecture.create_event and lecture.event_id and settings.USE_GOOGLE_API:
-                    meetings.delete_google_calendar_event(lecture.event_id)
-                    lecture.event_id = ''
-                    lecture.hangout_link = ''
-                    lecture.save()
-                    messages.info(request, 'Pomyślnie zaktualizowano wykład! Usunieto wydarzenie!')
-                    return redirect('courses:lectures-edit', pk=lecture.pk)
-                elif lecture.create_event and settings.USE_GOOGLE_API:
-                    meeting = meetings.create_google_calendar_event(
-                        title=lecture.title,
-                        location=lecture.location or '',
-                        description=lecture.description or '',
-                        start_date=lecture.date,
-                        end_date=lecture.date + lecture.duration,
-                        organizer_email=lecture.course.head_teacher.email,
-                        attendees=[student.email for student in lecture.course.grade.students.all()],
-                        create_meet=True
-                    )
-                    lecture.event_id = meeting.get('id', '')
-                    lecture.hangout_link = meeting.get('hangoutLink', '')
-                lecture.save()
                 messages.info(request, 'Pomyślnie zaktualizowano wykład!')
                 return redirect('courses:lectures-edit', pk=lecture.pk)
             else:
@@ -782,7 +729,7 @@ class LectureEditView(LoginRequiredMixin, DetailView):
         return render(request, self.template_name, context)
 
 
-class LaboratoryCreateView(LoginRequiredMixin, DetailView):
+class LaboratoryCreateView(CourseMembershipMixin, LoginRequiredMixin, DetailView):
     """
     View used to handle /courses/<slug:the_slug>/laboratory/create/ GET/POST requests.
     Views is used by teachers to create new laboratory.
@@ -821,10 +768,8 @@ class LaboratoryCreateView(LoginRequiredMixin, DetailView):
         user = request.user
         if not user.is_authenticated or user.is_student:
             return redirect('courses:courses')
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-            if teacher not in self.get_object().teachers.all():
-                return redirect('courses:courses')
+        if user.is_teacher and not self.membership.is_teacher(self.get_object()):
+            return redirect('courses:courses')
 
         return super().get(request, *args, **kwargs)
 
@@ -832,10 +777,8 @@ class LaboratoryCreateView(LoginRequiredMixin, DetailView):
         user = request.user
         if not user.is_authenticated or user.is_student:
             return redirect('courses:courses')
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-            if teacher not in self.get_object().teachers.all():
-                return redirect('courses:courses')
+        if user.is_teacher and not self.membership.is_teacher(self.get_object()):
+            return redirect('courses:courses')
 
         form = forms.LaboratoryCreateForm(request.POST)
 
@@ -883,21 +826,6 @@ class LaboratoryCreateView(LoginRequiredMixin, DetailView):
                     show=show == 'on',
                     create_event=meeting == 'on',
                 )
-                laboratory.save()
-                if laboratory.create_event and settings.USE_GOOGLE_API:
-                    meeting = meetings.create_google_calendar_event(
-                        title=laboratory.title,
-                        location=laboratory.location or '',
-                        description=laboratory.description or '',
-                        start_date=laboratory.date,
-                        end_date=laboratory.date + laboratory.duration,
-                        organizer_email=laboratory.course.head_teacher.email,
-                        attendees=[student.email for student in laboratory.group.students.all()],
-                        create_meet=True
-                    )
-                    laboratory.event_id = meeting.get('id', '')
-                    laboratory.hangout_link = meeting.get('hangoutLink', '')
-                    laboratory.save()
                 messages.info(request, 'Pomyślnie utworzono nowe laboratorium!')
                 return redirect('courses:laboratory-detail', pk=laboratory.pk)
             else:
@@ -907,7 +835,7 @@ class LaboratoryCreateView(LoginRequiredMixin, DetailView):
         return render(request, self.template_name, self.get_context_data(**kwargs))
 
 
-class LectureCreateView(LoginRequiredMixin, DetailView):
+class LectureCreateView(CourseMembershipMixin, LoginRequiredMixin, DetailView):
     """
     View used to handle /courses/<slug:the_slug>/lecture/create/ GET/POST requests.
     Views is used by teachers to create new lecture.
@@ -941,10 +869,8 @@ class LectureCreateView(LoginRequiredMixin, DetailView):
         user = request.user
         if not user.is_authenticated or user.is_student:
             return redirect('courses:courses')
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-            if teacher not in self.get_object().teachers.all():
-                return redirect('courses:courses')
+        if user.is_teacher and not self.membership.is_teacher(self.get_object()):
+            return redirect('courses:courses')
 
         return super().get(request, *args, **kwargs)
 
@@ -952,10 +878,8 @@ class LectureCreateView(LoginRequiredMixin, DetailView):
         user = request.user
         if not user.is_authenticated or user.is_student:
             return redirect('courses:courses')
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-            if teacher not in self.get_object().teachers.all():
-                return redirect('courses:courses')
+        if user.is_teacher and not self.membership.is_teacher(self.get_object()):
+            return redirect('courses:courses')
 
         form = forms.LectureCreateForm(request.POST)
 
@@ -997,22 +921,6 @@ class LectureCreateView(LoginRequiredMixin, DetailView):
                     show=show == 'on',
                     create_event=meeting == 'on',
                 )
-                lecture.save()
-
-                if lecture.create_event and settings.USE_GOOGLE_API:
-                    meeting = meetings.create_google_calendar_event(
-                        title=lecture.title,
-                        location=lecture.location or '',
-                        description=lecture.description or '',
-                        start_date=lecture.date,
-                        end_date=lecture.date + lecture.duration,
-                        organizer_email=lecture.course.head_teacher.email,
-                        attendees=[student.email for student in lecture.course.grade.students.all()],
-                        create_meet=True
-                    )
-                    lecture.event_id = meeting.get('id', '')
-                    lecture.hangout_link = meeting.get('hangoutLink', '')
-                lecture.save()
 
                 messages.info(request, 'Pomyślnie utworzono nowy wykład!')
                 return redirect('courses:lectures-detail', pk=lecture.pk)
@@ -1039,11 +947,7 @@ def delete_lecture_view(request, the_slug, num):
         return redirect('courses:courses')
     course = models.Course.objects.get(slug=the_slug)
     if course:
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-        else:
-            redirect('courses:courses')
-        if teacher not in course.teachers.all():
+        if not get_membership(request).is_teacher(course):
             return redirect('courses:courses')
         lecture = course.lectures.all()[num]
         lecture.delete()
@@ -1074,11 +978,7 @@ def lecture_add_file(request, pk):
         return redirect('courses:courses')
     lecture = models.Lecture.objects.get(pk=pk)
     if lecture:
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-        else:
-            redirect('courses:courses')
-        if teacher not in lecture.course.teachers.all():
+        if not get_membership(request).is_teacher(lecture.course):
             return redirect('courses:courses')
 
         if request.method == 'GET':
@@ -1127,11 +1027,7 @@ def laboratory_add_file(request, pk):
         return redirect('courses:courses')
     laboratory = models.Laboratory.objects.get(pk=pk)
     if laboratory:
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-        else:
-            redirect('courses:courses')
-        if teacher not in laboratory.course.teachers.all():
+        if not get_membership(request).is_teacher(laboratory.course):
             return redirect('courses:courses')
 
         if request.method == 'GET':
@@ -1158,6 +1054,56 @@ def laboratory_add_file(request, pk):
     return redirect('courses:laboratory-edit', pk=laboratory.pk)
 
 
+def course_file_download_view(request, pk):
+    """
+    View used to handle /courses/files/<int:pk>/ GET requests.
+    Views is used to download a file of the user's courses. Files of S3 are downloaded from S3,
+    files of the filesystem are sent by nginx (X-Accel-Redirect) if settings.FILES_ACCEL_REDIRECT_PREFIX is set,
+    otherwise they are streamed with support of range requests.
+
+    **Template:**
+
+    :template:`None`
+    """
+    user = request.user
+    if not user.is_authenticated:
+        return redirect('courses:courses')
+    course_file = get_object_or_404(get_user_files(user), pk=pk)
+    if settings.USE_S3:
+        return redirect(course_file.file.url)
+    if settings.FILES_ACCEL_REDIRECT_PREFIX:
+        response = HttpResponse(content_type=mimetypes.guess_type(course_file.filename)[0] or '')
+        response['X-Accel-Redirect'] = settings.FILES_ACCEL_REDIRECT_PREFIX + course_file.file.name
+        response['Content-Disposition'] = responses.get_content_disposition(course_file.filename, False)
+        return response
+    return responses.ranged_file_response(
+        request, course_file.file.open('rb'), course_file.file.size, course_file.filename,
+        etag=f'{course_file.pk}-{course_file.updated_at.timestamp()}',
+    )
+
+
+def file_upload_local_view(request):
+    """
+    View used to handle /courses/files/upload/ POST requests.
+    Views is used to receive files of direct uploads when files are stored in the filesystem,
+    see `courses.uploads.LocalDirectUpload`.
+
+    **Template:**
+
+    :template:`None`
+    """
+    user = request.user
+    if not user.is_authenticated or not user.is_teacher or request.method != 'POST':
+        return redirect('courses:courses')
+    upload = uploads.load_upload(request.POST.get('token', ''), user)
+    file = request.FILES.get('file')
+    if upload is None or file is None or file.size > settings.DIRECT_UPLOAD_MAX_SIZE:
+        return HttpResponseBadRequest()
+    if default_storage.exists(upload['path']) or default_storage.save(upload['path'], file) != upload['path']:
+        return HttpResponseBadRequest()
+    return HttpResponse(status=204)
+
+
 def delete_lecture_file(request, pk, num):
     """
     View used to handle /courses/lecture/<int:pk>/file/delete/<int:num>/ GET requests.
@@ -1172,11 +1118,7 @@ def delete_lecture_file(request, pk, num):
         return redirect('courses:courses')
     lecture = models.Lecture.objects.get(pk=pk)
     if lecture:
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-        else:
-            redirect('courses:courses')
-        if teacher not in lecture.course.teachers.all():
+        if not get_membership(request).is_teacher(lecture.course):
             return redirect('courses:courses')
 
         file = lecture.files.all()[num]
@@ -1200,11 +1142,7 @@ def delete_laboratory_file(request, pk, num):
         return redirect('courses:courses')
     laboratory = models.Laboratory.objects.get(pk=pk)
     if laboratory:
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-        else:
-            redirect('courses:courses')
-        if teacher not in laboratory.course.teachers.all():
+        if not get_membership(request).is_teacher(laboratory.course):
             return redirect('courses:courses')
 
         file = laboratory.files.all()[num]
@@ -1214,7 +1152,7 @@ def delete_laboratory_file(request, pk, num):
     return redirect('courses:laboratory-edit', pk=laboratory.pk)
 
 
-class CourseNoticeView(LoginRequiredMixin, DetailView):
+class CourseNoticeView(CourseMembershipMixin, LoginRequiredMixin, DetailView):
     """
     View used to handle /courses/<slug:the_slug>/notices/ GET/POST requests.
     Views is used to edit and view notices.
@@ -1257,14 +1195,10 @@ class CourseNoticeView(LoginRequiredMixin, DetailView):
         user = request.user
         if not user.is_authenticated:
             return redirect('courses:courses')
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-            if teacher not in self.get_object().teachers.all():
-                return redirect('courses:courses')
-        if user.is_student:
-            student = users_models.Student.objects.get(email=user.email)
-            if student not in self.get_object().grade.students.all():
-                return redirect('courses:courses')
+        if user.is_teacher and not self.membership.is_teacher(self.get_object()):
+            return redirect('courses:courses')
+        if user.is_student and not self.membership.is_student(self.get_object()):
+            return redirect('courses:courses')
 
         return super().get(request, *args, **kwargs)
 
@@ -1272,10 +1206,8 @@ class CourseNoticeView(LoginRequiredMixin, DetailView):
         user = request.user
         if not user.is_authenticated:
             return redirect('courses:courses')
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-            if teacher not in self.get_object().teachers.all():
-                return redirect('courses:courses')
+        if user.is_teacher and not self.membership.is_teacher(self.get_object()):
+            return redirect('courses:courses')
         if user.is_student:
             return super().get(request, *args, **kwargs)
 
@@ -1283,24 +1215,20 @@ class CourseNoticeView(LoginRequiredMixin, DetailView):
 
         if form.is_valid():
             notice = form.save(commit=False)
-            notice.sender = users_models.Teacher.objects.get(email=user.email)
+            notice.sender_id = user.pk
             notice.course = self.get_object()
             notice.save()
-            for student in notice.not_viewed.all():
-                notice.not_viewed.remove(student)
-            for student in self.get_object().grade.students.all():
-                notice.not_viewed.add(student)
-            notice.save()
+            notice.publish()
             messages.info(request, 'Pomyślnie utworzono nowe ogłoszenie!')
 
-            students_emails = [student.email for student in notice.course.grade.students.all()]
-            tasks.send_new_notice_notification_email(notice, bcc=[], email_to=students_emails)
+            students_emails = list(self.get_object().grade.students.values_list('email', flat=True))
+            tasks.send_new_notice_notification_email.delay(notice.pk, bcc=[], email_to=students_emails)
         else:
             messages.error(request, 'Spróbuj ponownie!')
         return super().get(request, *args, **kwargs)
 
 
-class MyCourseMarksView(LoginRequiredMixin, DetailView):
+class MyCourseMarksView(CourseMembershipMixin, LoginRequiredMixin, DetailView):
     """
     View used to handle /courses/<slug:the_slug>/my-marks/ GET requests.
     Views is used by students to view theirs marks at specified course.
@@ -1328,27 +1256,26 @@ class MyCourseMarksView(LoginRequiredMixin, DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data()
-        context['final_mark'] = models.FinalCourseMark.objects.filter(student__email=self.request.user.email,
-                                                                      course=self.get_object()).first()
-        context['marks'] = models.CourseMark.objects.filter(student__email=self.request.user.email,
-                                                            course=self.get_object())
+        context['final_mark'] = models.FinalCourseMark.objects.filter(
+            student__email=self.request.user.email, course=self.object
+        ).select_related('teacher').first()
+        context['marks'] = models.CourseMark.objects.filter(
+            student__email=self.request.user.email, course=self.object
+        ).select_related('student', 'teacher')
         return context
 
     def get(self, request, *args, **kwargs):
         user = request.user
-        if user.is_student:
-            student = users_models.Student.objects.get(email=user.email)
-            if student not in self.get_object().grade.students.all():
-                return redirect('courses:courses')
+        if user.is_student and not self.membership.is_student(self.get_object()):
+            return redirect('courses:courses')
         if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-            if teacher not in self.get_object().teachers.all():
+            if not self.membership.is_teacher(self.get_object()):
                 return redirect('courses:courses')
             return redirect('courses:courses-marks', the_slug=self.kwargs.get('the_slug'))
         return super().get(request, *args, **kwargs)
 
 
-class CourseMarksView(LoginRequiredMixin, DetailView):
+class CourseMarksView(CourseMembershipMixin, LoginRequiredMixin, DetailView):
     """
     View used to handle /courses/<slug:the_slug>/marks/ GET/POST requests.
     Views is used to explore and edit marks at specified course.
@@ -1358,6 +1285,9 @@ class CourseMarksView(LoginRequiredMixin, DetailView):
     ``form``
         An instance of `courses.forms.CourseMarkModelForm`
 
+    ``import_form``
+        An instance of `courses.forms.MarksImportForm`
+
     ``course``
         An instance of `courses.Course`
 
@@ -1378,34 +1308,23 @@ class CourseMarksView(LoginRequiredMixin, DetailView):
     def get_context_data(self, **kwargs):
         context = {
             'form': self.get_form_class(**kwargs),
-            'course': self.get_object(),
+            'import_form': forms.MarksImportForm(),
+            'course': self.object,
         }
         return context
 
-    def get_object(self, queryset=None):
-        return get_object_or_404(models.Course, slug=self.kwargs.get(self.slug_url_kwarg))
-
     def get(self, request, *args, **kwargs):
         user = request.user
         if user.is_student:
             return redirect('courses:courses')
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-            if teacher not in self.get_object().teachers.all():
-                return redirect('courses:courses')
+        self.object = self.get_object()
+        if user.is_teacher and not self.membership.is_teacher(self.object):
+            return redirect('courses:courses')
         context = self.get_context_data(**kwargs)
-        marks = self.get_object().marks.all()
+        marks = self.object.marks.select_related('student', 'teacher')
 
         if request.GET.get('student'):
-            name_partial = request.GET.get('student').split(' ')
-            if len(name_partial) == 1:
-                marks = marks.filter(student__first_name__contains=name_partial[0])
-            if len(name_partial) == 2:
-                marks = marks.filter(student__first_name__contains=name_partial[0])
-                marks = marks.filter(student__last_name__contains=name_partial[1])
-            if len(name_partial) > 2:
-                marks = marks.filter(student__first_name__contains=name_partial[0])
-                marks = marks.filter(student__last_name__contains=name_partial[1])
+            marks = marks.filter(student__in=search.search_ids('user', request.GET.get('student')))
         context['marks'] = marks
         context['student'] = request.GET.get('student', '')
         return render(request, self.template_name, context)
@@ -1414,10 +1333,8 @@ class CourseMarksView(LoginRequiredMixin, DetailView):
         user = request.user
         if user.is_student:
             return redirect('courses:courses')
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-            if teacher not in self.get_object().teachers.all():
-                return redirect('courses:courses')
+        if user.is_teacher and not self.membership.is_teacher(self.get_object()):
+            return redirect('courses:courses')
 
         form = self.form_class(request.POST)
         email = request.POST.get('email')
@@ -1427,9 +1344,9 @@ class CourseMarksView(LoginRequiredMixin, DetailView):
             except Exception:
                 messages.error(request, 'Nie znaleziono studenta!')
                 return super().get(request, *args, **kwargs)
-            if student and student in self.get_object().grade.students.all():
+            if student and CourseMembership(student).is_student(self.get_object()):
                 mark = form.save(commit=False)
-                mark.teacher = users_models.Teacher.objects.get(email=user.email)
+                mark.teacher_id = user.pk
                 mark.course = self.get_object()
                 mark.student = student
                 mark.save()
@@ -1439,7 +1356,7 @@ class CourseMarksView(LoginRequiredMixin, DetailView):
         return self.get(request, *args, **kwargs)
 
 
-class TotalCourseMarkView(LoginRequiredMixin, DetailView):
+class TotalCourseMarkView(CourseMembershipMixin, LoginRequiredMixin, DetailView):
     """
     View used to handle /courses/<slug:the_slug>/total-marks/ GET requests.
     Views is used to explore student's marks summary.
@@ -1449,6 +1366,9 @@ class TotalCourseMarkView(LoginRequiredMixin, DetailView):
     ``course``
         An instance of `courses.Course`
 
+    ``gradebook``
+        An instance of `courses.gradebook.GradeBook` of the filtered students
+
     **Template:**
 
     :template:`courses/marks/total-marks.html`
@@ -1465,37 +1385,25 @@ class TotalCourseMarkView(LoginRequiredMixin, DetailView):
         }
         return context
 
-    def get_object(self, queryset=None):
-        return get_object_or_404(models.Course, slug=self.kwargs.get(self.slug_url_kwarg))
-
     def get(self, request, *args, **kwargs):
         user = request.user
         if user.is_student:
             return redirect('courses:courses')
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-            if teacher not in self.get_object().teachers.all():
-                return redirect('courses:courses')
+        if user.is_teacher and not self.membership.is_teacher(self.get_object()):
+            return redirect('courses:courses')
         context = self.get_context_data(**kwargs)
         students = self.get_object().grade.students.all()
 
         if request.GET.get('student'):
-            name_partial = request.GET.get('student').split(' ')
-            if len(name_partial) == 1:
-                students = students.filter(first_name__contains=name_partial[0])
-            if len(name_partial) == 2:
-                students = students.filter(first_name__contains=name_partial[0])
-                students = students.filter(last_name__contains=name_partial[1])
-            if len(name_partial) > 2:
-                students = students.filter(first_name__contains=name_partial[0])
-                students = students.filter(last_name__contains=name_partial[1])
-
-        context['students'] = students
+            students = students.filter(pk__in=search.search_ids('user', request.GET.get('student')))
+
+        context['gradebook'] = GradeBook(self.get_object(), students)
+        context['students'] = context['gradebook'].students
         context['student'] = request.GET.get('student', '')
         return render(request, self.template_name, context)
 
 
-class CourseMarkEditView(LoginRequiredMixin, DetailView):
+class CourseMarkEditView(CourseMembershipMixin, LoginRequiredMixin, DetailView):
     """
     View used to handle /courses/marks/edit/<int:pk>/ GET/POST requests.
     Views is used to edit specified mark instance.
@@ -1535,26 +1443,18 @@ class CourseMarkEditView(LoginRequiredMixin, DetailView):
 
     def get(self, request, *args, **kwargs):
         user = request.user
-        if user.is_student:
-            student = users_models.Student.objects.get(email=user.email)
-            if student not in self.get_object().course.grade.students.all():
-                return redirect('courses:courses')
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-            if teacher not in self.get_object().course.teachers.all():
-                return redirect('courses:courses')
+        if user.is_student and not self.membership.is_student(self.get_object().course):
+            return redirect('courses:courses')
+        if user.is_teacher and not self.membership.is_teacher(self.get_object().course):
+            return redirect('courses:courses')
         return super().get(request, *args, **kwargs)
 
     def post(self, request, *args, **kwargs):
         user = request.user
-        if user.is_student:
-            student = users_models.Student.objects.get(email=user.email)
-            if student not in self.get_object().course.grade.students.all():
-                return redirect('courses:courses')
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-            if teacher not in self.get_object().course.teachers.all():
-                return redirect('courses:courses')
+        if user.is_student and not self.membership.is_student(self.get_object().course):
+            return redirect('courses:courses')
+        if user.is_teacher and not self.membership.is_teacher(self.get_object().course):
+            return redirect('courses:courses')
 
         form = self.form_class(request.POST)
         if form.is_valid():
@@ -1586,10 +1486,8 @@ def delete_course_mark(request, the_slug, num):
         course = models.Course.objects.get(slug=the_slug)
     except Exception:
         return redirect('courses:courses')
-    if user.is_teacher:
-        teacher = users_models.Teacher.objects.get(email=user.email)
-        if teacher not in course.teachers.all():
-            return redirect('courses:courses')
+    if user.is_teacher and not get_membership(request).is_teacher(course):
+        return redirect('courses:courses')
 
     mark = course.marks.all()[num]
     mark.delete()
@@ -1598,6 +1496,87 @@ def delete_course_mark(request, the_slug, num):
     return redirect('courses:courses-marks', the_slug=course.slug)
 
 
+def course_marks_export_view(request, the_slug):
+    """
+    View used to handle /courses/<slug:the_slug>/marks/export/ GET requests.
+    Views is used to download all partial and final marks of the course as CSV,
+    the file is streamed while marks are fetched from the database.
+
+    **Template:**
+
+    :template:`None`
+    """
+    user = request.user
+    if not user.is_authenticated or not user.is_teacher:
+        return redirect('courses:courses')
+    course = get_object_or_404(models.Course, slug=the_slug)
+    if not get_membership(request).is_teacher(course):
+        return redirect('courses:courses')
+
+    response = StreamingHttpResponse(exports.iter_marks_csv([course.pk]), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{course.slug}-marks.csv"'
+    return response
+
+
+def marks_export_download_view(request, pk):
+    """
+    View used to handle /courses/marks/exports/<int:pk>/ GET requests.
+    Views is used to download a finished `courses.MarksExport` of the teacher.
+
+    **Template:**
+
+    :template:`None`
+    """
+    user = request.user
+    if not user.is_authenticated or not user.is_teacher:
+        return redirect('courses:courses')
+    export = get_object_or_404(models.MarksExport, pk=pk, teacher_id=user.pk, finished_at__isnull=False)
+    return FileResponse(
+        exports.get_exports_storage().open(export.path), as_attachment=True,
+        filename=exports.get_marks_export_filename(export), content_type='text/csv'
+    )
+
+
+def course_marks_import_view(request, the_slug):
+    """
+    View used to handle /courses/<slug:the_slug>/marks/import/ POST requests.
+    Views is used to add marks of many students at once from a CSV sheet with `email`, `mark`
+    and optional `description` and `type` (`partial` or `final`) columns.
+
+    **Template:**
+
+    :template:`None`
+    """
+    user = request.user
+    if not user.is_authenticated or not user.is_teacher:
+        return redirect('courses:courses')
+    course = get_object_or_404(models.Course, slug=the_slug)
+    if not get_membership(request).is_teacher(course) or request.method != 'POST':
+        return redirect('courses:courses')
+
+    form = forms.MarksImportForm(request.POST, request.FILES)
+    if not form.is_valid():
+        messages.error(request, 'Nie wybrano pliku z ocenami!')
+        return redirect('courses:courses-marks', the_slug=course.slug)
+    try:
+        rows = imports.read_marks_csv(form.cleaned_data['file'])
+    except (UnicodeDecodeError, csv.Error):
+        messages.error(request, 'Niepoprawny plik z ocenami!')
+        return redirect('courses:courses-marks', the_slug=course.slug)
+
+    marks_import = imports.MarksImport(course, user, rows)
+    if not marks_import.is_valid():
+        for error in marks_import.errors[:MARKS_IMPORT_MAX_MESSAGES]:
+            messages.error(request, f'Wiersz {error.line}: {error.message}' if error.line else error.message)
+        if len(marks_import.errors) > MARKS_IMPORT_MAX_MESSAGES:
+            messages.error(request, f'Błędnych wierszy: {len(marks_import.errors)}.')
+        return redirect('courses:courses-marks', the_slug=course.slug)
+    marks_import.save()
+    messages.info(request, f'Pomyślnie zaimportowano oceny! Dodano: {marks_import.created}, '
+                           f'zmieniono: {marks_import.updated}.')
+    return redirect('courses:courses-marks', the_slug=course.slug)
+
+
 def set_final_course_mark_view(request, the_slug, pk):
     """
     View used to handle /courses/<slug:the_slug>/marks/final/set/<int:pk>/ GET/POST requests.
@@ -1625,10 +1604,8 @@ def set_final_course_mark_view(request, the_slug, pk):
         course = models.Course.objects.get(slug=the_slug)
     except Exception:
         return redirect('courses:courses')
-    if user.is_teacher:
-        teacher = users_models.Teacher.objects.get(email=user.email)
-        if teacher not in course.teachers.all():
-            return redirect('courses:courses')
+    if user.is_teacher and not get_membership(request).is_teacher(course):
+        return redirect('courses:courses')
 
     try:
         student = users_models.Student.objects.get(pk=pk)
@@ -1641,7 +1618,7 @@ def set_final_course_mark_view(request, the_slug, pk):
         if form.is_valid():
             mark = form.save(commit=False)
             mark.course = course
-            mark.teacher = users_models.Teacher.objects.get(email=user.email)
+            mark.teacher_id = user.pk
             mark.student = student
             mark.save()
             messages.info(request, 'Pomyślnie wystawiono ocenę!')
@@ -1685,10 +1662,8 @@ def edit_final_course_mark_view(request, the_slug, pk):
         course = models.Course.objects.get(slug=the_slug)
     except Exception:
         return redirect('courses:courses')
-    if user.is_teacher:
-        teacher = users_models.Teacher.objects.get(email=user.email)
-        if teacher not in course.teachers.all():
-            return redirect('courses:courses')
+    if user.is_teacher and not get_membership(request).is_teacher(course):
+        return redirect('courses:courses')
 
     try:
         student = users_models.Student.objects.get(pk=pk)
@@ -1702,7 +1677,7 @@ def edit_final_course_mark_view(request, the_slug, pk):
         form = forms.CourseSetFinalMarkModelForm(data=request.POST, instance=mark)
         if form.is_valid():
             mark = form.save(commit=False)
-            mark.teacher = users_models.Teacher.objects.get(email=user.email)
+            mark.teacher_id = user.pk
             mark.save()
             messages.info(request, 'Pomyślnie zaktualizowano ocenę!')
             return redirect('courses:courses-total-marks', the_slug=the_slug)
@@ -1718,7 +1693,7 @@ def edit_final_course_mark_view(request, the_slug, pk):
     return render(request, template_name, context)
 
 
-class AssignmentCreateView(LoginRequiredMixin, DetailView):
+class AssignmentCreateView(CourseMembershipMixin, LoginRequiredMixin, DetailView):
     """
     View used to handle /courses/laboratory/<int:pk>/assignments/add/ GET/POST requests.
     Views is used by teachers to create new assignment.
@@ -1756,31 +1731,27 @@ class AssignmentCreateView(LoginRequiredMixin, DetailView):
         user = request.user
         if not user.is_authenticated or user.is_student:
             return redirect('courses:courses')
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-            if teacher not in self.get_object().course.teachers.all():
-                return redirect('courses:courses')
+        if user.is_teacher and not self.membership.is_teacher(self.get_object().course):
+            return redirect('courses:courses')
         return super().get(request, *args, **kwargs)
 
     def post(self, request, *args, **kwargs):
         user = request.user
         if not user.is_authenticated or user.is_student:
             return redirect('courses:courses')
-        if user.is_teacher:
-            teacher = users_models.Teacher.objects.get(email=user.email)
-            if teacher not in self.get_object().course.teachers.all():
-                return redirect('courses:courses')
+        if user.is_teacher and not self.membership.is_teacher(self.get_object().course):
+            return redirect('courses:courses')
 
         form = self.form_class(request.POST)
         if form.is_valid():
             assignment = form.save(commit=False)
             assignment.laboratory = self.get_object()
-            assignment.teacher = users_models.Teacher.objects.get(email=user.email)
+            assignment.teacher_id = user.pk
             assignment.save()
             messages.info(request, 'Pomyslnie dodano nowe zadanie!')
-            tasks.send_new_assignment_notification_email(assignment, [], [
-                student.email for student in self.get_object().group.students.all()
-            ])
+            tasks.send_new_assignment_notification_email.delay(
+                assignment.pk, [], list(self.get_object().group.students.values_list('email', flat=True))
+            )
             return redirect('courses:laboratory-detail', pk=self.get_object().pk)
         else:
             messages.error(request, 'Sprobuj ponownie!')
@@ -1803,10 +1774,8 @@ def delete_assignment_view(request, pk, num):
     lab = models.Laboratory.objects.filter(pk=pk).first()
     if not lab:
         return redirect('courses:courses')
-    if user.is_teacher:
-        teacher = users_models.Teacher.objects.get(email=user.email)
-        if teacher not in lab.course.teachers.all():
-            return redirect('courses:courses')
+    if user.is_teacher and not get_membership(request).is_teacher(lab.course):
+        return redirect('courses:courses')
 
     assignment = lab.assignments.all()[num]
     assignment.delete()
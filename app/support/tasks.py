@@ -2,15 +2,17 @@ from typing import List
 
 from core import celery
 from support.emails import factories
+from utils import emails
 
 
-@celery.app.task(shared=True)
-def send_support_notification_email(user_email: str, fullname, bcc: List[str], email_to: List[str]):
+@celery.app.task(shared=True, **emails.EMAIL_TASK_OPTIONS)
+def send_support_notification_email(user_email: str, fullname: str, bcc: List[str], email_to: List[str]):
     """
     send_support_notification_email is used to send factories.SupportEmail
     email instance using celery.
 
     :param user_email: str
+    :param fullname: str
     :param bcc: List[str]
     :param email_to: List[str]
     """
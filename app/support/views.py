@@ -57,7 +57,7 @@ class TicketCreateView(generic.View):
                 email=email, issuer_fullname=fullname, description=description, category=category,
                 status=models.SupportStatus.PROCESSING
             )
-            tasks.send_support_notification_email(email, fullname, bcc=[], email_to=[email])
+            tasks.send_support_notification_email.delay(email, fullname, bcc=[], email_to=[email])
             messages.info(request, 'Przyjęto zgłoszenie, dziękujemy!')
         else:
             messages.error(request, 'Coś poszło nie tak, spróbuj ponownie!')
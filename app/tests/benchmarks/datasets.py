@@ -0,0 +1,129 @@
+import datetime
+import os
+import random
+from types import SimpleNamespace
+
+import factory
+from django.conf import settings
+from django.utils import timezone
+
+from courses import models
+from tests.courses import factories as course_factories
+from tests.users import factories as users_factories
+from users import models as users_models
+
+SCALES = {
+    'small': {
+        'grades': 2,
+        'students': 60,
+        'teachers': 4,
+        'courses': 6,
+        'events': 3,
+        'groups': 2,
+        'marks': 600,
+    },
+    'large': {
+        'grades': 10,
+        'students': 5000,
+        'teachers': 100,
+        'courses': 200,
+        'events': 5,
+        'groups': 4,
+        'marks': 50000,
+    },
+}
+
+
+def get_scale() -> str:
+    return os.environ.get('BENCHMARK_SCALE', 'small')
+
+
+def build_dataset(scale: str = None) -> SimpleNamespace:
+    """
+    Builds a dataset of the given scale (see SCALES) and returns
+    the objects the benchmarked views are requested for.
+
+    Big tables are filled with factory built instances saved by bulk_create.
+    """
+    size = SCALES[scale or get_scale()]
+    random.seed(size['students'])
+    today = datetime.date.today()
+
+    users_models.User.objects.bulk_create(users_factories.StudentFactory.build_batch(
+        size['students'], image=settings.DEFAULT_USER_IMAGE, first_login=False,
+        email=factory.Sequence(lambda n: f'student{n}@benchmark.raven'),
+    ))
+    users_models.User.objects.bulk_create(users_factories.TeacherFactory.build_batch(
+        size['teachers'], image=settings.DEFAULT_USER_IMAGE, first_login=False,
+        email=factory.Sequence(lambda n: f'teacher{n}@benchmark.raven'),
+    ))
+    # bulk_create doesn't set primary keys on every database, so users are fetched back
+    students = list(users_models.Student.objects.filter(email__endswith='@benchmark.raven').order_by('pk'))
+    teachers = list(users_models.Teacher.objects.filter(email__endswith='@benchmark.raven').order_by('pk'))
+
+    grades = []
+    students_per_grade = size['students'] // size['grades']
+    for i in range(size['grades']):
+        grades.append(course_factories.GradeFactory(
+            supervisor=students[0], students=students[i * students_per_grade:(i + 1) * students_per_grade]
+        ))
+
+    courses = []
+    for i in range(size['courses']):
+        courses.append(course_factories.CourseFactory(
+            grade=grades[i % len(grades)], head_teacher=teachers[i % len(teachers)],
+            teachers=[teachers[i % len(teachers)], teachers[(i + 1) % len(teachers)]],
+            start_date=today - datetime.timedelta(days=30),
+        ))
+
+    groups, lectures, laboratories, notices = [], [], [], []
+    for course in courses:
+        course_students = students_per_grade // size['groups']
+        grade_students = list(course.grade.students.all())
+        for i in range(size['groups']):
+            group = models.CourseGroup.objects.create(course=course, name=f'Grupa {i + 1}')
+            group.students.add(*grade_students[i * course_students:(i + 1) * course_students])
+            groups.append(group)
+        for i in range(size['events']):
+            date = timezone.now() + datetime.timedelta(days=random.randint(-30, 30))
+            lectures.append(course_factories.LectureFactory.build(course=course, date=date, location='A1'))
+            laboratories.append(course_factories.LabFactory.build(
+                course=course, group=groups[-1 - i % size['groups']], date=date, location='B2'
+            ))
+            notices.append(course_factories.NoticeFactory.build(course=course, sender=course.head_teacher))
+    models.Lecture.objects.bulk_create(lectures)
+    models.Laboratory.objects.bulk_create(laboratories)
+    models.CourseNotice.objects.bulk_create(notices)
+    laboratories = list(models.Laboratory.objects.select_related('course__head_teacher'))
+
+    models.Assignment.objects.bulk_create([
+        course_factories.AssignmentFactory.build(laboratory=laboratory, teacher=laboratory.course.head_teacher)
+        for laboratory in laboratories
+    ])
+
+    marks = []
+    for i in range(size['marks']):
+        course = courses[i % len(courses)]
+        student = students[(i * 7) % students_per_grade + grades.index(course.grade) * students_per_grade]
+        marks.append(course_factories.CourseMarkFactory.build(
+            course=course, student=student, teacher=course.head_teacher, mark=random.randint(0, 100)
+        ))
+    models.CourseMark.objects.bulk_create(marks)
+    models.FinalCourseMark.objects.bulk_create([
+        course_factories.FinalCourseMarkFactory.build(course=course, student=student, teacher=course.head_teacher)
+        for course in courses[:1] for student in course.grade.students.all()
+    ])
+
+    course = courses[0]
+    student = course.grade.students.order_by('pk').first()
+    return SimpleNamespace(
+        student=student,
+        classmate=course.grade.students.exclude(pk=student.pk).order_by('pk').first(),
+        teacher=course.head_teacher,
+        course=course,
+        group=course.groups.first(),
+        lecture=course.lectures.first(),
+        laboratory=course.laboratories.first(),
+        mark=course.marks.first(),
+        final_mark=course.final_marks.first(),
+    )
@@ -0,0 +1,130 @@
+import json
+import os
+import time
+import tracemalloc
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tests.benchmarks import datasets
+from users import models as users_models
+
+BUDGETS_PATH = os.path.join(os.path.dirname(__file__), 'budgets.json')
+
+# (url name, function returning url args from the dataset, roles requesting the url)
+VIEWS = [
+    ('users:dashboard', lambda data: (), ('student', 'teacher')),
+    ('users:assignments', lambda data: (), ('student',)),
+    ('users:schedule', lambda data: (), ('student', 'teacher')),
+    ('users:notices', lambda data: (), ('student', 'teacher')),
+    ('users:marks', lambda data: (), ('student',)),
+    ('users:profile', lambda data: (), ('student', 'teacher')),
+    ('users:summary', lambda data: (), ('student',)),
+    ('users:profile-detail', lambda data: (data.classmate.pk,), ('student', 'teacher')),
+    ('users:profile-edit', lambda data: (), ('student', 'teacher')),
+    ('courses:courses', lambda data: (), ('student', 'teacher')),
+    ('courses:courses-detail', lambda data: (data.course.slug,), ('student', 'teacher')),
+    ('courses:courses-edit', lambda data: (data.course.slug,), ('teacher',)),
+    ('courses:courses-marks', lambda data: (data.course.slug,), ('teacher',)),
+    ('courses:courses-total-marks', lambda data: (data.course.slug,), ('teacher',)),
+    ('courses:my-marks', lambda data: (data.course.slug,), ('student',)),
+    ('courses:courses-marks-edit', lambda data: (data.mark.pk,), ('teacher',)),
+    ('courses:set-final-mark', lambda data: (data.course.slug, data.student.pk), ('teacher',)),
+    ('courses:edit-final-mark', lambda data: (data.course.slug, data.final_mark.student_id), ('teacher',)),
+    ('courses:lectures-detail', lambda data: (data.lecture.pk,), ('student', 'teacher')),
+    ('courses:lectures-edit', lambda data: (data.lecture.pk,), ('teacher',)),
+    ('courses:lectures-create', lambda data: (data.course.slug,), ('teacher',)),
+    ('courses:laboratory-detail', lambda data: (data.laboratory.pk,), ('student', 'teacher')),
+    ('courses:laboratory-edit', lambda data: (data.laboratory.pk,), ('teacher',)),
+    ('courses:laboratory-create', lambda data: (data.course.slug,), ('teacher',)),
+    ('courses:assignments-create', lambda data: (data.laboratory.pk,), ('teacher',)),
+    ('courses:group', lambda data: (data.course.slug,), ('student', 'teacher')),
+    ('courses:group-create', lambda data: (data.course.slug,), ('teacher',)),
+    ('courses:group-edit', lambda data: (data.group.pk,), ('teacher',)),
+    ('courses:notices', lambda data: (data.course.slug,), ('student', 'teacher')),
+    ('courses:course-detail', lambda data: (data.course.slug,), ('teacher',)),
+    ('courses:api-gradebook', lambda data: (data.course.slug,), ('teacher',)),
+    ('courses:api-courses-list', lambda data: (), ('student', 'teacher')),
+]
+
+BENCHMARKS = [(name, args, role) for name, args, roles in VIEWS for role in roles]
+
+results = {}
+
+
+def load_budgets():
+    with open(BUDGETS_PATH) as file:
+        return json.load(file)
+
+
+@pytest.fixture(scope='module')
+def dataset(django_db_setup, django_db_blocker):
+    """
+    Dataset shared by all benchmarks of the module, rolled back after the last one.
+    """
+    with django_db_blocker.unblock():
+        with transaction.atomic():
+            yield datasets.build_dataset()
+            transaction.set_rollback(True)
+
+
+@pytest.fixture(scope='module', autouse=True)
+def report():
+    yield
+    path = os.environ.get('BENCHMARK_REPORT')
+    if path:
+        with open(path, 'w') as file:
+            json.dump({'scale': datasets.get_scale(), 'views': results}, file, indent=2, sort_keys=True)
+
+
+@pytest.fixture(autouse=True)
+def cached_sessions(settings):
+    # budgets are measured with sessions cached as in production, where the cache is shared by all processes
+    settings.SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+
+def reset_snapshots():
+    # the dashboard is served from a precomputed snapshot, so it is always benchmarked while being rebuilt
+    users_models.DashboardSnapshot.objects.all().delete()
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize('name,args,role', BENCHMARKS, ids=[f'{name}[{role}]' for name, _, role in BENCHMARKS])
+def test_view_budget(name, args, role, dataset, client, db):
+    url = reverse(name, args=args(dataset))
+    client.force_login(getattr(dataset, role))
+    client.get(url)  # warms up caches which are not a part of the view, ex. compiled templates
+
+    reset_snapshots()
+    start = time.perf_counter()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    elapsed = time.perf_counter() - start
+    # captured queries are read from the connection's log, which is reset by the next request
+    captured = queries.captured_queries
+
+    reset_snapshots()
+    tracemalloc.start()
+    client.get(url)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    key = f'{name}[{role}]'
+    results[key] = {
+        'status': response.status_code,
+        'queries': len(captured),
+        'ms': round(elapsed * 1000, 1),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+    assert response.status_code == 200, f'{key} responded with {response.status_code}'
+    budget = load_budgets().get(key)
+    assert budget is not None, f'{key} has no budget in {BUDGETS_PATH}, measured: {results[key]}'
+    assert len(captured) <= budget['queries'], (
+        f'{key} made {len(captured)} queries, budget is {budget["queries"]}:\n' +
+        '\n'.join(query['sql'] for query in captured)
+    )
+    if 'ms' in budget and os.environ.get('BENCHMARK_TIME_BUDGETS'):
+        assert elapsed * 1000 <= budget['ms'], f'{key} took {results[key]["ms"]} ms, budget is {budget["ms"]} ms'
@@ -0,0 +1,74 @@
+import datetime
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from courses import models
+from tests.courses import factories as course_factories
+from tests.users import factories as users_factories
+from users import presence
+
+
+@pytest.mark.django_db
+class TestCourseListApi:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, db):
+        self.teacher = users_factories.TeacherFactory()
+        self.student = users_factories.StudentFactory()
+        today = timezone.now().date()
+        self.grade = course_factories.GradeFactory(
+            students=[self.student], start_year=today - datetime.timedelta(days=200)
+        )
+        self.courses = [
+            course_factories.CourseFactory(
+                name=f'Kurs {i}', grade=self.grade, head_teacher=self.teacher,
+                teachers=[self.teacher, users_factories.TeacherFactory()],
+                start_date=today - datetime.timedelta(days=i * 100),
+            ) for i in range(5)
+        ]
+        self.url = reverse('courses:api-courses-list')
+
+    def test_calculated_fields(self):
+        for course in models.Course.objects.with_calculated_fields():
+            plain = models.Course.objects.get(pk=course.pk)
+            assert course.is_actual == plain.is_actual
+            assert course.calculated_semester == plain.calculated_semester
+
+    def test_pagination(self, client, django_assert_max_num_queries):
+        client.force_login(self.student)
+        presence.touch(self.teacher.pk)
+        with django_assert_max_num_queries(4):
+            response = client.get(self.url, {'page_size': 2})
+        data = response.json()
+        assert [course['name'] for course in data['results']] == ['Kurs 0', 'Kurs 1']
+        assert data['results'][0]['head_teacher']['is_online']
+        assert [teacher['is_online'] for teacher in data['results'][0]['teachers']].count(True) == 1
+
+        names = [course['name'] for course in data['results']]
+        while data['next']:
+            with django_assert_max_num_queries(4):
+                data = client.get(data['next']).json()
+            names += [course['name'] for course in data['results']]
+        assert names == [f'Kurs {i}' for i in range(5)]
+
+    def test_filters(self, client):
+        client.force_login(self.teacher)
+        data = client.get(self.url, {'actual': 'true'}).json()
+        assert [course['name'] for course in data['results']] == ['Kurs 0', 'Kurs 1']
+        assert [course['is_actual'] for course in data['results']] == [True, True]
+
+        data = client.get(self.url, {'semester': 1}).json()
+        assert [course['name'] for course in data['results']] == ['Kurs 1', 'Kurs 2', 'Kurs 3']
+        assert client.get(self.url, {'semester': 'abc'}).status_code == 400
+        assert client.get(self.url, {'exam': 'tak'}).status_code == 400
+
+        teacher = self.courses[3].teachers.exclude(pk=self.teacher.pk).get()
+        data = client.get(self.url, {'teacher': teacher.last_name}).json()
+        assert 'Kurs 3' in [course['name'] for course in data['results']]
+
+    def test_sparse_fields(self, client, django_assert_max_num_queries):
+        client.force_login(self.student)
+        with django_assert_max_num_queries(3):
+            data = client.get(self.url, {'fields': 'name,slug'}).json()
+        assert data['results'][0] == {'name': 'Kurs 0', 'slug': self.courses[0].slug}
@@ -0,0 +1,81 @@
+import datetime
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from courses import blobs, models, tasks
+from tests.courses import factories as course_factories
+from tests.users import factories as users_factories
+
+CONTENT = b'slides' * 100
+
+
+@pytest.mark.django_db
+class TestFileBlobs:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, db, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+        teacher = users_factories.TeacherFactory()
+        grade = course_factories.GradeFactory(students=[users_factories.StudentFactory()])
+        course = course_factories.CourseFactory(grade=grade, head_teacher=teacher, teachers=[teacher])
+        self.lecture = course_factories.LectureFactory(course=course)
+        self.later = timezone.now() + settings.FILE_BLOBS_GRACE_PERIOD + datetime.timedelta(minutes=1)
+
+    def create_file(self, content: bytes = CONTENT, name: str = 'Slajdy.PDF') -> models.CourseFile:
+        return models.CourseFile.objects.create(name='Slajdy', file=ContentFile(content, name=name))
+
+    def test_deduplicated(self):
+        first, second = self.create_file(), self.create_file(name='kopia.pdf')
+        assert first.blob == second.blob
+        assert first.file.name == second.file.name == first.blob.path
+        assert first.blob.path.endswith('.pdf')
+        assert (first.filename, second.filename) == ('Slajdy.PDF', 'kopia.pdf')
+        assert first.blob.size == len(CONTENT)
+        assert self.create_file(b'other').blob != first.blob
+        assert models.FileBlob.objects.count() == 2
+        with default_storage.open(second.file.name) as file:
+            assert file.read() == CONTENT
+
+    def test_collect(self):
+        attached, unattached = self.create_file(), self.create_file()
+        other = self.create_file(b'other')
+        self.lecture.files.add(attached)
+
+        assert blobs.collect_file_blobs() == 0
+        assert blobs.collect_file_blobs(self.later) == 1
+        assert not models.FileBlob.objects.filter(pk=other.blob_id).exists()
+        assert not default_storage.exists(other.file.name)
+        assert set(models.CourseFile.objects.all()) == {attached, unattached}
+
+        self.lecture.files.remove(attached)
+        assert blobs.collect_file_blobs(self.later) == 1
+        assert not models.CourseFile.objects.exists()
+        assert not default_storage.exists(attached.file.name)
+
+    def test_legacy_files(self):
+        blob = self.create_file().blob
+        path = default_storage.save('uploads/legacy-slides.pdf', ContentFile(CONTENT))
+        legacy = models.CourseFile.objects.create(name='Slajdy', file=path)
+        assert legacy.blob is None
+
+        assert blobs.store_legacy_file_blobs() == 1
+        legacy.refresh_from_db()
+        assert legacy.blob == blob
+        assert legacy.filename == 'legacy-slides.pdf'
+        assert not default_storage.exists(path)
+
+    def test_collect_legacy_files(self):
+        path = default_storage.save('uploads/legacy-notes.pdf', ContentFile(b'notes'))
+        models.CourseFile.objects.create(name='Notatki', file=path)
+        assert blobs.collect_file_blobs(self.later) == 1
+        assert not default_storage.exists(path)
+
+    def test_store_task(self):
+        path = default_storage.save('uploads/upload.pdf', ContentFile(CONTENT))
+        course_file = models.CourseFile.objects.create(name='Slajdy', file=path, original_name='Wykład 1.pdf')
+        tasks.store_course_file_blob(course_file.pk)
+        course_file.refresh_from_db()
+        assert course_file.file.name == course_file.blob.path
+        assert course_file.filename == 'Wykład 1.pdf'
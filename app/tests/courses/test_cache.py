@@ -0,0 +1,87 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from courses import models
+from courses.cache import get_course_detail
+from tests.courses import factories as course_factories
+from tests.users import factories as users_factories
+from utils import cache as cache_utils
+
+
+def test_versions():
+    cache_utils.get_version('tests', 1)
+    version = cache_utils.get_version('tests', 1)
+    cache_utils.bump_version('tests', 1)
+    assert cache_utils.get_version('tests', 1) == version + 1
+
+    cache.delete(cache_utils.get_version_key('tests', 1))
+    cache_utils.bump_version('tests', 1)
+    assert cache_utils.get_version('tests', 1) > version + 1
+
+
+def test_changed_at():
+    changed_at = cache_utils.get_changed_at('tests', 1)
+    assert cache_utils.get_changed_at('tests', 1) == changed_at
+    cache_utils.touch('tests', [1, 2])
+    touched_at = cache_utils.get_changed_at('tests', 1)
+    assert int(touched_at.timestamp()) > int(changed_at.timestamp())
+    cache_utils.touch('tests', [1])
+    assert int(cache_utils.get_changed_at('tests', 1).timestamp()) > int(touched_at.timestamp())
+
+
+@pytest.mark.django_db
+class TestCourseDetailCache:
+    def setup_method(self):
+        self.teacher = users_factories.TeacherFactory()
+        self.student = users_factories.StudentFactory()
+        grade = course_factories.GradeFactory(students=[self.student])
+        self.course = course_factories.CourseFactory(grade=grade, head_teacher=self.teacher, teachers=[self.teacher])
+        self.lecture = course_factories.LectureFactory(course=self.course, show=True)
+
+    def assert_invalidated(self, change):
+        version = cache_utils.get_version(models.COURSE_CACHE_NAMESPACE, self.course.pk)
+        change()
+        assert cache_utils.get_version(models.COURSE_CACHE_NAMESPACE, self.course.pk) != version
+
+    def test_cached(self, django_assert_num_queries):
+        detail = get_course_detail(self.course)
+        assert detail['lectures'] == [self.lecture]
+        assert detail['ungrouped_students'] == {self.student.pk: self.student.email}
+        with django_assert_num_queries(0):
+            detail = get_course_detail(self.course)
+            assert list(detail['course'].teachers.all()) == [self.teacher]
+            assert list(detail['lectures'][0].files.all()) == []
+
+    def test_invalidation(self):
+        self.assert_invalidated(lambda: course_factories.LectureFactory(course=self.course))
+        self.assert_invalidated(lambda: self.lecture.delete())
+        self.assert_invalidated(lambda: self.course.teachers.add(users_factories.TeacherFactory()))
+        self.assert_invalidated(lambda: self.teacher.courses_teaching.clear())
+        self.assert_invalidated(lambda: self.course.grade.students.add(users_factories.StudentFactory()))
+        self.assert_invalidated(lambda: course_factories.GroupFactory(course=self.course, students=[self.student]))
+        self.assert_invalidated(lambda: self.teacher.save())
+
+    def test_notice_keeps_cache(self):
+        version = cache_utils.get_version(models.COURSE_CACHE_NAMESPACE, self.course.pk)
+        course_factories.NoticeFactory(course=self.course, sender=self.teacher)
+        assert cache_utils.get_version(models.COURSE_CACHE_NAMESPACE, self.course.pk) == version
+
+    def test_login_keeps_cache(self, client):
+        version = cache_utils.get_version(models.COURSE_CACHE_NAMESPACE, self.course.pk)
+        client.force_login(self.teacher)
+        assert cache_utils.get_version(models.COURSE_CACHE_NAMESPACE, self.course.pk) == version
+        self.assert_invalidated(lambda: self.teacher.save(update_fields=['last_name']))
+
+    def test_view(self, client, django_assert_max_num_queries):
+        url = reverse('courses:courses-detail', args=(self.course.slug,))
+        client.force_login(self.student)
+        client.get(url)
+        with django_assert_max_num_queries(4):
+            response = client.get(url)
+        assert response.context['available_lectures'] == [self.lecture]
+
+        self.lecture.title = 'Wykład 2'
+        self.lecture.save()
+        assert response.context['course'] == self.course
+        assert client.get(url).context['available_lectures'][0].title == 'Wykład 2'
@@ -0,0 +1,191 @@
+import datetime
+from unittest import mock
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from courses import calendar_sync, models, tasks
+from tests.courses import factories as course_factories
+from tests.users import factories as users_factories
+from utils.meetings.backends import CalendarOperation, LocalCalendarBackend
+
+
+@pytest.mark.django_db
+class TestCalendarSync:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, db, settings):
+        settings.CALENDAR_SYNC_BACKEND = 'utils.meetings.backends.LocalCalendarBackend'
+        settings.CALENDAR_SYNC_MAX_ATTEMPTS = 2
+        LocalCalendarBackend.reset()
+        self.teacher = users_factories.TeacherFactory()
+        self.student = users_factories.StudentFactory()
+        grade = course_factories.GradeFactory(students=[self.student])
+        self.course = course_factories.CourseFactory(grade=grade, head_teacher=self.teacher, teachers=[self.teacher])
+        self.group = course_factories.GroupFactory(course=self.course, students=[self.student])
+        yield
+        LocalCalendarBackend.reset()
+
+    def test_edits_are_coalesced(self):
+        lecture = course_factories.LectureFactory(course=self.course, create_event=True)
+        lecture.title = 'Wykład 2'
+        lecture.save()
+        lab = course_factories.LabFactory(course=self.course, group=self.group, create_event=True)
+        assert models.CalendarSyncOutbox.objects.pending().count() == 3
+
+        assert calendar_sync.process_outbox() == 3
+        assert models.CalendarSyncOutbox.objects.pending().count() == 0
+        assert len(LocalCalendarBackend.batches) == 1
+        assert [operation.action for operation in LocalCalendarBackend.batches[0]] == ['create', 'create']
+
+        lecture.refresh_from_db()
+        lab.refresh_from_db()
+        event = LocalCalendarBackend.events[lecture.event_id]
+        assert event['summary'] == 'Wykład 2'
+        assert lecture.hangout_link == event['hangoutLink']
+        assert LocalCalendarBackend.events[lab.event_id]['attendees'] == [
+            {'email': self.student.email}, {'email': self.teacher.email}
+        ]
+
+    def test_update_and_delete(self):
+        lecture = course_factories.LectureFactory(course=self.course, create_event=True)
+        calendar_sync.process_outbox()
+        lecture.refresh_from_db()
+        event_id = lecture.event_id
+
+        lecture.location = 'B2'
+        lecture.save()
+        calendar_sync.process_outbox()
+        assert LocalCalendarBackend.batches[-1][0].action == 'update'
+        assert LocalCalendarBackend.events[event_id]['location'] == 'B2'
+
+        lecture.create_event = False
+        lecture.save()
+        calendar_sync.process_outbox()
+        lecture.refresh_from_db()
+        assert lecture.event_id == '' and lecture.hangout_link == ''
+        assert event_id not in LocalCalendarBackend.events
+
+    def test_deleted_event(self):
+        lab = course_factories.LabFactory(course=self.course, group=self.group, create_event=True)
+        calendar_sync.process_outbox()
+        lab.refresh_from_db()
+        event_id = lab.event_id
+
+        lab.delete()
+        calendar_sync.process_outbox()
+        assert LocalCalendarBackend.batches[-1][0].action == 'delete'
+        assert event_id not in LocalCalendarBackend.events
+
+    def test_events_without_calendar_event_are_skipped(self, settings):
+        course_factories.LectureFactory(course=self.course, create_event=False)
+        assert not models.CalendarSyncOutbox.objects.exists()
+
+        settings.CALENDAR_SYNC_BACKEND = None
+        course_factories.LectureFactory(course=self.course, create_event=True)
+        assert not models.CalendarSyncOutbox.objects.exists()
+
+    def test_failed_operation(self):
+        lecture = course_factories.LectureFactory(course=self.course, create_event=True)
+        calendar_sync.process_outbox()
+        lecture.refresh_from_db()
+        LocalCalendarBackend.events.clear()
+
+        lecture.save()
+        calendar_sync.process_outbox()
+        row = models.CalendarSyncOutbox.objects.latest('pk')
+        assert row.processed_at is None
+        assert row.attempts == 1
+        assert 'KeyError' in row.error
+
+        tasks.sync_calendar_events()
+        row.refresh_from_db()
+        assert row.processed_at is not None
+        assert row.attempts == 2
+
+    def test_failed_batch(self, monkeypatch):
+        course_factories.LectureFactory(course=self.course, create_event=True)
+
+        def execute(self, operations):
+            raise OSError('Connection reset')
+
+        monkeypatch.setattr(LocalCalendarBackend, 'execute', execute)
+        with pytest.raises(OSError):
+            calendar_sync.process_outbox()
+        row = models.CalendarSyncOutbox.objects.get()
+        assert row.claimed_until is None
+        assert row.processed_at is None
+        assert row.attempts == 1
+        assert 'Connection reset' in row.error
+
+        monkeypatch.undo()
+        assert calendar_sync.process_outbox() == 1
+        assert len(LocalCalendarBackend.events) == 1
+
+    def test_claimed_events_are_skipped(self):
+        lecture = course_factories.LectureFactory(course=self.course, create_event=True)
+        # rows of the lecture are being sent to the calendar by another worker
+        claimed_until = timezone.now() + datetime.timedelta(minutes=1)
+        models.CalendarSyncOutbox.objects.update(claimed_until=claimed_until)
+        lecture.title = 'Wykład 2'
+        lecture.save()
+        other = course_factories.LectureFactory(course=self.course, create_event=True)
+
+        assert calendar_sync.process_outbox() == 1
+        assert [(operation.action, operation.body['summary']) for operation in LocalCalendarBackend.batches[-1]] == [
+            ('create', other.title)
+        ]
+        assert models.CalendarSyncOutbox.objects.pending().filter(event_pk=lecture.pk).count() == 2
+
+        # claims of workers which died meanwhile expire
+        models.CalendarSyncOutbox.objects.update(claimed_until=timezone.now() - datetime.timedelta(seconds=1))
+        assert calendar_sync.process_outbox() == 2
+        assert [operation.action for operation in LocalCalendarBackend.batches[-1]] == ['create']
+        assert models.CalendarSyncOutbox.objects.pending().count() == 0
+
+    def test_event_deleted_while_created(self):
+        lecture = course_factories.LectureFactory(course=self.course, create_event=True)
+        models.Lecture.objects.filter(pk=lecture.pk).delete()
+        with mock.patch('courses.models.transaction.on_commit') as on_commit:
+            calendar_sync.write_back('lecture', lecture, CalendarOperation('create'), {'id': 'event-1'})
+        row = models.CalendarSyncOutbox.objects.latest('pk')
+        assert (row.action, row.calendar_event_id) == ('delete', 'event-1')
+        on_commit.assert_called_once_with(tasks.sync_calendar_events.delay)
+
+    def test_view_doesnt_call_backend(self, client):
+        client.force_login(self.teacher)
+        url = reverse('courses:lectures-create', args=(self.course.slug,))
+        response = client.post(url, {
+            'title': 'Wykład 1',
+            'date': '12.02.2021',
+            'time': '12:30',
+            'duration': '90',
+            'localization': 'A1',
+            'description': 'opis',
+            'meeting': 'on',
+        })
+        assert response.status_code == 302
+        assert models.CalendarSyncOutbox.objects.pending().count() == 1
+        assert LocalCalendarBackend.batches == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_backend_is_called_outside_of_transaction(settings):
+    settings.CALENDAR_SYNC_BACKEND = 'utils.meetings.backends.LocalCalendarBackend'
+    LocalCalendarBackend.reset()
+    teacher = users_factories.TeacherFactory()
+    grade = course_factories.GradeFactory(students=[users_factories.StudentFactory()])
+    course = course_factories.CourseFactory(grade=grade, head_teacher=teacher, teachers=[teacher])
+    execute = LocalCalendarBackend.execute
+    in_atomic_block = []
+
+    def execute_outside_of_transaction(backend, operations):
+        in_atomic_block.append(connection.in_atomic_block)
+        return execute(backend, operations)
+
+    # the outbox is processed by the task scheduled after the lecture is committed
+    with mock.patch.object(LocalCalendarBackend, 'execute', execute_outside_of_transaction):
+        course_factories.LectureFactory(course=course, create_event=True)
+    LocalCalendarBackend.reset()
+    assert in_atomic_block == [False]
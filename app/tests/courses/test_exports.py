@@ -0,0 +1,75 @@
+import csv
+import io
+
+import pytest
+from django.urls import reverse
+
+from courses import exports, models, tasks
+from tests.courses import factories as course_factories
+from tests.users import factories as users_factories
+
+
+@pytest.mark.django_db
+class TestMarksExport:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, db, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+        settings.EXPORT_CHUNK_SIZE = 2
+        self.teacher = users_factories.TeacherFactory()
+        self.student = users_factories.StudentFactory(first_name='Jan', last_name='Kowalski')
+        grade = course_factories.GradeFactory(students=[self.student])
+        self.course = course_factories.CourseFactory(grade=grade, head_teacher=self.teacher, teachers=[self.teacher])
+        for mark in (95, 50, 71):
+            course_factories.CourseMarkFactory(
+                course=self.course, student=self.student, teacher=self.teacher, mark=mark, description='a, "b"'
+            )
+        course_factories.FinalCourseMarkFactory(course=self.course, student=self.student, teacher=self.teacher, mark=81)
+
+    def read(self, content: str):
+        return list(csv.DictReader(io.StringIO(content)))
+
+    def test_rows(self):
+        rows = self.read(''.join(exports.iter_marks_csv([self.course.pk])))
+        assert [(row['type'], row['mark'], row['mark_decimal']) for row in rows if row['type'] == 'final'] == [
+            ('final', '81', '4.5')
+        ]
+        partial = [row for row in rows if row['type'] == 'partial']
+        assert sorted(int(row['mark']) for row in partial) == [50, 71, 95]
+        assert {row['student_last_name'] for row in rows} == {'Kowalski'}
+        assert partial[0]['description'] == 'a, "b"'
+        assert partial[0]['course'] == self.course.slug
+
+    def test_view(self, client):
+        url = reverse('courses:courses-marks-export', args=(self.course.slug,))
+        client.force_login(self.student)
+        assert client.get(url).status_code == 302
+
+        client.force_login(self.teacher)
+        response = client.get(url)
+        assert response.streaming
+        assert response['Content-Disposition'] == f'attachment; filename="{self.course.slug}-marks.csv"'
+        assert len(self.read(b''.join(response.streaming_content).decode())) == 4
+
+        client.force_login(users_factories.TeacherFactory())
+        assert client.get(url).status_code == 302
+
+    def test_background_export(self, client):
+        client.force_login(self.teacher)
+        response = client.post(reverse('courses:api-marks-export-create'), {'courses': [self.course.slug]},
+                               content_type='application/json')
+        assert response.status_code == 202
+        assert not response.json()['finished']
+
+        export = models.MarksExport.objects.get(pk=response.json()['id'])
+        tasks.export_courses_marks(export.pk)
+
+        data = client.get(reverse('courses:api-marks-export', args=(export.pk,))).json()
+        assert data['finished']
+        response = client.get(data['url'])
+        assert response.status_code == 200
+        assert len(self.read(b''.join(response.streaming_content).decode())) == 4
+
+        client.force_login(users_factories.TeacherFactory())
+        assert client.get(data['url']).status_code == 404
+        assert client.get(reverse('courses:api-marks-export', args=(export.pk,))).status_code == 404
+        assert client.post(reverse('courses:api-marks-export-create')).status_code == 400
@@ -0,0 +1,63 @@
+import pytest
+from django.urls import reverse
+
+from courses.gradebook import GradeBook, percentile
+from tests.courses import factories as course_factories
+from tests.users import factories as users_factories
+
+
+def test_percentile():
+    assert percentile([], 50) is None
+    assert percentile([10], 90) == 10
+    assert percentile([10, 20, 30, 40], 50) == 25
+    assert percentile([10, 20, 30, 40], 100) == 40
+
+
+@pytest.mark.django_db
+class TestGradeBook:
+    def setup_method(self):
+        self.teacher = users_factories.TeacherFactory()
+        self.students = users_factories.StudentFactory.create_batch(3)
+        grade = course_factories.GradeFactory(students=self.students)
+        self.course = course_factories.CourseFactory(grade=grade, teachers=[self.teacher])
+        for mark in (40, 60, 80):
+            course_factories.CourseMarkFactory(course=self.course, student=self.students[0], mark=mark)
+        course_factories.CourseMarkFactory(course=self.course, student=self.students[1], mark=95)
+        course_factories.CourseMarkFactory(student=self.students[2], mark=100)
+        self.final_mark = course_factories.FinalCourseMarkFactory(course=self.course, student=self.students[1])
+
+    def test_rows(self):
+        rows = {row.student: row for row in GradeBook(self.course).rows}
+        assert rows[self.students[0]].marks == [40, 60, 80]
+        assert rows[self.students[0]].avg == 60
+        assert rows[self.students[0]].avg_decimal == 3.5
+        assert rows[self.students[1]].final_mark == self.final_mark
+        assert rows[self.students[2]].count == 0
+        assert rows[self.students[2]].avg is None
+
+    def test_summary(self):
+        gradebook = GradeBook(self.course)
+        assert gradebook.averages == [60, 95]
+        assert gradebook.avg == 77.5
+        assert gradebook.avg_decimal == 4.0
+        assert gradebook.percentiles[50] == 77.5
+        assert gradebook.distribution == {5.0: 1, 4.5: 0, 4.0: 0, 3.5: 1, 3.0: 0, 2.0: 0}
+
+    def test_queries(self, django_assert_num_queries):
+        students = list(self.course.grade.students.all())
+        with django_assert_num_queries(2):
+            GradeBook(self.course, students).as_dict()
+
+    def test_api(self, client):
+        url = reverse('courses:api-gradebook', args=(self.course.slug,))
+        client.force_login(self.students[0])
+        assert client.get(url).status_code == 401
+
+        client.force_login(users_factories.TeacherFactory())
+        assert client.get(url).status_code == 403
+
+        client.force_login(self.teacher)
+        response = client.get(url)
+        assert response.status_code == 200
+        assert len(response.json()['students']) == 3
+        assert response.json()['summary']['avg'] == 77.5
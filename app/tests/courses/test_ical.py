@@ -0,0 +1,86 @@
+import datetime
+import uuid
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from courses.ical import escape_text, fold
+from tests.courses import factories as course_factories
+from tests.users import factories as users_factories
+
+
+def test_escape_text():
+    assert escape_text(None) == ''
+    assert escape_text('Sala 1, budynek A; piętro\n2') == 'Sala 1\\, budynek A\\; piętro\\n2'
+
+
+def test_fold():
+    assert fold('SUMMARY:Short') == 'SUMMARY:Short\r\n'
+    lines = fold('DESCRIPTION:' + 'ą' * 100).split('\r\n')
+    assert all(len(line.encode('utf-8')) <= 75 for line in lines)
+    assert lines[1].startswith(' ')
+    assert ''.join(line[1:] if i else line for i, line in enumerate(lines)) == 'DESCRIPTION:' + 'ą' * 100
+
+
+@pytest.mark.django_db
+class TestScheduleFeedView:
+    def setup_method(self):
+        self.student = users_factories.StudentFactory()
+        grade = course_factories.GradeFactory(students=[self.student])
+        self.course = course_factories.CourseFactory(grade=grade)
+        group = course_factories.GroupFactory(course=self.course, students=[self.student])
+        date = timezone.now() + datetime.timedelta(days=1)
+        self.lecture = course_factories.LectureFactory(course=self.course, date=date, title='Wykład 1')
+        self.lab = course_factories.LabFactory(course=self.course, group=group, date=date, title='Lab 1')
+        course_factories.LabFactory(course=self.course, group=course_factories.GroupFactory(course=self.course),
+                                    date=date, title='Lab 2')
+        self.url = reverse('users:schedule-feed', args=(self.student.calendar_token,))
+
+    def test_get_feed(self, client):
+        response = client.get(self.url)
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'text/calendar; charset=utf-8'
+        assert response['ETag'] and response['Last-Modified']
+        content = b''.join(response.streaming_content).decode()
+        assert content.startswith('BEGIN:VCALENDAR\r\n') and content.endswith('END:VCALENDAR\r\n')
+        assert f'UID:lecture-{self.lecture.pk}@raven' in content
+        assert f'UID:laboratory-{self.lab.pk}@raven' in content
+        assert 'Lab 2' not in content
+
+    def test_not_modified(self, client):
+        response = client.get(self.url)
+        assert client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code == 304
+        assert client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code == 304
+
+        self.lecture.title = 'Wykład 2'
+        self.lecture.save()
+        assert client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code == 200
+
+    def test_deleted_event_changes_etag(self, client):
+        response = client.get(self.url)
+        self.lab.delete()
+        assert client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code == 200
+        assert client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code == 200
+
+    def test_left_group_changes_last_modified(self, client):
+        response = client.get(self.url)
+        self.lab.group.students.remove(self.student)
+        assert client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code == 200
+
+    def test_unknown_token(self, client):
+        assert client.get(reverse('users:schedule-feed', args=(uuid.uuid4(),))).status_code == 404
+
+    def test_reset_token_anonymous(self, client):
+        response = client.post(reverse('users:schedule-feed-reset'))
+        assert response.status_code == 302
+        assert response.url == reverse('users:login')
+        assert client.get(self.url).status_code == 200
+
+    def test_reset_token(self, client):
+        client.force_login(self.student)
+        response = client.post(reverse('users:schedule-feed-reset'))
+        assert response.status_code == 302
+        assert client.get(self.url).status_code == 404
+        self.student.refresh_from_db()
+        assert client.get(self.student.get_calendar_url()).status_code == 200
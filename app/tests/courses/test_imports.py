@@ -0,0 +1,106 @@
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from django.utils import timezone
+
+from courses import imports, models
+from tests.courses import factories as course_factories
+from tests.users import factories as users_factories
+from users import models as users_models
+
+
+@pytest.mark.django_db
+class TestMarksImport:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, db):
+        self.teacher = users_factories.TeacherFactory()
+        self.students = users_factories.StudentFactory.create_batch(3)
+        self.additional_student = users_factories.StudentFactory()
+        grade = course_factories.GradeFactory(students=self.students)
+        self.course = course_factories.CourseFactory(grade=grade, head_teacher=self.teacher, teachers=[self.teacher])
+        self.course.additional_students.add(self.additional_student)
+
+    def test_import(self, django_assert_max_num_queries):
+        course_factories.FinalCourseMarkFactory(
+            course=self.course, student=self.students[0], teacher=self.teacher, mark=30
+        )
+        users_models.DashboardSnapshot.objects.create(user=self.students[1], data=b'', built_at=timezone.now())
+        rows = [
+            {'email': self.students[0].email.upper(), 'mark': '80', 'description': 'egzamin'},
+            {'email': self.students[1].email, 'mark': ' 55 '},
+            {'email': self.additional_student.email, 'mark': '100', 'type': ''},
+            {'email': self.students[0].email, 'mark': '91', 'type': 'final'},
+            {'email': self.students[1].email, 'mark': '45', 'type': 'final'},
+        ]
+        marks_import = imports.MarksImport(self.course, self.teacher, rows)
+        with django_assert_max_num_queries(8):
+            assert marks_import.is_valid()
+            marks_import.save()
+        assert (marks_import.created, marks_import.updated) == (4, 1)
+        assert sorted(self.course.marks.values_list('mark', flat=True)) == [55, 80, 100]
+        assert dict(self.course.final_marks.values_list('student_id', 'mark')) == {
+            self.students[0].pk: 91, self.students[1].pk: 45
+        }
+        assert users_models.DashboardSnapshot.objects.get(user=self.students[1]).invalidated_at is not None
+
+    def test_errors(self):
+        outsider = users_factories.StudentFactory()
+        rows = [
+            {'email': self.students[0].email, 'mark': '80'},
+            {'email': outsider.email, 'mark': '80'},
+            {'email': '', 'mark': '80'},
+            {'email': self.students[1].email, 'mark': 'abc'},
+            {'email': self.students[1].email, 'mark': '101'},
+            {'email': self.students[1].email, 'mark': '50', 'type': 'exam'},
+            {'email': self.students[2].email, 'mark': '50', 'type': 'final'},
+            {'email': self.students[2].email, 'mark': '60', 'type': 'final'},
+        ]
+        marks_import = imports.MarksImport(self.course, self.teacher, rows)
+        assert not marks_import.is_valid()
+        assert [error.line for error in marks_import.errors] == [3, 4, 5, 6, 7, 9]
+        with pytest.raises(ValueError):
+            marks_import.save()
+        assert not models.CourseMark.objects.exists()
+
+        assert not imports.MarksImport(self.course, self.teacher, []).is_valid()
+
+    def test_view(self, client):
+        url = reverse('courses:courses-marks-import', args=(self.course.slug,))
+        content = f'email,mark,description\n{self.students[0].email},70,"a, b"\n{self.students[1].email},20,\n'
+        client.force_login(self.teacher)
+        response = client.post(url, {'file': SimpleUploadedFile('marks.csv', content.encode())})
+        assert response.status_code == 302
+        assert sorted(self.course.marks.values_list('mark', 'description')) == [(20, ''), (70, 'a, b')]
+
+        content = f'email,mark\n{self.students[0].email},70\nunknown@example.com,20\n'
+        client.post(url, {'file': SimpleUploadedFile('marks.csv', content.encode())})
+        assert self.course.marks.count() == 2
+
+        client.force_login(self.students[0])
+        client.post(url, {'file': SimpleUploadedFile('marks.csv', content.encode())})
+        assert self.course.marks.count() == 2
+
+    def test_api(self, client):
+        url = reverse('courses:api-marks-import', args=(self.course.slug,))
+        assert client.post(url).status_code == 401
+
+        client.force_login(users_factories.TeacherFactory())
+        assert client.post(url, {'marks': []}, content_type='application/json').status_code == 403
+
+        client.force_login(self.teacher)
+        response = client.post(url, {'marks': [
+            {'email': self.students[0].email, 'mark': 70},
+            {'email': 'unknown@example.com', 'mark': 20},
+        ]}, content_type='application/json')
+        assert response.status_code == 400
+        assert [error['line'] for error in response.json()['errors']] == [2]
+
+        response = client.post(url, {'marks': [
+            {'email': self.students[0].email, 'mark': 70, 'type': 'final', 'description': None},
+        ]}, content_type='application/json')
+        assert response.json() == {'created': 1, 'updated': 0}
+
+        content = f'email,mark\n{self.students[1].email},50\n'
+        response = client.post(url, {'file': SimpleUploadedFile('marks.csv', content.encode())})
+        assert response.json() == {'created': 1, 'updated': 0}
+        assert client.post(url, {'marks': 'abc'}, content_type='application/json').status_code == 400
@@ -0,0 +1,52 @@
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from courses import models
+from tests.courses import factories as course_factories
+from users import models as users_models
+
+pytestmark = pytest.mark.skipif(connection.vendor != 'postgresql', reason='query plans are checked on PostgreSQL')
+
+
+@pytest.mark.django_db
+class TestQueryPlans:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, db):
+        self.course = course_factories.CourseFactory()
+        group = course_factories.GroupFactory(course=self.course)
+        self.laboratory = course_factories.LabFactory(course=self.course, group=group)
+        # tables are tiny in tests, so sequential scans have to be disabled to see index usage
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assert_uses_index(self, queryset, index_name):
+        plan = queryset.explain()
+        assert index_name in plan, plan
+
+    def test_course_marks_of_student(self):
+        student = self.course.grade.students.first()
+        self.assert_uses_index(models.CourseMark.objects.filter(course=self.course, student=student),
+                               'coursemark_course_student_idx')
+
+    def test_previous_lecture(self):
+        self.assert_uses_index(self.course.lectures.filter(date__lt=timezone.now()).order_by('-date'),
+                               'lecture_course_date_idx')
+
+    def test_previous_laboratory(self):
+        self.assert_uses_index(
+            self.course.laboratories.filter(date__lt=timezone.now(), group=self.laboratory.group).order_by('-date'),
+            'lab_course_group_date_idx'
+        )
+
+    def test_course_notices(self):
+        self.assert_uses_index(models.CourseNotice.objects.filter(course=self.course).order_by('-created_at'),
+                               'notice_course_created_idx')
+
+    def test_laboratory_assignments(self):
+        self.assert_uses_index(models.Assignment.objects.filter(laboratory=self.laboratory,
+                                                                deadline__gte=timezone.now()),
+                               'assignment_lab_deadline_idx')
+
+    def test_users_by_role(self):
+        self.assert_uses_index(users_models.User.objects.filter(role='student'), 'user_role_idx')
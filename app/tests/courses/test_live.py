@@ -0,0 +1,127 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.conf import settings as django_settings
+from django.urls import reverse
+
+from courses import imports, live
+from tests.courses import factories as course_factories
+from tests.users import factories as users_factories
+from utils import live as live_utils
+
+
+@pytest.fixture
+def published(settings, monkeypatch):
+    settings.LIVE_ENABLED = True
+    events = []
+    monkeypatch.setattr(live_utils.transaction, 'on_commit', lambda callback: callback())
+    monkeypatch.setattr(
+        live_utils.LocalBroker, 'publish', lambda self, channels, data: events.append((channels, json.loads(data)))
+    )
+    return events
+
+
+@pytest.mark.django_db
+class TestEvents:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, db):
+        self.teacher = users_factories.TeacherFactory()
+        self.student = users_factories.StudentFactory()
+        grade = course_factories.GradeFactory(students=[self.student])
+        self.course = course_factories.CourseFactory(grade=grade, head_teacher=self.teacher, teachers=[self.teacher])
+        self.group = course_factories.GroupFactory(course=self.course, students=[self.student])
+        self.laboratory = course_factories.LabFactory(course=self.course, group=self.group)
+
+    def test_published(self, published):
+        notice = course_factories.NoticeFactory(course=self.course, sender=self.teacher)
+        mark = course_factories.CourseMarkFactory(course=self.course, student=self.student, teacher=self.teacher)
+        assignment = course_factories.AssignmentFactory(laboratory=self.laboratory, teacher=self.teacher)
+        mark.save()
+        assert published == [
+            ([f'live:course:{self.course.pk}'], {
+                'type': 'notice', 'id': notice.pk, 'course': self.course.pk, 'title': notice.title,
+            }),
+            ([f'live:user:{self.student.pk}'], {
+                'type': 'mark', 'id': mark.pk, 'course': self.course.pk, 'mark': mark.mark,
+            }),
+            ([f'live:group:{self.group.pk}'], {
+                'type': 'assignment', 'id': assignment.pk, 'course': self.course.pk, 'title': assignment.title,
+            }),
+        ]
+
+    def test_import_published(self, published):
+        marks_import = imports.MarksImport(self.course, self.teacher, [{'email': self.student.email, 'mark': '90'}])
+        assert marks_import.is_valid()
+        marks_import.save()
+        assert published == [([f'live:user:{self.student.pk}'], {'type': 'marks', 'course': self.course.pk})]
+
+    def test_disabled(self, published, settings):
+        settings.LIVE_ENABLED = False
+        course_factories.NoticeFactory(course=self.course, sender=self.teacher)
+        assert published == []
+
+    def test_messages_shown_as_text(self, client, settings):
+        # titles of notices and assignments may contain markup, ex. `<img src=x onerror=alert(1)>`
+        settings.LIVE_ENABLED = True
+        client.force_login(self.student)
+        content = client.get(reverse('users:dashboard')).content.decode()
+        assert 'titleText: liveMessages[event.type](event)' in content
+        assert 'title: liveMessages' not in content
+
+    def test_channels(self):
+        other_course = course_factories.CourseFactory(head_teacher=self.teacher, teachers=[self.teacher])
+        other_course.additional_students.add(self.student)
+        assert sorted(live.CoursesLiveConsumer().get_channels(self.student)) == sorted([
+            f'live:user:{self.student.pk}', f'live:course:{self.course.pk}',
+            f'live:course:{other_course.pk}', f'live:group:{self.group.pk}',
+        ])
+        assert live.CoursesLiveConsumer().get_channels(self.teacher) == [f'live:user:{self.teacher.pk}']
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConsumer:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, settings, client):
+        settings.LIVE_ENABLED = True
+        settings.ALLOWED_HOSTS = ['testserver']
+        self.student = users_factories.StudentFactory()
+        client.force_login(self.student)
+        self.session_key = client.cookies[django_settings.SESSION_COOKIE_NAME].value
+
+    def get_scope(self, origin: str = 'http://testserver', session_key: str = None):
+        cookie = f'{django_settings.SESSION_COOKIE_NAME}={session_key or self.session_key}'
+        return {
+            'type': 'websocket',
+            'path': django_settings.LIVE_PATH,
+            'headers': [(b'host', b'testserver'), (b'origin', origin.encode()), (b'cookie', cookie.encode())],
+        }
+
+    @async_to_sync
+    async def connect(self, scope):
+        communicator = ApplicationCommunicator(live.CoursesLiveConsumer(), scope)
+        await communicator.send_input({'type': 'websocket.connect'})
+        return communicator, await communicator.receive_output(timeout=5)
+
+    def test_rejected(self):
+        for scope in (self.get_scope(origin='http://example.com'), self.get_scope(session_key='invalid')):
+            _, message = self.connect(scope)
+            assert message == {'type': 'websocket.close', 'code': 4401}
+
+    def test_events(self):
+        @async_to_sync
+        async def receive_event():
+            communicator = ApplicationCommunicator(live.CoursesLiveConsumer(), self.get_scope())
+            await communicator.send_input({'type': 'websocket.connect'})
+            assert await communicator.receive_output(timeout=5) == {'type': 'websocket.accept'}
+            live_utils.publish([f'live:user:{self.student.pk}'], {'type': 'mark'})
+            live_utils.publish(['live:user:0'], {'type': 'mark'})
+            event = await communicator.receive_output(timeout=5)
+            assert await communicator.receive_nothing()
+            await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+            await communicator.wait(timeout=5)
+            return event
+
+        assert receive_event() == {'type': 'websocket.send', 'text': json.dumps({'type': 'mark'})}
+        assert not live_utils.get_broker().listeners
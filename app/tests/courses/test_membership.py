@@ -0,0 +1,54 @@
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from courses.membership import CourseMembership, get_membership
+from tests.courses import factories as course_factories
+from tests.users import factories as users_factories
+
+
+@pytest.mark.django_db
+class TestCourseMembership:
+    def setup_method(self):
+        self.student = users_factories.StudentFactory()
+        self.teacher = users_factories.TeacherFactory()
+        grade = course_factories.GradeFactory(students=[self.student])
+        self.course = course_factories.CourseFactory(grade=grade, teachers=[self.teacher])
+
+    def test_is_teacher(self):
+        assert CourseMembership(self.teacher).is_teacher(self.course)
+        assert not CourseMembership(users_factories.TeacherFactory()).is_teacher(self.course)
+
+    def test_is_student(self):
+        assert CourseMembership(self.student).is_student(self.course)
+        assert not CourseMembership(users_factories.StudentFactory()).is_student(self.course)
+
+    def test_is_additional_student(self):
+        student = users_factories.StudentFactory()
+        assert not CourseMembership(student).is_additional_student(self.course)
+        self.course.additional_students.add(student)
+        assert CourseMembership(student).is_additional_student(self.course)
+
+    def test_is_group_student(self):
+        group = course_factories.GroupFactory(course=self.course, students=[self.student])
+        assert CourseMembership(self.student).is_group_student(group)
+        assert not CourseMembership(users_factories.StudentFactory()).is_group_student(group)
+        assert not CourseMembership(self.student).is_group_student(None)
+
+    def test_is_member(self):
+        assert CourseMembership(self.student).is_member(self.course)
+        assert CourseMembership(self.teacher).is_member(self.course)
+        assert not CourseMembership(users_factories.StudentFactory()).is_member(self.course)
+
+    def test_membership_is_memoized(self):
+        membership = CourseMembership(self.teacher)
+        with CaptureQueriesContext(connection) as queries:
+            membership.is_teacher(self.course)
+            membership.is_teacher(self.course)
+        assert len(queries) == 1
+
+    def test_get_membership_is_shared_within_request(self):
+        request = RequestFactory().get('/')
+        request.user = self.student
+        assert get_membership(request) is get_membership(request)
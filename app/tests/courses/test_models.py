@@ -2,6 +2,7 @@ import datetime
 import pytest
 from django.core.exceptions import ValidationError
 
+from courses import models
 from tests.courses import factories as course_factories
 from tests.users import factories as users_factories
 
@@ -41,6 +42,43 @@ class TestCourseModel:
         course = course_factories.CourseFactory()
         assert list(course.total_students) == course.students_without_groups
 
+    def test_ungrouped_students(self):
+        students = users_factories.StudentFactory.create_batch(3)
+        course = course_factories.CourseFactory(grade=course_factories.GradeFactory(students=students))
+        course_factories.GroupFactory(course=course, students=students[:2])
+        course_factories.GroupFactory(course=course_factories.CourseFactory(), students=[students[2]])
+        assert list(course.ungrouped_students()) == [students[2]]
+
+    def test_assign_students_to_groups(self):
+        students = users_factories.StudentFactory.create_batch(5)
+        course = course_factories.CourseFactory(grade=course_factories.GradeFactory(students=students))
+        group = course_factories.GroupFactory(course=course, students=students[:1])
+
+        assert course.assign_students_to_groups(group_size=2) == 4
+        assert not course.ungrouped_students().exists()
+        assert group.students.count() == 2
+        assert [g.students.count() for g in course.groups.order_by('pk')] == [2, 2, 1]
+
+    def test_assigned_group_names(self):
+        students = users_factories.StudentFactory.create_batch(3)
+        course = course_factories.CourseFactory(grade=course_factories.GradeFactory(students=students))
+        course_factories.GroupFactory(course=course, name='Grupa 2', students=[])
+        course_factories.GroupFactory(course=course, name='Grupa A', students=[])
+
+        assert course.assign_students_to_groups(group_size=1) == 3
+        assert set(course.groups.values_list('name', flat=True)) == {'Grupa 2', 'Grupa A', 'Grupa 3'}
+
+        course.groups.filter(name='Grupa 2').delete()
+        course.grade.students.add(users_factories.StudentFactory())
+        course.assign_students_to_groups(group_size=1)
+        assert course.groups.filter(name='Grupa 4').exists()
+
+    def test_actual_courses(self):
+        actual = course_factories.CourseFactory(start_date=datetime.date.today())
+        course_factories.CourseFactory(start_date=datetime.date.today() - datetime.timedelta(days=365))
+        assert list(models.Course.objects.actual()) == [actual]
+        assert actual.is_actual
+
 
 @pytest.mark.django_db
 class TestCourseGroupModel:
@@ -136,6 +174,23 @@ class TestCourseMarkModel:
         mark = course_factories.CourseMarkFactory(mark=90)
         assert mark.mark_decimal == 5.0
 
+    def test_decimal_mark_annotation(self):
+        for mark in models.CourseMark.objects.with_decimal_mark():
+            assert mark.decimal_mark == mark.mark_decimal
+
+    def test_summary_by_course(self):
+        course = course_factories.CourseFactory()
+        student = users_factories.StudentFactory()
+        course_factories.CourseMarkFactory(course=course, student=student, mark=40)
+        course_factories.CourseMarkFactory(course=course, student=student, mark=90)
+
+        summary = student.courses_marks.summary_by_course().get()
+        assert summary['course'] == course.pk
+        assert summary['sum'] == 130
+        assert summary['count'] == 2
+        assert summary['avg'] == 65
+        assert summary['avg_decimal'] == 3.5
+
 
 @pytest.mark.django_db
 class TestFinalCourseMarkModel:
@@ -144,6 +199,10 @@ class TestFinalCourseMarkModel:
         final_mark.save()
         assert f'Final Course Mark: {final_mark.student}, {final_mark.course}' == str(final_mark)
 
+    def test_by_course(self):
+        final_mark = course_factories.FinalCourseMarkFactory()
+        assert final_mark.student.courses_final_marks.by_course() == {final_mark.course_id: final_mark}
+
 
 @pytest.mark.django_db
 class TestCourseNoticeModel:
@@ -152,6 +211,57 @@ class TestCourseNoticeModel:
         notice.save()
         assert f'Course Notice: {notice.course}, {notice.title}' == str(notice)
 
+    def test_publish(self, django_assert_max_num_queries):
+        students = users_factories.StudentFactory.create_batch(3)
+        course = course_factories.CourseFactory(grade=course_factories.GradeFactory(students=students))
+        notice = course_factories.NoticeFactory(course=course)
+        with django_assert_max_num_queries(8):
+            notice.publish()
+
+        assert set(notice.not_viewed.all()) == set(students)
+        assert all(models.UnreadNoticeCounter.objects.total(student) == 1 for student in students)
+
+    def test_mark_as_read(self):
+        student = users_factories.StudentFactory()
+        course = course_factories.CourseFactory(grade=course_factories.GradeFactory(students=[student]))
+        notices = course_factories.NoticeFactory.create_batch(2, course=course)
+        for notice in notices:
+            notice.publish()
+        assert models.UnreadNoticeCounter.objects.total(student) == 2
+
+        models.CourseNotice.objects.filter(pk=notices[0].pk).mark_as_read(student)
+        assert models.UnreadNoticeCounter.objects.total(student) == 1
+        assert list(student.not_viewed_notices.all()) == [notices[1]]
+
+        models.CourseNotice.objects.all().mark_as_read(student)
+        assert models.UnreadNoticeCounter.objects.total(student) == 0
+
+    def test_counter_follows_not_viewed_changes(self):
+        students = users_factories.StudentFactory.create_batch(2)
+        notice = course_factories.NoticeFactory()
+        notice.not_viewed.add(*students)
+        notice.not_viewed.remove(students[0], users_factories.StudentFactory())
+        assert models.UnreadNoticeCounter.objects.total(students[0]) == 0
+        assert models.UnreadNoticeCounter.objects.total(students[1]) == 1
+
+        notice.not_viewed.clear()
+        assert models.UnreadNoticeCounter.objects.total(students[1]) == 0
+
+    def test_counter_follows_deletes(self):
+        students = users_factories.StudentFactory.create_batch(2)
+        course = course_factories.CourseFactory(grade=course_factories.GradeFactory(students=students))
+        notices = course_factories.NoticeFactory.create_batch(2, course=course)
+        for notice in notices:
+            notice.publish()
+
+        notices[0].delete()
+        assert models.UnreadNoticeCounter.objects.total(students[0]) == 1
+        assert models.UnreadNoticeCounter.objects.total(students[1]) == 1
+
+        students[0].delete()
+        assert not models.UnreadNoticeCounter.objects.filter(student_id=students[0].pk).exists()
+        assert models.UnreadNoticeCounter.objects.total(students[1]) == 1
+
 
 @pytest.mark.django_db
 class TestAssignmentModel:
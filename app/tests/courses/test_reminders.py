@@ -0,0 +1,82 @@
+import datetime
+
+import pytest
+from django.utils import timezone
+
+from courses import models, reminders, tasks
+from tests.courses import factories as course_factories
+from tests.users import factories as users_factories
+
+
+@pytest.mark.django_db
+class TestReminders:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, db, settings):
+        settings.EVENT_REMINDER_LEAD_TIME = datetime.timedelta(days=1)
+        settings.ASSIGNMENT_REMINDER_LEAD_TIME = datetime.timedelta(days=1)
+        self.now = timezone.now()
+        self.teacher = users_factories.TeacherFactory()
+        self.student = users_factories.StudentFactory()
+        self.group_student = users_factories.StudentFactory()
+        grade = course_factories.GradeFactory(students=[self.student, self.group_student])
+        self.course = course_factories.CourseFactory(grade=grade, head_teacher=self.teacher, teachers=[self.teacher])
+        self.group = course_factories.GroupFactory(course=self.course, students=[self.group_student])
+        self.lecture = course_factories.LectureFactory(course=self.course, date=self.now + datetime.timedelta(hours=2))
+        self.laboratory = course_factories.LabFactory(
+            course=self.course, group=self.group, date=self.now + datetime.timedelta(hours=3)
+        )
+
+    def test_due(self):
+        course_factories.LectureFactory(course=self.course, date=self.now + datetime.timedelta(days=2))
+        course_factories.LectureFactory(course=self.course, date=self.now - datetime.timedelta(hours=1))
+        course_factories.LectureFactory(
+            course=self.course, date=self.now + datetime.timedelta(hours=1), reminders=False
+        )
+        assert [pk for pk, date in reminders.get_due('lecture', self.now)] == [self.lecture.pk]
+
+    def test_schedule_once(self):
+        assert reminders.schedule_reminders(self.now) == 2
+        assert set(models.ReminderLedger.objects.values_list('kind', 'object_pk')) == {
+            ('lecture', self.lecture.pk), ('laboratory', self.laboratory.pk)
+        }
+        assert reminders.schedule_reminders(self.now) == 0
+
+        self.lecture.date = self.now + datetime.timedelta(hours=5)
+        self.lecture.save()
+        assert reminders.schedule_reminders(self.now) == 1
+
+    def test_limit(self):
+        assert reminders.schedule_reminders(self.now, limit=1) == 1
+        assert reminders.schedule_reminders(self.now, limit=1) == 1
+        assert reminders.schedule_reminders(self.now, limit=1) == 0
+
+    def test_ledger_retention(self, settings):
+        settings.REMINDERS_LEDGER_RETENTION_DAYS = 1
+        models.ReminderLedger.objects.create(
+            kind='lecture', object_pk=self.lecture.pk, scheduled_for=self.now - datetime.timedelta(days=2)
+        )
+        reminders.schedule_reminders(self.now)
+        assert not models.ReminderLedger.objects.filter(scheduled_for__lt=self.now).exists()
+
+    def test_recipients(self):
+        assert set(reminders.get_recipients('lecture', self.lecture)) == {self.student.email, self.group_student.email}
+        assert reminders.get_recipients('laboratory', self.laboratory) == [self.group_student.email]
+        assignment = course_factories.AssignmentFactory(
+            laboratory=self.laboratory, teacher=self.teacher, deadline=self.now + datetime.timedelta(hours=4)
+        )
+        assert reminders.get_recipients('assignment', assignment) == [self.group_student.email]
+
+    def test_send(self, mailoutbox, settings):
+        settings.EMAIL_BATCH_SIZE = 1
+        tasks.send_reminder_email('lecture', self.lecture.pk, self.lecture.date.isoformat())
+        assert sorted(email for mail in mailoutbox for email in mail.to) == sorted(
+            [self.student.email, self.group_student.email]
+        )
+
+    def test_send_rescheduled(self, mailoutbox):
+        date = self.laboratory.date.isoformat()
+        self.laboratory.date = self.now + datetime.timedelta(days=3)
+        self.laboratory.save()
+        tasks.send_reminder_email('laboratory', self.laboratory.pk, date)
+        tasks.send_reminder_email('laboratory', 0, date)
+        assert len(mailoutbox) == 0
@@ -0,0 +1,74 @@
+import datetime
+
+import pytest
+import pytz
+from django.urls import reverse
+
+from courses.schedule import Schedule, local_date, start_of_day
+from tests.courses import factories as course_factories
+from tests.users import factories as users_factories
+
+
+def test_local_date():
+    # 23:30 UTC is already the next day in Warsaw
+    assert local_date(datetime.datetime(2021, 1, 10, 23, 30, tzinfo=pytz.utc)) == datetime.date(2021, 1, 11)
+    assert start_of_day(datetime.date(2021, 1, 11)) == datetime.datetime(2021, 1, 10, 23, 0, tzinfo=pytz.utc)
+
+
+@pytest.mark.django_db
+class TestSchedule:
+    def setup_method(self):
+        self.today = datetime.date(2021, 1, 11)
+        self.teacher = users_factories.TeacherFactory()
+        self.student = users_factories.StudentFactory()
+        grade = course_factories.GradeFactory(students=[self.student])
+        self.course = course_factories.CourseFactory(grade=grade, teachers=[self.teacher])
+        self.group = course_factories.GroupFactory(course=self.course, students=[self.student])
+        other_group = course_factories.GroupFactory(course=self.course)
+
+        self.lecture = course_factories.LectureFactory(
+            course=self.course, date=datetime.datetime(2021, 1, 11, 23, 30, tzinfo=pytz.utc)
+        )
+        self.lab = course_factories.LabFactory(
+            course=self.course, group=self.group, date=datetime.datetime(2021, 1, 13, 10, tzinfo=pytz.utc)
+        )
+        self.other_lab = course_factories.LabFactory(
+            course=self.course, group=other_group, date=datetime.datetime(2021, 1, 13, 12, tzinfo=pytz.utc)
+        )
+        course_factories.LectureFactory(course=self.course, date=datetime.datetime(2021, 1, 25, tzinfo=pytz.utc))
+
+    def test_days(self):
+        days = Schedule.for_range(self.student, 'week', today=self.today).days
+        assert [day.date for day in days] == [self.today + datetime.timedelta(days=i) for i in range(7)]
+        assert days[1].lectures == [self.lecture]
+        assert days[2].labs == [self.lab]
+        assert sum(len(day.lectures) + len(day.labs) for day in days) == 2
+        assert [day.is_weekend for day in days] == [False] * 5 + [True] * 2
+
+    def test_teacher_gets_all_laboratories(self):
+        days = Schedule.for_range(self.teacher, 'week', today=self.today).days
+        assert days[2].labs == [self.lab, self.other_lab]
+
+    def test_pages(self):
+        schedule = Schedule.for_range(self.student, 'week', page=2, today=self.today)
+        assert schedule.dates[0] == datetime.date(2021, 1, 25)
+        assert len(schedule.lectures) == 1
+
+        schedule = Schedule.for_range(self.student, 'month', page=-1, today=self.today)
+        assert schedule.lectures == [] and schedule.laboratories == []
+
+    def test_queries(self, django_assert_num_queries):
+        with django_assert_num_queries(2):
+            Schedule.for_range(self.student, 'semester', today=self.today).days
+
+    def test_view(self, client):
+        url = reverse('users:schedule')
+        client.force_login(self.student)
+        response = client.get(url, {'range': 'month', 'page': 1})
+        assert response.status_code == 200
+        assert response.context['range'] == 'month'
+        assert len(response.context['schedule']) == 30
+
+        response = client.get(url, {'range': 'year', 'page': 'x'})
+        assert response.context['range'] == 'week'
+        assert response.context['page'] == 0
@@ -0,0 +1,96 @@
+import pytest
+from django.urls import reverse
+
+from courses import models, search
+from tests.courses import factories as course_factories
+from tests.users import factories as users_factories
+from utils import search as search_utils
+
+
+def test_normalize():
+    assert search_utils.normalize('  Łódź, ZAŻÓŁĆ gęślą-jaźń! ') == 'lodz zazolc gesla jazn'
+    assert search_utils.get_terms('Analiza analiza, matematyczna') == ['analiza', 'matematyczna']
+
+
+@pytest.mark.django_db
+class TestSearch:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, db):
+        self.teacher = users_factories.TeacherFactory(first_name='Jan', last_name='Kowalski')
+        self.student = users_factories.StudentFactory(first_name='Anastazja', last_name='Wiśniewska')
+        grade = course_factories.GradeFactory(students=[self.student])
+        self.course = course_factories.CourseFactory(
+            grade=grade, head_teacher=self.teacher, teachers=[self.teacher], name='Analiza matematyczna'
+        )
+        self.other_course = course_factories.CourseFactory(
+            grade=course_factories.GradeFactory(students=[users_factories.StudentFactory()]),
+            head_teacher=self.teacher, teachers=[self.teacher], name='Analiza danych',
+        )
+
+    def search(self, user, text, kinds=None):
+        return [(document.kind, document.object_pk) for document in search.search(user, text, kinds)]
+
+    def test_index(self):
+        notice = course_factories.NoticeFactory(
+            course=self.course, sender=self.teacher, title='Kolokwium', content='Termin kolokwium z całek'
+        )
+        assert self.search(self.student, 'calek') == [('notice', notice.pk)]
+
+        notice.title = 'Egzamin'
+        notice.save()
+        assert self.search(self.student, 'kolokwium') == [('notice', notice.pk)]
+        assert models.SearchDocument.objects.get(kind='notice').title == 'Egzamin'
+
+        notice.delete()
+        assert self.search(self.student, 'kolokwium') == []
+
+    def test_visibility(self):
+        course_factories.NoticeFactory(course=self.other_course, sender=self.teacher, title='Analiza wyników')
+        assert self.search(self.student, 'analiza') == [('course', self.course.pk)]
+        assert set(self.search(self.teacher, 'analiza', ['course'])) == {
+            ('course', self.course.pk), ('course', self.other_course.pk)
+        }
+        assert self.search(self.student, 'wisniewska kowalski') == []
+        assert self.search(self.student, 'wiśniewska anastazja') == [('user', self.student.pk)]
+
+    def test_files(self):
+        lecture = course_factories.LectureFactory(course=self.course)
+        course_file = course_factories.CourseFileFactory(name='Wzory całek')
+        assert self.search(self.student, 'wzory') == []
+        lecture.files.add(course_file)
+        assert self.search(self.student, 'wzory') == [('file', course_file.pk)]
+
+    def test_rank(self):
+        notice = course_factories.NoticeFactory(
+            course=self.course, sender=self.teacher, title='Ogłoszenie', content='Materiały z analizy'
+        )
+        assert self.search(self.student, 'anali') == [('course', self.course.pk), ('notice', notice.pk)]
+
+    def test_inactive_user(self):
+        self.student.is_active = False
+        self.student.save()
+        assert self.search(self.teacher, 'anastazja') == []
+
+    def test_api(self, client):
+        url = reverse('courses:api-search')
+        assert client.get(url, {'q': 'analiza'}).status_code == 403
+
+        client.force_login(self.student)
+        response = client.get(url, {'q': 'analiza', 'kind': 'course,user'})
+        assert response.json()['count'] == 1
+        assert response.json()['results'] == [{
+            'kind': 'course', 'id': self.course.pk, 'title': self.course.name, 'course': self.course.slug,
+            'rank': 3, 'url': reverse('courses:courses-detail', args=(self.course.slug,)),
+        }]
+        assert client.get(url, {'q': 'analiza', 'kind': 'notice'}).json()['count'] == 0
+
+    def test_views(self, client):
+        client.force_login(self.teacher)
+        response = client.get(reverse('courses:courses'), {'name': 'ANALIZA matem'})
+        assert list(response.context['courses']) == [self.course]
+        response = client.get(reverse('courses:courses'), {'teacher': 'kowalski'})
+        assert set(response.context['courses']) == {self.course, self.other_course}
+
+        course_factories.CourseMarkFactory(course=self.course, student=self.student, teacher=self.teacher)
+        response = client.get(reverse('courses:courses-marks', args=(self.course.slug,)), {'student': 'wisniewska'})
+        assert [mark.student for mark in response.context['marks']] == [self.student]
@@ -1,7 +1,14 @@
+import smtplib
+from unittest import mock
+
 import pytest
+from celery.exceptions import Retry
 from django.conf import settings
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import override_settings
 
-from courses.tasks import send_new_assignment_notification_email
+from courses.tasks import (send_new_assignment_notification_email,
+                           send_new_notice_notification_email)
 from tests.courses import factories as course_factories
 from tests.users import factories as users_factories
 
@@ -17,8 +24,65 @@ class TestSendCourseTask:
         group.save()
         lab = course_factories.LabFactory(course=course, group=group)
         assignment = course_factories.AssignmentFactory(laboratory=lab)
-        send_new_assignment_notification_email(assignment, bcc=[], email_to=[user.email])
+        send_new_assignment_notification_email(assignment.pk, bcc=[], email_to=[user.email])
 
         assert len(mailoutbox) == 1
         assert mailoutbox[0].bcc == []
         assert mailoutbox[0].to == [user.email]
+
+    def test_notice_notification_email_batches(self, mailoutbox):
+        notice = course_factories.NoticeFactory()
+        emails = [f'student{i}@example.com' for i in range(5)]
+        with override_settings(EMAIL_BATCH_SIZE=2):
+            send_new_notice_notification_email.delay(notice.pk, bcc=[], email_to=emails)
+
+        assert len(mailoutbox) == 5
+        assert [message.to for message in mailoutbox] == [[email] for email in emails]
+        assert len({message.connection for message in mailoutbox}) == 3
+
+    def test_bcc_gets_single_copy(self, mailoutbox):
+        notice = course_factories.NoticeFactory()
+        emails = [f'student{i}@example.com' for i in range(5)]
+        with override_settings(EMAIL_BATCH_SIZE=2):
+            send_new_notice_notification_email.delay(notice.pk, bcc=['archive@example.com'], email_to=emails)
+
+        assert [message.bcc for message in mailoutbox] == [['archive@example.com']] + [[]] * 4
+
+    def test_notification_email_of_deleted_notice(self, mailoutbox):
+        notice = course_factories.NoticeFactory()
+        notice_pk = notice.pk
+        notice.delete()
+        send_new_notice_notification_email(notice_pk, bcc=[], email_to=['student@example.com'])
+        assert len(mailoutbox) == 0
+
+    def test_notice_notification_email_is_rendered_once(self, mailoutbox):
+        notice = course_factories.NoticeFactory()
+        emails = [f'student{i}@example.com' for i in range(5)]
+        with override_settings(EMAIL_BATCH_SIZE=2), \
+                mock.patch('utils.emails.loader.render_to_string', return_value='rendered') as render_to_string:
+            send_new_notice_notification_email.delay(notice.pk, bcc=[], email_to=emails)
+
+        assert render_to_string.call_count == 2
+        assert len(mailoutbox) == 5
+        assert all(message.body == 'rendered' for message in mailoutbox)
+
+    def test_retry_skips_mailed_recipients(self, mailoutbox):
+        notice = course_factories.NoticeFactory()
+        emails = [f'student{i}@example.com' for i in range(3)]
+        send_messages = EmailBackend.send_messages
+        failures = []
+
+        def fail_once(backend, messages):
+            if messages[0].to == [emails[1]] and not failures:
+                failures.append(messages)
+                raise smtplib.SMTPServerDisconnected()
+            return send_messages(backend, messages)
+
+        with mock.patch.object(EmailBackend, 'send_messages', fail_once), pytest.raises(Retry) as retry:
+            send_new_notice_notification_email.delay(notice.pk, bcc=['archive@example.com'], email_to=emails)
+        assert [message.to for message in mailoutbox] == [[emails[0]]]
+        retry.value.sig.apply()
+
+        assert len(failures) == 1
+        assert [message.to for message in mailoutbox] == [[email] for email in emails]
+        assert [message.bcc for message in mailoutbox] == [['archive@example.com'], [], []]
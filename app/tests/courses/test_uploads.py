@@ -0,0 +1,155 @@
+import io
+
+import pytest
+from django.core.files.base import ContentFile
+from django.test import RequestFactory
+from django.urls import reverse
+
+from core import storage_backends
+from courses import models, uploads
+from tests.courses import factories as course_factories
+from tests.users import factories as users_factories
+from utils import responses
+
+CONTENT = b'0123456789'
+
+
+class TestRangedFileResponse:
+    def get(self, **headers):
+        request = RequestFactory().get('/', **headers)
+        return responses.ranged_file_response(request, io.BytesIO(CONTENT), len(CONTENT), 'wykład.txt', etag='1')
+
+    def test_full(self):
+        response = self.get()
+        assert response.status_code == 200
+        assert response['Accept-Ranges'] == 'bytes'
+        assert b''.join(response.streaming_content) == CONTENT
+
+    def test_range(self):
+        response = self.get(HTTP_RANGE='bytes=2-5')
+        assert response.status_code == 206
+        assert response['Content-Range'] == 'bytes 2-5/10'
+        assert response['Content-Disposition'] == "inline; filename*=utf-8''wyk%C5%82ad.txt"
+        assert b''.join(response.streaming_content) == b'2345'
+
+        assert b''.join(self.get(HTTP_RANGE='bytes=-3').streaming_content) == b'789'
+        assert b''.join(self.get(HTTP_RANGE='bytes=8-').streaming_content) == b'89'
+        assert self.get(HTTP_RANGE='bytes=8-100')['Content-Range'] == 'bytes 8-9/10'
+
+    def test_invalid_range(self):
+        response = self.get(HTTP_RANGE='bytes=20-')
+        assert response.status_code == 416
+        assert response['Content-Range'] == 'bytes */10'
+        assert self.get(HTTP_RANGE='bytes=-0').status_code == 416
+        assert self.get(HTTP_RANGE='bytes=1-2,4-5').status_code == 200
+        assert self.get(HTTP_RANGE='bytes=1-2', HTTP_IF_RANGE='"2"').status_code == 200
+        assert self.get(HTTP_RANGE='bytes=1-2', HTTP_IF_RANGE='"1"').status_code == 206
+
+
+@pytest.mark.django_db
+class TestCourseFiles:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, db, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+        self.teacher = users_factories.TeacherFactory()
+        self.student = users_factories.StudentFactory()
+        grade = course_factories.GradeFactory(students=[self.student])
+        self.course = course_factories.CourseFactory(grade=grade, head_teacher=self.teacher, teachers=[self.teacher])
+        self.lecture = course_factories.LectureFactory(course=self.course)
+
+    def test_download(self, client, settings):
+        course_file = models.CourseFile.objects.create(name='Notatki', file=ContentFile(CONTENT, name='notes.txt'))
+        self.lecture.files.add(course_file)
+        url = reverse('courses:file-download', args=(course_file.pk,))
+
+        client.force_login(users_factories.StudentFactory())
+        assert client.get(url).status_code == 404
+
+        client.force_login(self.student)
+        response = client.get(url, HTTP_RANGE='bytes=0-3')
+        assert response.status_code == 206
+        assert b''.join(response.streaming_content) == b'0123'
+
+        settings.FILES_ACCEL_REDIRECT_PREFIX = '/protected/'
+        response = client.get(url)
+        assert response['X-Accel-Redirect'] == f'/protected/{course_file.file.name}'
+        assert response.content == b''
+
+    def create_upload(self, client, **data):
+        return client.post(reverse('courses:api-file-upload'), {
+            'event': 'lecture', 'pk': self.lecture.pk, 'name': 'Nagranie', 'filename': 'nagranie.mp4', **data
+        }, content_type='application/json')
+
+    def complete_upload(self, client, token):
+        return client.post(reverse('courses:api-file-upload-complete'), {'token': token},
+                           content_type='application/json')
+
+    def test_direct_upload(self, client):
+        client.force_login(self.teacher)
+        response = self.create_upload(client)
+        assert response.status_code == 201
+        token, upload = response.json()['token'], response.json()['upload']
+        assert upload == {'url': reverse('courses:file-upload-local'), 'fields': {'token': token}}
+        assert self.complete_upload(client, token).status_code == 409
+
+        response = client.post(upload['url'], {**upload['fields'], 'file': ContentFile(CONTENT, name='nagranie.mp4')})
+        assert response.status_code == 204
+        response = self.complete_upload(client, token)
+        assert response.status_code == 201
+        course_file = self.lecture.files.get()
+        assert response.json()['id'] == course_file.pk
+        assert course_file.name == 'Nagranie'
+        assert course_file.file.read() == CONTENT
+
+        assert self.complete_upload(client, token).json()['id'] == course_file.pk
+        assert client.post(upload['url'], {**upload['fields'], 'file': ContentFile(b'x', name='x')}).status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_direct_upload_moved_to_blob(self, client):
+        client.force_login(self.teacher)
+        data = self.create_upload(client).json()
+        token, upload = data['token'], data['upload']
+        client.post(upload['url'], {**upload['fields'], 'file': ContentFile(CONTENT, name='nagranie.mp4')})
+        course_file = models.CourseFile.objects.get(pk=self.complete_upload(client, token).json()['id'])
+        assert course_file.blob is not None
+        assert course_file.file.name == course_file.blob.path
+
+        assert self.complete_upload(client, token).json()['id'] == course_file.pk
+        assert models.CourseFile.objects.count() == 1
+
+    def test_direct_upload_permissions(self, client):
+        client.force_login(self.student)
+        assert self.create_upload(client).status_code == 401
+
+        client.force_login(self.teacher)
+        assert self.create_upload(client, event='course').status_code == 400
+        token = self.create_upload(client).json()['token']
+
+        client.force_login(users_factories.TeacherFactory())
+        assert self.create_upload(client).status_code == 403
+        assert self.complete_upload(client, token).status_code == 400
+        assert self.complete_upload(client, token + 'x').status_code == 400
+
+    def test_invalid_upload(self, client):
+        client.force_login(self.teacher)
+        assert self.create_upload(client, pk='abc').status_code == 400
+        assert self.create_upload(client, name=['Nagranie']).status_code == 400
+        assert self.create_upload(client, filename={'name': 'nagranie.mp4'}).status_code == 400
+        assert self.create_upload(client, event=['lecture']).status_code == 400
+        assert self.complete_upload(client, ['token']).status_code == 400
+
+        data = self.create_upload(client).json()
+        token, upload = data['token'], data['upload']
+        client.post(upload['url'], {**upload['fields'], 'file': ContentFile(CONTENT, name='nagranie.mp4')})
+        self.lecture.delete()
+        assert self.complete_upload(client, token).status_code == 404
+
+    def test_s3_upload(self, settings, monkeypatch):
+        storage = storage_backends.PublicMediaStorage(
+            bucket_name='raven', access_key='key', secret_key='secret', region_name='eu-central-1'
+        )
+        monkeypatch.setattr(uploads, 'default_storage', storage)
+        upload = uploads.S3DirectUpload().get_upload('uploads/2021-01-01/nagranie.mp4', 'token')
+        assert upload['fields']['key'] == 'media/uploads/2021-01-01/nagranie.mp4'
+        assert upload['fields']['acl'] == 'public-read'
+        assert 'raven' in upload['url']
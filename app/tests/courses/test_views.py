@@ -680,6 +680,20 @@ class TestCoursesGroupEditView:
         response = client.get(url)
         assert response.status_code == 302
 
+    def test_group_auto_assign(self, client):
+        url = reverse('courses:group-auto-assign', args=(self.course.slug,))
+        client.force_login(self.student)
+        response = client.post(url, {'group_size': 10})
+        assert response.url == reverse('courses:courses')
+        assert self.student in self.course.students_without_groups
+
+        self.course.teachers.add(self.teacher)
+        client.force_login(self.teacher)
+        response = client.post(url, {'group_size': 10})
+        assert response.url == reverse('courses:group', args=(self.course.slug,))
+        assert self.course.students_without_groups == []
+        assert self.student in self.group.students.all()
+
     def test_group_join(self, client):
         url = reverse('courses:group-join-group', args=(self.course.slug, 0,))
         client.force_login(self.teacher)
@@ -0,0 +1,165 @@
+import datetime
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from courses import models as courses_models
+from tests.courses import factories as course_factories
+from tests.users import factories as users_factories
+
+
+@pytest.mark.django_db
+class TestSyncApi:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, db):
+        self.teacher = users_factories.TeacherFactory()
+        self.student = users_factories.StudentFactory()
+        grade = course_factories.GradeFactory(students=[self.student])
+        self.course = course_factories.CourseFactory(grade=grade, head_teacher=self.teacher, teachers=[self.teacher])
+        self.group = course_factories.GroupFactory(course=self.course, students=[self.student])
+        self.marks = [
+            course_factories.CourseMarkFactory(course=self.course, student=self.student, teacher=self.teacher)
+            for _ in range(3)
+        ]
+
+    def test_marks(self, client, django_assert_max_num_queries):
+        url = reverse('api-v1:marks')
+        assert client.get(url).status_code == 403
+
+        client.force_login(self.student)
+        course_factories.CourseMarkFactory(course=self.course, teacher=self.teacher)
+        with django_assert_max_num_queries(4):
+            response = client.get(url, {'page_size': 2})
+        data = response.json()
+        assert [mark['pk'] for mark in data['results']] == [mark.pk for mark in self.marks[:2]]
+        assert data['results'][0]['course'] == self.course.slug
+        assert data['results'][0]['mark_decimal'] == self.marks[0].mark_decimal
+        assert [mark['pk'] for mark in client.get(data['next']).json()['results']] == [self.marks[2].pk]
+
+        client.force_login(self.teacher)
+        assert len(client.get(url).json()['results']) == 4
+
+    def test_since(self, client):
+        client.force_login(self.student)
+        url = reverse('api-v1:marks')
+        since = timezone.now()
+        courses_models.CourseMark.objects.filter(pk=self.marks[0].pk).update(
+            updated_at=since - datetime.timedelta(days=1)
+        )
+        courses_models.CourseMark.objects.exclude(pk=self.marks[0].pk).update(
+            updated_at=since - datetime.timedelta(days=2)
+        )
+        self.marks[1].mark = 99
+        self.marks[1].save()
+
+        for value in (since.isoformat(), str(since.timestamp())):
+            results = client.get(url, {'since': value}).json()['results']
+            assert [(mark['pk'], mark['mark']) for mark in results] == [(self.marks[1].pk, 99)]
+        assert client.get(url, {'since': 'yesterday'}).status_code == 400
+
+    def test_conditional_requests(self, client):
+        client.force_login(self.student)
+        url = reverse('api-v1:final-marks')
+        course_factories.FinalCourseMarkFactory(course=self.course, student=self.student, teacher=self.teacher)
+        response = client.get(url)
+        assert response.status_code == 200
+        assert len(response.json()['results']) == 1
+
+        assert client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code == 304
+        assert client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code == 304
+
+        courses_models.FinalCourseMark.objects.get().delete()
+        assert client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code == 200
+        assert client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code == 200
+
+    def test_deleted_since(self, client, settings):
+        client.force_login(self.student)
+        url = reverse('api-v1:marks')
+        since = timezone.now()
+        deleted_pk = self.marks[0].pk
+        self.marks[0].delete()
+        self.marks[1].mark = 99
+        self.marks[1].save()
+
+        data = client.get(url, {'since': since.isoformat()}).json()
+        assert [mark['pk'] for mark in data['results']] == [self.marks[1].pk]
+        assert data['deleted'] == [deleted_pk]
+        assert not data['reset']
+        assert client.get(reverse('api-v1:final-marks'), {'since': since.isoformat()}).json()['deleted'] == []
+        assert 'deleted' not in client.get(url).json()
+
+        settings.SYNC_TOMBSTONES_RETENTION_DAYS = 1
+        data = client.get(url, {'since': (since - datetime.timedelta(days=2)).isoformat()}).json()
+        assert data['reset']
+        courses_models.SyncTombstone.objects.collect(timezone.now() + datetime.timedelta(days=2))
+        assert not courses_models.SyncTombstone.objects.exists()
+
+    def test_membership_resets_since(self, client):
+        client.force_login(self.student)
+        since = timezone.now()
+        lab = course_factories.LabFactory(course=self.course, group=self.group)
+        assignment = course_factories.AssignmentFactory(laboratory=lab, teacher=self.teacher)
+        lab_pk, assignment_pk = lab.pk, assignment.pk
+        lab.delete()
+        data = client.get(reverse('api-v1:laboratories'), {'since': since.isoformat()}).json()
+        assert data['deleted'] == [lab_pk] and not data['reset']
+        data = client.get(reverse('api-v1:assignments'), {'since': since.isoformat()}).json()
+        assert data['deleted'] == [assignment_pk] and not data['reset']
+
+        self.group.students.remove(self.student)
+        data = client.get(reverse('api-v1:assignments'), {'since': since.isoformat()}).json()
+        assert data['reset']
+
+    def test_read_notices(self, client):
+        notice = course_factories.NoticeFactory(course=self.course, sender=self.teacher)
+        notice.not_viewed.add(self.student)
+        courses_models.CourseNotice.objects.update(updated_at=timezone.now() - datetime.timedelta(days=1))
+        client.force_login(self.student)
+        url = reverse('api-v1:notices')
+        response = client.get(url)
+        since = timezone.now()
+
+        courses_models.CourseNotice.objects.mark_as_read(self.student)
+        assert client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code == 200
+        results = client.get(url, {'since': since.isoformat()}).json()['results']
+        assert [(item['pk'], item['is_new']) for item in results] == [(notice.pk, False)]
+
+    def test_notices_and_assignments(self, client):
+        notice = course_factories.NoticeFactory(course=self.course, sender=self.teacher)
+        notice.not_viewed.add(self.student)
+        lab = course_factories.LabFactory(course=self.course, group=self.group)
+        assignment = course_factories.AssignmentFactory(laboratory=lab, teacher=self.teacher)
+        other_course = course_factories.CourseFactory(
+            grade=course_factories.GradeFactory(students=[users_factories.StudentFactory()]),
+            teachers=[users_factories.TeacherFactory()],
+        )
+        course_factories.NoticeFactory(course=other_course, sender=self.teacher)
+        course_factories.AssignmentFactory(teacher=self.teacher, laboratory=course_factories.LabFactory(
+            course=other_course, group=course_factories.GroupFactory(course=other_course)
+        ))
+
+        client.force_login(self.student)
+        notices = client.get(reverse('api-v1:notices')).json()['results']
+        assert [(item['pk'], item['is_new']) for item in notices] == [(notice.pk, True)]
+        assignments = client.get(reverse('api-v1:assignments')).json()['results']
+        assert [(item['pk'], item['course']) for item in assignments] == [(assignment.pk, self.course.slug)]
+
+        client.force_login(self.teacher)
+        notices = client.get(reverse('api-v1:notices')).json()['results']
+        assert [(item['pk'], item['is_new']) for item in notices] == [(notice.pk, False)]
+
+    def test_schedule(self, client):
+        now = timezone.now()
+        lecture = course_factories.LectureFactory(course=self.course, date=now + datetime.timedelta(days=1))
+        course_factories.LectureFactory(course=self.course, date=now + datetime.timedelta(days=365))
+        lab = course_factories.LabFactory(course=self.course, group=self.group, date=now)
+        course_factories.LabFactory(
+            course=self.course, group=course_factories.GroupFactory(course=self.course), date=now
+        )
+
+        client.force_login(self.student)
+        lectures = client.get(reverse('api-v1:lectures')).json()['results']
+        assert [item['pk'] for item in lectures] == [lecture.pk]
+        laboratories = client.get(reverse('api-v1:laboratories')).json()['results']
+        assert [(item['pk'], item['group']) for item in laboratories] == [(lab.pk, self.group.pk)]
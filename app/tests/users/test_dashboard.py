@@ -0,0 +1,84 @@
+import datetime
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from tests.courses import factories as course_factories
+from tests.users import factories as users_factories
+from users import dashboard
+from users import models as users_models
+
+
+@pytest.mark.django_db
+class TestDashboardSnapshot:
+    def setup_method(self):
+        self.student = users_factories.StudentFactory()
+        self.teacher = users_factories.TeacherFactory()
+        grade = course_factories.GradeFactory(students=[self.student])
+        self.course = course_factories.CourseFactory(grade=grade, teachers=[self.teacher],
+                                                     start_date=datetime.date.today())
+
+    def test_snapshot_is_created(self):
+        context = dashboard.get_dashboard_context(self.student)
+        snapshot = users_models.DashboardSnapshot.objects.get(user=self.student)
+        assert snapshot.is_fresh
+        assert context['courses_count'] == 1
+
+    def test_snapshot_is_reused(self, django_assert_num_queries):
+        dashboard.get_dashboard_context(self.student)
+        with django_assert_num_queries(1):
+            context = dashboard.get_dashboard_context(self.student)
+        assert [course['slug'] for course in context['courses']] == [self.course.slug]
+
+    def test_mark_invalidates_snapshot(self):
+        dashboard.get_dashboard_context(self.student)
+        course_factories.CourseMarkFactory(course=self.course, student=self.student, teacher=self.teacher)
+        assert not users_models.DashboardSnapshot.objects.get(user=self.student).is_fresh
+
+        context = dashboard.get_dashboard_context(self.student)
+        assert len(context['marks']) == 1
+        context = dashboard.get_dashboard_context(self.student)
+        assert isinstance(context['marks'][0]['date'], datetime.datetime)
+
+    def test_invalid_snapshot_is_rebuilt(self):
+        dashboard.get_dashboard_context(self.student)
+        users_models.DashboardSnapshot.objects.filter(user=self.student).update(data='{')
+        context = dashboard.get_dashboard_context(self.student)
+        assert context['courses_count'] == 1
+        assert dashboard.load_snapshot(users_models.DashboardSnapshot.objects.get(user=self.student)) == context
+
+    def test_notice_invalidates_course_snapshots(self):
+        dashboard.get_dashboard_context(self.student)
+        dashboard.get_dashboard_context(self.teacher)
+        course_factories.NoticeFactory(course=self.course, sender=self.teacher)
+        assert not users_models.DashboardSnapshot.objects.get(user=self.student).is_fresh
+        assert not users_models.DashboardSnapshot.objects.get(user=self.teacher).is_fresh
+
+    def test_grade_membership_invalidates_snapshot(self):
+        student = users_factories.StudentFactory()
+        dashboard.get_dashboard_context(student)
+        self.course.grade.students.add(student)
+        assert not users_models.DashboardSnapshot.objects.get(user=student).is_fresh
+
+    def test_expired_snapshot(self):
+        dashboard.get_dashboard_context(self.student)
+        users_models.DashboardSnapshot.objects.filter(user=self.student).update(
+            built_at=timezone.now() - datetime.timedelta(days=1)
+        )
+        assert not users_models.DashboardSnapshot.objects.get(user=self.student).is_fresh
+
+    def test_render_from_snapshot(self, client):
+        course_factories.CourseMarkFactory(
+            course=self.course, student=self.student, teacher=self.teacher, description='Kartkówka z całek'
+        )
+        course_factories.NoticeFactory(course=self.course, sender=self.teacher, title='Kolokwium')
+        course_factories.LectureFactory(
+            course=self.course, title='Całki', date=timezone.now() + datetime.timedelta(days=1), location='1'
+        )
+        client.force_login(self.student)
+        first = client.get(reverse('users:dashboard')).content.decode()
+        second = client.get(reverse('users:dashboard')).content.decode()
+        assert 'Kolokwium' in second and 'Całki' in second and self.course.name in second
+        assert 'Kartkówka z całek' in second and 'Zdalnie' in second
+        assert first == second
@@ -0,0 +1,60 @@
+import pytest
+from django.urls import reverse
+
+from tests.users import factories as users_factories
+from users import presence
+from users.api.serializers import StudentSerializer, TeacherSerializer
+
+
+@pytest.mark.django_db
+class TestPresence:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, db):
+        self.teacher = users_factories.TeacherFactory()
+        self.student = users_factories.StudentFactory()
+
+    def test_touch_and_remove(self):
+        assert not self.student.is_online
+        presence.touch(self.student.pk)
+        assert self.student.is_online
+        assert presence.get_online([self.student.pk, self.teacher.pk]) == {self.student.pk}
+        presence.remove(self.student.pk)
+        assert not self.student.is_online
+
+    def test_login_and_logout(self, client):
+        client.force_login(self.student)
+        assert self.student.is_online
+        client.logout()
+        assert not self.student.is_online
+
+    def test_middleware(self, client):
+        client.force_login(self.student)
+        presence.remove(self.student.pk)
+        client.get(reverse('users:dashboard'))
+        assert self.student.is_online
+
+    def test_serializers(self):
+        other = users_factories.TeacherFactory()
+        presence.touch(self.teacher.pk)
+        assert TeacherSerializer(self.teacher).data['is_online']
+        data = TeacherSerializer([self.teacher, other], many=True).data
+        assert [teacher['is_online'] for teacher in data] == [True, False]
+        assert not StudentSerializer(self.student).data['is_online']
+
+    def test_api(self, client):
+        url = reverse('users:api-presence')
+        assert client.get(url).status_code == 401
+
+        other = users_factories.StudentFactory()
+        client.force_login(self.teacher)
+        response = client.get(url, {'users': f'{self.teacher.pk},{other.pk}'})
+        assert response.status_code == 200
+        assert response.json() == {str(self.teacher.pk): True, str(other.pk): False}
+        assert client.get(url, {'users': 'a,b'}).status_code == 400
+
+    def test_api_limit(self, client, settings):
+        settings.PRESENCE_MAX_USERS = 2
+        client.force_login(self.teacher)
+        url = reverse('users:api-presence')
+        assert client.get(url, {'users': '1,2,2'}).status_code == 200
+        assert client.get(url, {'users': '1,2,3'}).status_code == 400
@@ -0,0 +1,62 @@
+import os
+import pickle
+import threading
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from utils.meetings import meetings
+
+
+def test_discovery_cache(tmp_path):
+    cache = meetings.FileDiscoveryCache(str(tmp_path / 'discovery'), ttl=60)
+    url = 'https://www.googleapis.com/discovery/v1/apis/calendar/v3/rest'
+    assert cache.get(url) is None
+
+    cache.set(url, '{"name": "calendar"}')
+    assert cache.get(url) == '{"name": "calendar"}'
+    assert os.listdir(str(tmp_path / 'discovery')) == [os.path.basename(cache.get_path(url))]
+
+    os.utime(cache.get_path(url), (0, 0))
+    assert cache.get(url) is None
+
+
+class TestCalendarClient:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, monkeypatch, settings, tmp_path):
+        self.builds = []
+
+        def build(*args, **kwargs):
+            self.builds.append((threading.get_ident(), kwargs))
+            return object()
+
+        monkeypatch.setattr(meetings, 'build', build)
+        settings.GOOGLE_API_CREDENTIALS_PATH = str(tmp_path / 'token.pkl')
+        settings.GOOGLE_CALENDAR_ID = 'calendar@raven'
+        with open(settings.GOOGLE_API_CREDENTIALS_PATH, 'wb') as file:
+            pickle.dump({'token': 'secret'}, file)
+
+    def test_lazy(self):
+        client = meetings.CalendarClient()
+        assert self.builds == []
+        assert client.calendar_id == 'calendar@raven'
+        assert self.builds == []
+
+        assert client.service is client.service
+        assert len(self.builds) == 1
+        assert self.builds[0][1]['credentials'] == {'token': 'secret'}
+        assert isinstance(self.builds[0][1]['cache'], meetings.FileDiscoveryCache)
+
+    def test_service_per_thread(self):
+        client = meetings.CalendarClient()
+        services = [client.service]
+        thread = threading.Thread(target=lambda: services.append(client.service))
+        thread.start()
+        thread.join()
+        assert services[0] is not services[1]
+        assert len({ident for ident, _ in self.builds}) == 2
+
+    def test_missing_credentials(self, settings):
+        settings.GOOGLE_API_CREDENTIALS_PATH = '/nonexistent/token.pkl'
+        with pytest.raises(ImproperlyConfigured):
+            meetings.CalendarClient().service
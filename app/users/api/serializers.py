@@ -1,15 +1,91 @@
 from rest_framework import serializers
 
-from users import models
+from courses import models as courses_models
+from users import models, presence
 
 
-class StudentSerializer(serializers.ModelSerializer):
+class PresenceListSerializer(serializers.ListSerializer):
+    """
+    Looks up the presence of all serialized users at once instead of once per user.
+    """
+
+    def to_representation(self, data):
+        users = list(data.all() if hasattr(data, 'all') else data)
+        if 'online_users' in self.context:
+            return super().to_representation(users)
+        self.child.online_users = presence.get_online(user.pk for user in users)
+        return super().to_representation(users)
+
+
+class UserPresenceSerializer(serializers.ModelSerializer):
+    is_online = serializers.SerializerMethodField()
+
+    def get_is_online(self, obj) -> bool:
+        # presence of all users serialized by a view may be looked up at once and passed in the context
+        online_users = self.context.get('online_users', getattr(self, 'online_users', None))
+        if online_users is None:
+            return obj.is_online
+        return obj.pk in online_users
+
+
+class StudentSerializer(UserPresenceSerializer):
     class Meta:
         model = models.Student
         fields = ('first_name', 'pk', 'last_name', 'email', 'is_online',)
+        list_serializer_class = PresenceListSerializer
 
 
-class TeacherSerializer(serializers.ModelSerializer):
+class TeacherSerializer(UserPresenceSerializer):
     class Meta:
         model = models.Teacher
         fields = ('first_name', 'pk', 'last_name', 'email', 'is_online',)
+        list_serializer_class = PresenceListSerializer
+
+
+class CourseMarkSerializer(serializers.ModelSerializer):
+    course = serializers.CharField(source='course.slug')
+    course_name = serializers.CharField(source='course.name')
+
+    class Meta:
+        model = courses_models.CourseMark
+        fields = ('pk', 'course', 'course_name', 'student', 'teacher', 'mark', 'mark_decimal', 'description',
+                  'date', 'updated_at',)
+
+
+class FinalCourseMarkSerializer(CourseMarkSerializer):
+    class Meta(CourseMarkSerializer.Meta):
+        model = courses_models.FinalCourseMark
+
+
+class CourseNoticeSerializer(serializers.ModelSerializer):
+    course = serializers.CharField(source='course.slug')
+    course_name = serializers.CharField(source='course.name')
+    is_new = serializers.BooleanField()
+
+    class Meta:
+        model = courses_models.CourseNotice
+        fields = ('pk', 'course', 'course_name', 'sender', 'title', 'content', 'is_new', 'created_at', 'updated_at',)
+
+
+class AssignmentSerializer(serializers.ModelSerializer):
+    course = serializers.CharField(source='laboratory.course.slug')
+
+    class Meta:
+        model = courses_models.Assignment
+        fields = ('pk', 'course', 'laboratory', 'teacher', 'title', 'content', 'deadline', 'updated_at',)
+
+
+class LectureSerializer(serializers.ModelSerializer):
+    course = serializers.CharField(source='course.slug')
+    course_name = serializers.CharField(source='course.name')
+
+    class Meta:
+        model = courses_models.Lecture
+        fields = ('pk', 'course', 'course_name', 'title', 'location', 'description', 'date', 'duration',
+                  'meeting_link', 'hangout_link', 'updated_at',)
+
+
+class LaboratorySerializer(LectureSerializer):
+    class Meta(LectureSerializer.Meta):
+        model = courses_models.Laboratory
+        fields = LectureSerializer.Meta.fields + ('group',)
@@ -0,0 +1,14 @@
+from django.urls import path
+
+from users.api import views
+
+app_name = 'api-v1'
+
+urlpatterns = [
+    path('marks/', views.MarksView.as_view(), name='marks'),
+    path('marks/final/', views.FinalMarksView.as_view(), name='final-marks'),
+    path('notices/', views.NoticesView.as_view(), name='notices'),
+    path('assignments/', views.AssignmentsView.as_view(), name='assignments'),
+    path('schedule/lectures/', views.LecturesView.as_view(), name='lectures'),
+    path('schedule/laboratories/', views.LaboratoriesView.as_view(), name='laboratories'),
+]
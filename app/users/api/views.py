@@ -0,0 +1,218 @@
+import datetime
+import hashlib
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db.models import (BooleanField, Count, Exists, Max, OuterRef,
+                              QuerySet, Value)
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date
+from rest_framework import generics
+from rest_framework.decorators import api_view
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from courses import ical
+from courses import models as courses_models
+from courses.schedule import get_user_courses
+from users import presence
+from utils import cache as cache_utils
+
+from . import serializers
+
+
+@api_view(['GET'])
+def users_presence(request):
+    """
+    Returns presence of users given as comma separated ids, ex. `?users=1,2,3`,
+    at most settings.PRESENCE_MAX_USERS users at once.
+    """
+    if not request.user.is_authenticated:
+        return Response(status=401)
+    try:
+        users_ids = {int(pk) for pk in request.query_params.get('users', '').split(',') if pk}
+    except ValueError:
+        return Response(status=400, data={'message': 'Niepoprawna lista użytkowników.'})
+    if len(users_ids) > settings.PRESENCE_MAX_USERS:
+        return Response(status=400, data={'message': 'Zbyt wielu użytkowników.'})
+    online_users = presence.get_online(users_ids)
+    return Response(status=200, data={str(pk): pk in online_users for pk in sorted(users_ids)})
+
+
+def parse_since(value: str) -> datetime.datetime:
+    """
+    Parses `since` given either as an ISO 8601 datetime or a unix timestamp.
+    """
+    try:
+        return datetime.datetime.fromtimestamp(float(value), tz=datetime.timezone.utc)
+    except (ValueError, OverflowError):
+        pass
+    try:
+        since = parse_datetime(value)
+    except ValueError:
+        since = None
+    if since is None:
+        raise ValidationError({'since': 'Niepoprawna data.'})
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since, datetime.timezone.utc)
+    return since
+
+
+class SyncCursorPagination(CursorPagination):
+    ordering = ('updated_at', 'pk')
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class SyncListView(generics.ListAPIView):
+    """
+    Base view of the v1 read API.
+
+    Rows are ordered by `updated_at` and paginated with a cursor. `?since=` (an ISO 8601 datetime or a unix
+    timestamp) returns only rows changed after it, so clients fetch only what changed since their last sync.
+    Such responses also list pks of rows `deleted` after it, recorded as `courses.models.SyncTombstone` of
+    `sync_kind`, and set `reset` when the client has to fetch the whole list again, ex. after the user joined
+    or left a course or when tombstones of the period aren't kept anymore.
+    Responses carry an ETag and Last-Modified computed from the number and the latest `updated_at` of the listed
+    rows with a single aggregate query, and from the user's marker of `changes_namespace` touched when rows are
+    deleted or leave the list, conditional requests of unchanged lists are answered with 304.
+    """
+    permission_classes = (IsAuthenticated,)
+    pagination_class = SyncCursorPagination
+    changes_namespace = courses_models.SYNC_CHANGES_NAMESPACE
+    sync_kind: str = None
+
+    def get_sync_queryset(self) -> QuerySet:
+        raise NotImplementedError
+
+    def get_since(self) -> Optional[datetime.datetime]:
+        since = self.request.query_params.get('since')
+        return parse_since(since) if since else None
+
+    def get_queryset(self):
+        queryset = self.get_sync_queryset()
+        since = self.get_since()
+        if since:
+            queryset = queryset.filter(updated_at__gt=since)
+        return queryset
+
+    def get_deletions(self, since: datetime.datetime) -> Dict:
+        tombstones = courses_models.SyncTombstone.objects.filter(
+            user_pk=self.request.user.pk, kind__in=(self.sync_kind, ''), deleted_at__gt=since
+        )
+        pks = set(tombstones.values_list('object_pk', flat=True))
+        reset = None in pks or since < courses_models.SyncTombstone.objects.get_retained_since()
+        return {'deleted': sorted(pks - {None}), 'reset': reset}
+
+    def get_version(self, queryset: QuerySet):
+        user = self.request.user
+        version = queryset.order_by().aggregate(updated_at=Max('updated_at'), count=Count('pk'))
+        changed_at = cache_utils.get_changed_at(self.changes_namespace, user.pk)
+        key = f'{user.pk}:{self.request.get_full_path()}:{version["count"]}:{version["updated_at"]}:{changed_at}'
+        return f'"{hashlib.md5(key.encode()).hexdigest()}"', max(filter(None, (version['updated_at'], changed_at)))
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        etag, last_modified = self.get_version(queryset)
+        last_modified = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            page = self.paginate_queryset(queryset)
+            response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+            since = self.get_since()
+            if since:
+                response.data.update(self.get_deletions(since))
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class MarksView(SyncListView):
+    """
+    Partial marks of the student, or marks given by the teacher.
+    """
+    serializer_class = serializers.CourseMarkSerializer
+    sync_kind = 'mark'
+    model = courses_models.CourseMark
+
+    def get_sync_queryset(self):
+        user = self.request.user
+        queryset = self.model.objects.select_related('course')
+        if user.is_teacher:
+            return queryset.filter(teacher=user.pk)
+        return queryset.filter(student=user.pk)
+
+
+class FinalMarksView(MarksView):
+    """
+    Final marks of the student, or final marks given by the teacher.
+    """
+    serializer_class = serializers.FinalCourseMarkSerializer
+    sync_kind = 'final_mark'
+    model = courses_models.FinalCourseMark
+
+
+class NoticesView(SyncListView):
+    """
+    Notices of the user's courses, `is_new` is set for notices not viewed yet by the student.
+    """
+    serializer_class = serializers.CourseNoticeSerializer
+    sync_kind = 'notice'
+
+    def get_sync_queryset(self):
+        user = self.request.user
+        if user.is_student:
+            is_new = Exists(courses_models.CourseNotice.not_viewed.through.objects.filter(
+                coursenotice_id=OuterRef('pk'), student_id=user.pk
+            ))
+        else:
+            is_new = Value(False, output_field=BooleanField())
+        return courses_models.CourseNotice.objects.filter(course__in=get_user_courses(user)).select_related(
+            'course'
+        ).annotate(is_new=is_new)
+
+
+class AssignmentsView(SyncListView):
+    """
+    Assignments of laboratories of the student's groups, or of the teacher's courses.
+    """
+    serializer_class = serializers.AssignmentSerializer
+    sync_kind = 'assignment'
+
+    def get_sync_queryset(self):
+        user = self.request.user
+        queryset = courses_models.Assignment.objects.select_related('laboratory__course')
+        if user.is_teacher:
+            return queryset.filter(laboratory__course__in=get_user_courses(user))
+        return queryset.filter(laboratory__group__students=user.pk)
+
+
+class LecturesView(SyncListView):
+    """
+    Lectures of the user's schedule, from `ical.FEED_PAST_DAYS` ago to `ical.FEED_FUTURE_DAYS` ahead.
+    """
+    serializer_class = serializers.LectureSerializer
+    sync_kind = 'lecture'
+    changes_namespace = courses_models.SCHEDULE_CHANGES_NAMESPACE
+
+    def get_sync_queryset(self):
+        return ical.get_feed_schedule(self.request.user).get_lectures()
+
+
+class LaboratoriesView(SyncListView):
+    """
+    Laboratories of the user's schedule, from `ical.FEED_PAST_DAYS` ago to `ical.FEED_FUTURE_DAYS` ahead.
+    """
+    serializer_class = serializers.LaboratorySerializer
+    sync_kind = 'laboratory'
+    changes_namespace = courses_models.SCHEDULE_CHANGES_NAMESPACE
+
+    def get_sync_queryset(self):
+        return ical.get_feed_schedule(self.request.user).get_laboratories()
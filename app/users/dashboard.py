@@ -0,0 +1,150 @@
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from courses import models as courses_models
+from courses import schedule
+from users import models
+
+DASHBOARD_UPCOMING_DAYS = 14
+
+# keys of snapshot values holding datetimes, they are parsed back when a snapshot is loaded
+DASHBOARD_DATETIME_KEYS = ('date', 'deadline')
+
+logger = logging.getLogger(__name__)
+
+
+def dump_user(user: models.User) -> Dict[str, Any]:
+    return {'pk': user.pk, 'first_name': user.first_name, 'last_name': user.last_name}
+
+
+def dump_course(course: courses_models.Course) -> Dict[str, Any]:
+    return {'pk': course.pk, 'name': course.name, 'slug': course.slug}
+
+
+def dump_event(event: courses_models.Event) -> Dict[str, Any]:
+    course = dump_course(event.course)
+    course['grade'] = str(event.course.grade)
+    return {'pk': event.pk, 'title': event.title, 'course': course, 'date': event.date, 'location': event.location}
+
+
+def build_dashboard_context(user: models.User) -> Dict[str, Any]:
+    """
+    Computes the user's dashboard context. Every value is fully evaluated,
+    so the context can be stored as JSON in a `users.DashboardSnapshot`: objects are
+    plain dicts of the values shown at the dashboard.
+    """
+    marks = None
+    assignments = None
+    avg_marks = {}
+    avg = 0
+    if user.is_teacher:
+        teacher = models.Teacher.objects.get(email=user.email)
+        courses = teacher.courses_teaching.all()
+    else:
+        student = models.Student.objects.get(email=user.email)
+        courses = courses_models.Course.objects.filter(grade__students=student)
+        marks = [{
+            'course': dump_course(mark.course),
+            'teacher': dump_user(mark.teacher),
+            'mark': mark.mark,
+            'mark_decimal': mark.mark_decimal,
+            'description': mark.description,
+            'date': mark.date,
+        } for mark in student.courses_marks.select_related('course', 'teacher').order_by('-date')[:5]]
+
+        groups = student.laboratories.all()
+        laboratories = courses_models.Laboratory.objects.filter(group__in=groups)
+        assignments = courses_models.Assignment.objects.filter(laboratory__in=laboratories).select_related(
+            'teacher'
+        )[:3]
+
+        actual_courses = {course.pk: course for course in courses.actual()}
+        for row in student.courses_marks.filter(course__in=actual_courses).summary_by_course():
+            course = actual_courses[row['course']]
+            avg_marks[course.name] = {
+                'course': dump_course(course),
+                'sum': row['sum'],
+                'count': row['count'],
+                'avg': int(row['avg'])
+            }
+        avg = sum(value['avg'] for value in avg_marks.values()) / len(avg_marks) if avg_marks else 0
+    is_new = courses_models.CourseNotice.not_viewed.through.objects.filter(
+        coursenotice_id=OuterRef('pk'), student_id=user.pk
+    )
+    notices = courses_models.CourseNotice.objects.filter(course__in=courses).select_related(
+        'course', 'sender'
+    ).annotate(is_new=Exists(is_new)).order_by('-created_at')[:3]
+    upcoming = schedule.Schedule.upcoming(user, days=DASHBOARD_UPCOMING_DAYS)
+    lectures = upcoming.get_lectures()[:3]
+    laboratories = upcoming.get_laboratories()[:3]
+
+    courses = [dump_course(course) for course in courses.actual()]
+    return {
+        'courses': courses,
+        'courses_count': len(courses),
+        'notices': [{
+            'pk': notice.pk,
+            'title': notice.title,
+            'is_new': notice.is_new,
+            'course': dump_course(notice.course),
+            'sender': dump_user(notice.sender),
+        } for notice in notices],
+        'lectures': [dump_event(lecture) for lecture in lectures],
+        'laboratories': [dump_event(laboratory) for laboratory in laboratories],
+        'not_viewed_notices': courses_models.UnreadNoticeCounter.objects.total(user),
+        'marks': marks,
+        'avg_marks': avg_marks,
+        'avg': avg,
+        'assignments': [{
+            'title': assignment.title,
+            'content': assignment.content,
+            'teacher': dump_user(assignment.teacher),
+            'deadline': assignment.deadline,
+        } for assignment in assignments if assignment.is_actual] if assignments else []
+    }
+
+
+def parse_snapshot_value(value: Dict[str, Any]) -> Dict[str, Any]:
+    for key in DASHBOARD_DATETIME_KEYS:
+        if isinstance(value.get(key), str):
+            value[key] = parse_datetime(value[key])
+    return value
+
+
+def load_snapshot(snapshot: models.DashboardSnapshot) -> Optional[Dict[str, Any]]:
+    """
+    Returns the context stored in the snapshot, None if it can't be decoded.
+    """
+    try:
+        return json.loads(snapshot.data, object_hook=parse_snapshot_value)
+    except (TypeError, ValueError):
+        logger.warning('Dashboard snapshot of user %s could not be decoded', snapshot.user_id, exc_info=True)
+        return None
+
+
+def get_dashboard_context(user: models.User) -> Dict[str, Any]:
+    """
+    Returns the user's dashboard context from its DashboardSnapshot,
+    rebuilding the snapshot if it is missing, stale or expired.
+    """
+    snapshot = models.DashboardSnapshot.objects.filter(user=user).first()
+    if snapshot and snapshot.is_fresh:
+        context = load_snapshot(snapshot)
+        if context is not None:
+            return context
+
+    # snapshot is dated back to the start of the build, so any invalidation
+    # that happens while building marks it as stale again
+    built_at = timezone.now()
+    context = build_dashboard_context(user)
+    models.DashboardSnapshot.objects.update_or_create(user=user, defaults={
+        'data': json.dumps(context, cls=DjangoJSONEncoder),
+        'built_at': built_at,
+    })
+    return context
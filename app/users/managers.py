@@ -1,5 +1,6 @@
 from django.contrib.auth.base_user import BaseUserManager
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
 
@@ -33,3 +34,11 @@ class StudentUserManager(CustomUserManager, models.Manager):
 class TeacherUserManager(models.Manager):
     def get_queryset(self):
         return super().get_queryset().filter(role='teacher')
+
+
+class DashboardSnapshotManager(models.Manager):
+    def invalidate(self, users) -> int:
+        """
+        Marks dashboard snapshots of the given users (pks or a queryset of pks) as stale.
+        """
+        return self.filter(user__in=users).update(invalidated_at=timezone.now())
@@ -0,0 +1,16 @@
+from users import presence
+
+
+class PresenceMiddleware:
+    """
+    Marks authenticated users as online on every request, users who stop sending requests
+    go offline after settings.PRESENCE_TTL seconds even if they never log out.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.user.is_authenticated:
+            presence.touch(request.user.pk)
+        return self.get_response(request)
@@ -0,0 +1,33 @@
+# Generated by Django 3.0.7 on 2026-10-18 03:05
+
+import uuid
+
+from django.db import migrations, models
+
+
+def generate_calendar_tokens(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    for user in User.objects.only('pk'):
+        user.calendar_token = uuid.uuid4()
+        user.save(update_fields=['calendar_token'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0012_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='calendar_token',
+            field=models.UUIDField(editable=False, null=True),
+        ),
+        migrations.RunPython(generate_calendar_tokens, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='user',
+            name='calendar_token',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        ),
+    ]
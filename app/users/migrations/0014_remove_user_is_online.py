@@ -0,0 +1,17 @@
+# Generated by Django 3.0.7 on 2026-10-18 03:08
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0013_user_calendar_token'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='user',
+            name='is_online',
+        ),
+    ]
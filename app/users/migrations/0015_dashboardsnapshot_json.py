@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+def delete_snapshots(apps, schema_editor):
+    # pickled snapshots can't be converted, they are rebuilt on the next read
+    apps.get_model('users', 'DashboardSnapshot').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0014_remove_user_is_online'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_snapshots, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='dashboardsnapshot',
+            name='data',
+        ),
+        migrations.AddField(
+            model_name='dashboardsnapshot',
+            name='data',
+            field=models.TextField(default=''),
+            preserve_default=False,
+        ),
+    ]
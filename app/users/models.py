@@ -11,7 +11,7 @@ from django.urls import reverse
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
-from users import managers
+from users import managers, presence
 
 
 def get_file_path(instance, filename: str) -> str:
@@ -65,16 +65,21 @@ class User(auth_models.AbstractUser):
     date_joined = models.DateTimeField(verbose_name=_('Date joined'), default=timezone.now)
     date_birth = models.DateField(verbose_name=_('Date of birth'), blank=True, null=True,
                                   help_text=_('<b>Birthday date in format:</b> YYYY-MM-DD'))
-    is_online = models.BooleanField(default=False)
     description = models.TextField(null=True, blank=True, default="")
     image = models.ImageField(upload_to=get_file_path, default=settings.DEFAULT_USER_IMAGE)
     first_login = models.BooleanField(default=True)
+    calendar_token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ('first_name', 'last_name',)
 
     objects = managers.CustomUserManager()
 
+    class Meta(auth_models.AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['role'], name='user_role_idx'),
+        ]
+
     @property
     def full_username(self) -> str:
         return f"{self.first_name} {self.last_name} ({self.email})"
@@ -87,6 +92,10 @@ class User(auth_models.AbstractUser):
     def is_teacher(self) -> bool:
         return self.role == 'teacher'
 
+    @property
+    def is_online(self) -> bool:
+        return presence.is_online(self.pk)
+
     def __str__(self):
         return self.full_username
 
@@ -96,6 +105,16 @@ class User(auth_models.AbstractUser):
     def get_image_url(self):
         return self.image.url
 
+    def get_calendar_url(self):
+        return reverse('users:schedule-feed', args=(self.calendar_token,))
+
+    def reset_calendar_token(self):
+        """
+        Invalidates the url of the user's calendar feed, ex. when it was shared by mistake.
+        """
+        self.calendar_token = uuid.uuid4()
+        self.save(update_fields=['calendar_token'])
+
 
 class Teacher(User):
     """
@@ -121,13 +140,35 @@ class Student(User):
         verbose_name_plural = _("Students")
 
 
+class DashboardSnapshot(models.Model):
+    """
+    DashboardSnapshot is a denormalized, precomputed context of the user's dashboard.
+    It is marked as stale by signals whenever data shown at the dashboard changes and rebuilt on the next read.
+    """
+    user = models.OneToOneField('users.User', on_delete=models.CASCADE, related_name='dashboard_snapshot')
+    # JSON of the context, see `users.dashboard.build_dashboard_context`
+    data = models.TextField()
+    built_at = models.DateTimeField()
+    invalidated_at = models.DateTimeField(null=True, blank=True)
+
+    objects = managers.DashboardSnapshotManager()
+
+    def __str__(self):
+        return f'Dashboard Snapshot: {self.user}'
+
+    @property
+    def is_fresh(self) -> bool:
+        if self.invalidated_at and self.invalidated_at >= self.built_at:
+            return False
+        return timezone.now() - self.built_at < datetime.timedelta(seconds=settings.DASHBOARD_SNAPSHOT_TTL)
+
+
 @receiver(user_logged_in)
 def got_online(sender, user, request, **kwargs):
-    user.is_online = True
-    user.save()
+    presence.touch(user.pk)
 
 
 @receiver(user_logged_out)
 def got_offline(sender, user, request, **kwargs):
-    user.is_online = False
-    user.save()
+    if user is not None:
+        presence.remove(user.pk)
@@ -0,0 +1,115 @@
+import logging
+import time
+from typing import Iterable, Set
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class BasePresence:
+    """
+    Presence backends keep the time of the last activity of users. A user is online
+    if they were active within the last settings.PRESENCE_TTL seconds.
+    """
+
+    def touch(self, user_id: int):
+        raise NotImplementedError
+
+    def remove(self, user_id: int):
+        raise NotImplementedError
+
+    def get_online(self, users_ids: Iterable[int]) -> Set[int]:
+        """
+        Returns ids of the online users among `users_ids`.
+        """
+        raise NotImplementedError
+
+    def is_online(self, user_id: int) -> bool:
+        return user_id in self.get_online([user_id])
+
+
+class RedisPresence(BasePresence):
+    """
+    Keeps users in a redis sorted set scored by the time of their last activity,
+    entries older than settings.PRESENCE_TTL are removed on every heartbeat.
+    Presence is best-effort, redis errors are logged and treated as offline users.
+    """
+    key = 'presence:online'
+
+    def get_connection(self):
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+
+    def touch(self, user_id: int):
+        now = time.time()
+        try:
+            pipeline = self.get_connection().pipeline(transaction=False)
+            pipeline.zadd(self.key, {user_id: now})
+            pipeline.zremrangebyscore(self.key, 0, now - settings.PRESENCE_TTL)
+            pipeline.execute()
+        except Exception:
+            logger.warning('Failed to store presence of the user %s', user_id, exc_info=True)
+
+    def remove(self, user_id: int):
+        try:
+            self.get_connection().zrem(self.key, user_id)
+        except Exception:
+            logger.warning('Failed to remove presence of the user %s', user_id, exc_info=True)
+
+    def get_online(self, users_ids: Iterable[int]) -> Set[int]:
+        users_ids = list(users_ids)
+        if not users_ids:
+            return set()
+        try:
+            pipeline = self.get_connection().pipeline(transaction=False)
+            for user_id in users_ids:
+                pipeline.zscore(self.key, user_id)
+            scores = pipeline.execute()
+        except Exception:
+            logger.warning('Failed to read presence of users', exc_info=True)
+            return set()
+        since = time.time() - settings.PRESENCE_TTL
+        return {user_id for user_id, score in zip(users_ids, scores) if score is not None and score >= since}
+
+
+class CachePresence(BasePresence):
+    """
+    Keeps a key with settings.PRESENCE_TTL timeout per online user in the default cache,
+    used when redis isn't available, ex. in tests and local development.
+    """
+
+    def get_key(self, user_id: int) -> str:
+        return f'presence:{user_id}'
+
+    def touch(self, user_id: int):
+        cache.set(self.get_key(user_id), time.time(), settings.PRESENCE_TTL)
+
+    def remove(self, user_id: int):
+        cache.delete(self.get_key(user_id))
+
+    def get_online(self, users_ids: Iterable[int]) -> Set[int]:
+        keys = {self.get_key(user_id): user_id for user_id in users_ids}
+        return {keys[key] for key in cache.get_many(list(keys))}
+
+
+def get_presence() -> BasePresence:
+    return import_string(settings.PRESENCE_BACKEND)()
+
+
+def touch(user_id: int):
+    get_presence().touch(user_id)
+
+
+def remove(user_id: int):
+    get_presence().remove(user_id)
+
+
+def get_online(users_ids: Iterable[int]) -> Set[int]:
+    return get_presence().get_online(users_ids)
+
+
+def is_online(user_id: int) -> bool:
+    return get_presence().is_online(user_id)
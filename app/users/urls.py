@@ -1,6 +1,7 @@
 from django.urls import path
 
 from users import views
+from users.api.views import users_presence
 
 app_name = 'users'
 
@@ -8,6 +9,8 @@ urlpatterns = [
     path('', views.DashboardView.as_view(), name='dashboard'),
     path('assignments/', views.AssignmentsView.as_view(), name='assignments'),
     path('schedule/', views.ScheduleView.as_view(), name='schedule'),
+    path('schedule/<uuid:token>.ics', views.ScheduleFeedView.as_view(), name='schedule-feed'),
+    path('schedule/feed/reset/', views.reset_calendar_token, name='schedule-feed-reset'),
     path('notices/', views.NoticeView.as_view(), name='notices'),
     path('marks/', views.MarksView.as_view(), name='marks'),
     path('login/', views.LoginView.as_view(), name='login'),
@@ -17,4 +20,5 @@ urlpatterns = [
     path('profile/<int:pk>/', views.ProfileDetailView.as_view(), name='profile-detail'),
     path('profile/edit/', views.ProfileEditView.as_view(), name='profile-edit'),
     path('profile/img/delete/', views.delete_profile_image, name='profile-img-delete'),
+    path('api/presence/', users_presence, name='api-presence'),
 ]
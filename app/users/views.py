@@ -1,17 +1,21 @@
-import datetime
-from datetime import timedelta
-
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import authenticate, get_user_model, login, logout
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import redirect, render
+from django.db.models import Exists, OuterRef
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from django.views import generic
 from django.views.generic.detail import DetailView
 
+from courses import ical
 from courses import models as courses_models
-from users import forms, models, tasks
+from courses import schedule
+from users import dashboard, forms, models, tasks
 
 
 def delete_profile_image(request):
@@ -138,8 +142,8 @@ class ProfileEditView(ProfileView):
             if len(password) > 5:
                 user.set_password(password)
                 user.save()
-                tasks.send_user_change_password_notification_email(
-                    user=user, bcc=[], email_to=[user.email]
+                tasks.send_user_change_password_notification_email.delay(
+                    user_pk=user.pk, bcc=[], email_to=[user.email]
                 )
                 messages.info(request, 'Pomyślnie zmieniono hasło!')
             else:
@@ -183,6 +187,9 @@ class DashboardView(generic.View, LoginRequiredMixin):
     ``user``
         An instance of `users.User`
 
+    Values of `courses` models are plain dicts of their fields shown at the dashboard,
+    see `users.dashboard.build_dashboard_context`.
+
     ``courses``
         A list of actual `courses.Course`
 
@@ -226,72 +233,10 @@ class DashboardView(generic.View, LoginRequiredMixin):
     template_name = 'dashboard/main-page.html'
 
     def get_context_data(self, *args, **kwargs):
-        courses = courses_models.Course.objects.none()
-        marks = None
-        assignments = None
-        avg_marks = {}
-        avg = 0
-        if self.request.user.is_teacher:
-            teacher = models.Teacher.objects.get(email=self.request.user.email)
-            courses = [course for course in teacher.courses_teaching.all() if course.is_actual]
-        else:
-            student = models.Student.objects.get(email=self.request.user.email)
-            marks = student.courses_marks.all().order_by('-date')[:5]
-
-            groups = student.laboratories.all()
-            laboratories = courses_models.Laboratory.objects.filter(group__in=groups)
-            assignments = courses_models.Assignment.objects.filter(laboratory__in=laboratories)[:3]
-
-            for mark in marks:
-                if mark.course.name not in avg_marks and mark.course.is_actual:
-                    avg_marks[mark.course.name] = {
-                        'course': mark.course,
-                        'sum': 0,
-                        'count': 0,
-                        'avg': 0
-                    }
-                avg_marks[mark.course.name]['sum'] += mark.mark
-                avg_marks[mark.course.name]['count'] += 1
-            count = 0
-            for key, value in avg_marks.items():
-                avg_marks[key]['avg'] = int(avg_marks[key]['sum'] / avg_marks[key]['count'])
-                avg += avg_marks[key]['avg']
-                count += 1
-            avg = avg / count if count else 0
-            for grade in student.grades.all():
-                courses |= grade.courses.all()
-        notices = courses_models.CourseNotice.objects.filter(course__in=courses).order_by('-created_at')[:3]
-        lectures = courses_models.Lecture.objects.filter(course__in=courses,
-                                                         date__gte=timezone.now(),
-                                                         date__lte=timezone.now()+timedelta(days=14)
-                                                         ).order_by('date')[:3]
-        laboratories = courses_models.Laboratory.objects.filter(course__in=courses,
-                                                                date__gte=timezone.now(),
-                                                                date__lte=timezone.now()+timedelta(days=14),
-                                                                ).order_by('date')
-        if self.request.user.is_student:
-            laboratories = laboratories.filter(group__students__email__contains=self.request.user.email)
-        laboratories = laboratories[:3]
-
-        not_viewed_notices = courses_models.CourseNotice.objects.filter(
-            course__in=courses,
-            not_viewed__email=self.request.user.email
-        ).order_by('-created_at')
-        courses = [course for course in courses if course.is_actual]
-        return {
-            'user': self.request.user,
-            'courses': courses,
-            'courses_count': len(courses),
-            'notices': notices,
-            'now': timezone.now(),
-            'lectures': lectures,
-            'laboratories': laboratories,
-            'not_viewed_notices': not_viewed_notices.count(),
-            'marks': marks,
-            'avg_marks': avg_marks,
-            'avg': avg,
-            'assignments': [assignment for assignment in assignments if assignment.is_actual] if assignments else []
-        }
+        context = dashboard.get_dashboard_context(self.request.user)
+        context['user'] = self.request.user
+        context['now'] = timezone.now()
+        return context
 
     def get(self, request, *args, **kwargs):
         if not self.request.user.is_authenticated:
@@ -311,7 +256,19 @@ class ScheduleView(LoginRequiredMixin, generic.View):
         An instance of `users.User`
 
     ``schedule``
-        Dictionary
+        A list of `courses.schedule.ScheduleDay`
+
+    ``ranges``
+        Dictionary of available ranges and their lengths in days
+
+    ``range``
+        Name of the displayed range, ex. `week`
+
+    ``page``, ``previous_page``, ``next_page``
+        Numbers of the displayed, previous and next range counting from today
+
+    ``calendar_url``
+        Absolute url of the user's iCalendar feed
 
     **Template:**
 
@@ -320,39 +277,23 @@ class ScheduleView(LoginRequiredMixin, generic.View):
     template_name = 'dashboard/schedule.html'
 
     def get_context_data(self, *args, **kwargs):
-        courses = courses_models.Course.objects.none()
-
-        if self.request.user.is_teacher:
-            teacher = models.Teacher.objects.get(email=self.request.user.email)
-            courses = teacher.courses_teaching.all()
-        else:
-            student = models.Student.objects.get(email=self.request.user.email)
-            for grade in student.grades.all():
-                courses |= grade.courses.all()
-        lectures = courses_models.Lecture.objects.filter(course__in=courses,
-                                                         date__gte=timezone.now(),
-                                                         date__lte=timezone.now()+timedelta(days=5)
-                                                         ).order_by('date')
-        laboratories = courses_models.Laboratory.objects.filter(course__in=courses,
-                                                                date__gte=timezone.now(),
-                                                                date__lte=timezone.now()+timedelta(days=5),
-                                                                ).order_by('date')
-        if self.request.user.is_student:
-            laboratories = laboratories.filter(group__students__email__contains=self.request.user.email)
-
-        today = datetime.date.today()
-        schedule = []
-        for i in range(5):
-            date = today + timedelta(days=i)
-            schedule.append({
-                'date': date,
-                'labs': laboratories.filter(date__day=date.day, date__month=date.month, date__year=date.year),
-                'lectures': lectures.filter(date__day=date.day, date__month=date.month, date__year=date.year),
-                'is_weekend': date.weekday() >= 5
-            })
+        range_name = self.request.GET.get('range')
+        if range_name not in schedule.SCHEDULE_RANGES:
+            range_name = schedule.SCHEDULE_DEFAULT_RANGE
+        try:
+            page = int(self.request.GET.get('page', 0))
+        except ValueError:
+            page = 0
+        user_schedule = schedule.Schedule.for_range(self.request.user, range_name, page)
         return {
             'user': self.request.user,
-            'schedule': schedule
+            'schedule': user_schedule.days,
+            'ranges': schedule.SCHEDULE_RANGES,
+            'range': range_name,
+            'page': page,
+            'previous_page': page - 1,
+            'next_page': page + 1,
+            'calendar_url': self.request.build_absolute_uri(self.request.user.get_calendar_url()),
         }
 
     def get(self, request, *args, **kwargs):
@@ -362,6 +303,56 @@ class ScheduleView(LoginRequiredMixin, generic.View):
         return render(request, self.template_name, context)
 
 
+class ScheduleFeedView(generic.View):
+    """
+    View used to handle /schedule/<token>.ics GET requests.
+    View streams the user's lectures and laboratories as an iCalendar feed.
+    It doesn't require logging in, the user is identified by `users.User.calendar_token`,
+    so calendar clients can subscribe to it. Unchanged feed is answered with 304 Not Modified.
+
+    **Template:**
+
+    :template:`None`
+    """
+
+    def get(self, request, *args, **kwargs):
+        user = get_object_or_404(models.User, calendar_token=kwargs.get('token'), is_active=True)
+        user_schedule = ical.get_feed_schedule(user)
+        etag, last_modified = ical.get_feed_version(user_schedule)
+        last_modified = int(last_modified.timestamp()) if last_modified else None
+
+        def build_url(name, pk):
+            return request.build_absolute_uri(reverse(name, args=(pk,)))
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = StreamingHttpResponse(ical.iter_calendar(user_schedule, build_url),
+                                             content_type='text/calendar; charset=utf-8')
+            response['Content-Disposition'] = 'inline; filename="raven.ics"'
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+def reset_calendar_token(request):
+    """
+    View used to handle /schedule/feed/reset/ POST requests.
+    Views is used to invalidate the url of the user's calendar feed.
+
+    **Template:**
+
+    :template:`None`
+    """
+    if not request.user.is_authenticated:
+        return redirect(settings.LOGIN_URL)
+    if request.method == 'POST':
+        request.user.reset_calendar_token()
+        messages.info(request, 'Wygenerowano nowy link do kalendarza, poprzedni przestał działać')
+    return redirect('users:schedule')
+
+
 class NoticeView(LoginRequiredMixin, generic.View):
     """
     View used to handle /schedule/ GET requests.
@@ -391,16 +382,15 @@ class NoticeView(LoginRequiredMixin, generic.View):
             student = models.Student.objects.get(email=self.request.user.email)
             for grade in student.grades.all():
                 courses |= grade.courses.all()
-        notices = courses_models.CourseNotice.objects.filter(course__in=courses).order_by('-created_at')
-        notices_obj = []
-        for notice in notices:
-            notices_obj.append({
-                'notice': notice,
-                'is_new': self.request.user in notice.not_viewed.all()
-            })
+        is_new = courses_models.CourseNotice.not_viewed.through.objects.filter(
+            coursenotice_id=OuterRef('pk'), student_id=self.request.user.pk
+        )
+        notices = courses_models.CourseNotice.objects.filter(course__in=courses).select_related(
+            'course', 'sender'
+        ).annotate(is_new=Exists(is_new)).order_by('-created_at')
         return {
             'user': self.request.user,
-            'notices': notices_obj
+            'notices': [{'notice': notice, 'is_new': notice.is_new} for notice in notices]
         }
 
     def get(self, request, *args, **kwargs):
@@ -411,9 +401,9 @@ class NoticeView(LoginRequiredMixin, generic.View):
 
         if self.request.user.is_student:
             student = models.Student.objects.get(email=self.request.user.email)
-            for notice in notices:
-                if student in notice['notice'].not_viewed.all():
-                    notice['notice'].not_viewed.remove(student)
+            courses_models.CourseNotice.objects.filter(
+                pk__in=[notice['notice'].pk for notice in notices if notice['is_new']]
+            ).mark_as_read(student)
         return render(request, self.template_name, context)
 
 
@@ -488,7 +478,9 @@ class LoginView(generic.View):
                     messages.info(request, 'Zalogowałeś się po raz pierwszy! Zmień swoje hasło!')
                     request.user.first_login = False
                     request.user.save()
-                    tasks.send_user_create_notification_email(request.user, bcc=[], email_to=[request.user.email])
+                    tasks.send_user_create_notification_email.delay(
+                        request.user.pk, bcc=[], email_to=[request.user.email]
+                    )
                     return redirect('users:profile-edit')
                 messages.info(request, 'Pomyślnie udało się zalogować!')
                 return redirect('users:dashboard')
@@ -542,29 +534,20 @@ class MarksView(LoginRequiredMixin, generic.View):
 
     def get_context_data(self, *args, **kwargs):
         student = models.Student.objects.get(email=self.request.user.email)
-        marks = student.courses_marks.all().order_by('-date')
+        marks = student.courses_marks.select_related('course__grade', 'teacher').order_by('-date')
+        courses = courses_models.Course.objects.filter(grade__students=student).actual().select_related('grade')
+        summary = {row['course']: row for row in student.courses_marks.summary_by_course()}
+        final_marks = student.courses_final_marks.by_course()
         avg_marks = {}
-        courses = [course for course in courses_models.Course.objects.filter(grade__students__email=student.email) if
-                   course.is_actual]
         for course in courses:
-            if course.name not in avg_marks:
-                final_mark = student.courses_final_marks.filter(course=course).first()
-                avg_marks[course.name] = {
-                    'course': course,
-                    'sum': 0,
-                    'count': 0,
-                    'avg': 0,
-                    'final_mark': final_mark
-                }
-            course_marks = student.courses_marks.filter(course=course)
-            for mark in course_marks:
-                avg_marks[course.name]['sum'] += mark.mark
-                avg_marks[course.name]['count'] += 1
-        for key, value in avg_marks.items():
-            try:
-                avg_marks[key]['avg'] = int(avg_marks[key]['sum'] / avg_marks[key]['count'])
-            except ZeroDivisionError:
-                avg_marks[key]['avg'] = ''
+            course_summary = summary.get(course.pk)
+            avg_marks[course.name] = {
+                'course': course,
+                'sum': course_summary['sum'] if course_summary else 0,
+                'count': course_summary['count'] if course_summary else 0,
+                'avg': int(course_summary['avg']) if course_summary else '',
+                'final_mark': final_marks.get(course.pk)
+            }
 
         return {
             'user': self.request.user,
@@ -613,28 +596,15 @@ class SummaryView(LoginRequiredMixin, generic.View):
 
     def get_context_data(self, *args, **kwargs):
         grades = courses_models.Grade.objects.filter(students__email=self.request.user.email).order_by('-start_year')
-        summary = {}
         student = models.Student.objects.get(email=self.request.user.email)
-        for grade in grades:
-            count, avg = 0, 0
-            courses = {}
-            for course in grade.courses.all().order_by('semester'):
-                final_mark = courses_models.FinalCourseMark.objects.filter(course=course, student=student).first()
-                if final_mark:
-                    courses[course] = {
-                        'course': course,
-                        'final_mark': final_mark
-                    }
-                    avg += final_mark.mark
-                    count += 1
-                else:
-                    courses[course] = {
-                        'course': course,
-                        'final_mark': None
-                    }
-            summary[grade] = {
-                'crs': courses,
-                'avg': avg / count if count else 0,
+        final_marks = student.courses_final_marks.by_course()
+        averages = {row['course__grade']: row['avg'] for row in student.courses_final_marks.summary_by_grade()}
+        summary = {grade: {'crs': {}, 'avg': averages.get(grade.pk) or 0} for grade in grades}
+        grades_by_pk = {grade.pk: grade for grade in grades}
+        for course in courses_models.Course.objects.filter(grade__in=grades_by_pk).order_by('semester'):
+            summary[grades_by_pk[course.grade_id]]['crs'][course] = {
+                'course': course,
+                'final_mark': final_marks.get(course.pk)
             }
 
         return {
@@ -0,0 +1,75 @@
+import datetime
+import time
+from typing import Any, Callable, Iterable
+
+from django.core.cache import cache
+
+
+def get_version_key(namespace: str, pk: Any) -> str:
+    return f'{namespace}:{pk}:version'
+
+
+def get_version(namespace: str, pk: Any) -> int:
+    """
+    Returns the current version of the object's cached data.
+
+    Versions start from the current time in microseconds, so a version key evicted from the cache
+    doesn't start over from a value whose data may still be cached.
+    """
+    key = get_version_key(namespace, pk)
+    version = cache.get(key)
+    if version is None:
+        initial = time.time_ns() // 1000
+        cache.add(key, initial, None)
+        version = cache.get(key, initial)
+    return version
+
+
+def bump_version(namespace: str, pk: Any):
+    """
+    Invalidates all cached data of the object, keys of the previous version just expire.
+    """
+    try:
+        cache.incr(get_version_key(namespace, pk))
+    except ValueError:
+        get_version(namespace, pk)
+
+
+def get_or_set_versioned(namespace: str, pk: Any, name: str, build: Callable[[], Any], timeout: int) -> Any:
+    key = f'{namespace}:{pk}:{get_version(namespace, pk)}:{name}'
+    return cache.get_or_set(key, build, timeout)
+
+
+def get_changed_at_key(namespace: str, pk: Any) -> str:
+    return f'{namespace}:{pk}:changed_at'
+
+
+def get_changed_at(namespace: str, pk: Any) -> datetime.datetime:
+    """
+    Returns when the object's data last changed in a way `updated_at` of its rows can't tell, ex. a row was deleted.
+
+    A marker evicted from the cache starts over from the current time, so clients validating
+    their copies with an older date fetch them again.
+    """
+    key = get_changed_at_key(namespace, pk)
+    changed_at = cache.get(key)
+    if changed_at is None:
+        initial = time.time()
+        cache.add(key, initial, None)
+        changed_at = cache.get(key, initial)
+    return datetime.datetime.fromtimestamp(changed_at, tz=datetime.timezone.utc)
+
+
+def touch(namespace: str, pks: Iterable[Any]):
+    """
+    Marks data of the objects as changed now, see `get_changed_at`.
+
+    Dates of HTTP validators have a resolution of seconds and a copy may have been fetched within the current second
+    or the second of the previous change, so a change is dated to the second following both of them.
+    """
+    keys = [get_changed_at_key(namespace, pk) for pk in pks]
+    if not keys:
+        return
+    now = int(time.time())
+    previous = cache.get_many(keys)
+    cache.set_many({key: max(now, int(previous.get(key, 0))) + 1 for key in keys}, None)
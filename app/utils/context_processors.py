@@ -0,0 +1,10 @@
+from typing import Dict
+
+from django.conf import settings
+
+
+def live(request) -> Dict:
+    """
+    Adds the path of live events websocket, None if live events are disabled.
+    """
+    return {'live_path': settings.LIVE_PATH if settings.LIVE_ENABLED else None}
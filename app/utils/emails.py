@@ -1,8 +1,37 @@
-from typing import List
+import smtplib
+from typing import Iterator, List, Optional, Tuple
 
 from django.conf import settings
 from django.core import mail
+from django.core.cache import cache
 from django.template import loader
+from django.utils import translation
+
+# options of celery tasks sending emails, failed SMTP deliveries are retried with exponential backoff
+EMAIL_TASK_OPTIONS = {
+    'autoretry_for': (smtplib.SMTPException, OSError),
+    'retry_backoff': True,
+    'retry_backoff_max': 60 * 10,
+    'retry_jitter': True,
+    'max_retries': 5,
+}
+
+
+def batches(email_to: List[str], size: int = None) -> Iterator[List[str]]:
+    """
+    Splits recipients into chunks of at most `size` (settings.EMAIL_BATCH_SIZE by default) addresses.
+    """
+    size = size or settings.EMAIL_BATCH_SIZE
+    for i in range(0, len(email_to), size):
+        yield email_to[i:i + size]
+
+
+def get_sent_key(task_id: Optional[str]) -> Optional[str]:
+    """
+    Returns the cache key of recipients already mailed by the task, retries of a task keep its id.
+    Tasks called directly have no id and nothing to remember.
+    """
+    return f'emails:sent:{task_id}' if task_id else None
 
 
 class BaseEmailFactory:
@@ -23,18 +52,72 @@ class BaseEmailFactory:
     def get_subject_template(self):
         return self.prefix + '/' + self.subject_template_name
 
-    def create_email(self, email_to: List[str], *args, **kwargs):
+    def get_cache_key(self) -> Optional[str]:
+        """
+        Returns the key identifying the rendered email, ex. pk of the emailed object.
+        Emails without a key are rendered on every send.
+        """
+        return None
+
+    def render_templates(self) -> Tuple[str, str]:
         context = self.get_context_data()
         subject = loader.render_to_string(self.get_subject_template(), context)
         subject = ''.join(subject.splitlines())
 
         body = loader.render_to_string(self.get_email_template(), context)
+        return subject, body
+
+    def render(self) -> Tuple[str, str]:
+        """
+        Returns rendered subject and body, shared through the cache by every batch
+        of recipients of the same email in the same language.
+        """
+        key = self.get_cache_key()
+        if key is None:
+            return self.render_templates()
+        key = f'emails:{self.__class__.__name__}:{key}:{translation.get_language()}'
+        return cache.get_or_set(key, self.render_templates, settings.EMAIL_RENDER_CACHE_TIMEOUT)
+
+    def build_email(self, subject: str, body: str, email_to: List[str], connection=None, copies: bool = True):
+        """
+        Builds the message, `cc` and `bcc` recipients get a copy only if `copies` is set.
+        """
         email_from = self.email_from or settings.SENDER_EMAIL
 
-        message = mail.EmailMessage(subject, body, email_from, email_to,
-                                    cc=self.cc, bcc=self.bcc, reply_to=self.reply_to)
+        message = mail.EmailMessage(subject, body, email_from, email_to, connection=connection,
+                                    cc=self.cc if copies else None, bcc=self.bcc if copies else None,
+                                    reply_to=self.reply_to)
         message.content_subtype = 'html'
         return message
 
+    def create_email(self, email_to: List[str], *args, **kwargs):
+        subject, body = self.render()
+        return self.build_email(subject, body, email_to)
+
     def send(self, email_to: List[str]):
         self.create_email(email_to=email_to).send()
+
+    def send_separately(self, email_to: List[str], sent_key: str = None) -> int:
+        """
+        Sends a separate message to every recipient, rendering the templates once
+        and delivering all messages over a single SMTP connection.
+
+        Recipients already mailed are stored in the cache under `sent_key` (see `get_sent_key`) even if sending fails,
+        so a retried task skips them instead of sending them the message again. `cc` and `bcc` recipients get
+        a copy of the first sent message only.
+        """
+        sent = set(cache.get(sent_key, ())) if sent_key else set()
+        subject, body = self.render()
+        count = 0
+        try:
+            with mail.get_connection() as connection:
+                for recipient in email_to:
+                    if recipient in sent:
+                        continue
+                    message = self.build_email(subject, body, [recipient], connection, copies=not sent)
+                    count += connection.send_messages([message])
+                    sent.add(recipient)
+        finally:
+            if sent_key and count:
+                cache.set(sent_key, sent, settings.EMAIL_SENT_CACHE_TIMEOUT)
+        return count
@@ -0,0 +1,18 @@
+import hashlib
+from typing import Tuple
+
+from django.core.files import File
+
+
+def hash_file(file: File) -> Tuple[str, int]:
+    """
+    Returns the SHA-256 hex digest and the size of the file, read in chunks so memory used doesn't
+    depend on the size of the file.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in file.chunks():
+        digest.update(chunk)
+        size += len(chunk)
+    file.seek(0)
+    return digest.hexdigest(), size
@@ -0,0 +1,227 @@
+import asyncio
+import functools
+import json
+import logging
+import threading
+from collections import defaultdict
+from importlib import import_module
+from typing import Dict, Iterable, List, Optional, Set
+from urllib.parse import urlparse
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.base_user import AbstractBaseUser
+from django.db import close_old_connections, transaction
+from django.http import HttpRequest
+from django.http.cookie import parse_cookie
+from django.http.request import split_domain_port, validate_host
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+def get_channel(namespace: str, pk: int) -> str:
+    return f'live:{namespace}:{pk}'
+
+
+class Listener:
+    """
+    Listener passes events published to the channels of a websocket connection to its event loop.
+    Events which don't fit in the queue are dropped, clients catch up with the sync API.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, size: int):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=size)
+
+    def put(self, data: str):
+        self.loop.call_soon_threadsafe(self._put, data)
+
+    def _put(self, data: str):
+        try:
+            self.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            logger.info('Dropped a live event of a slow connection')
+
+
+class BaseBroker:
+    """
+    Brokers deliver events published by any process to listeners of the current process.
+    A process subscribes to a channel once, no matter how many of its connections listen to it.
+    """
+
+    def __init__(self):
+        self.listeners: Dict[str, Set[Listener]] = defaultdict(set)
+        self.lock = threading.Lock()
+
+    def publish(self, channels: Iterable[str], data: str):
+        raise NotImplementedError
+
+    def on_subscribe(self, channels: List[str]):
+        """
+        Called with channels which got their first listener in the process.
+        """
+
+    def on_unsubscribe(self, channels: List[str]):
+        """
+        Called with channels which lost their last listener in the process.
+        """
+
+    def subscribe(self, channels: Iterable[str], listener: Listener):
+        with self.lock:
+            new_channels = [channel for channel in channels if not self.listeners.get(channel)]
+            for channel in channels:
+                self.listeners[channel].add(listener)
+        if new_channels:
+            self.on_subscribe(new_channels)
+
+    def unsubscribe(self, channels: Iterable[str], listener: Listener):
+        with self.lock:
+            for channel in channels:
+                self.listeners[channel].discard(listener)
+            empty_channels = [channel for channel in channels if not self.listeners[channel]]
+            for channel in empty_channels:
+                del self.listeners[channel]
+        if empty_channels:
+            self.on_unsubscribe(empty_channels)
+
+    def dispatch(self, channel: str, data: str):
+        with self.lock:
+            listeners = list(self.listeners.get(channel, ()))
+        for listener in listeners:
+            listener.put(data)
+
+
+class LocalBroker(BaseBroker):
+    """
+    Delivers events within the current process only, used when redis isn't available,
+    ex. in tests and local development with a single ASGI server process.
+    """
+
+    def publish(self, channels: Iterable[str], data: str):
+        for channel in channels:
+            self.dispatch(channel, data)
+
+
+class RedisBroker(BaseBroker):
+    """
+    Publishes events with redis pub/sub. Every process keeps a single subscriber connection
+    read by a background thread, which passes messages to listeners of the process.
+    Live events are best-effort, redis errors are logged.
+    """
+
+    def __init__(self):
+        super().__init__()
+        import redis
+        self.redis = redis.Redis.from_url(settings.LIVE_REDIS_URL)
+        self.pubsub = None
+        self.thread = None
+
+    def publish(self, channels: Iterable[str], data: str):
+        try:
+            pipeline = self.redis.pipeline(transaction=False)
+            for channel in channels:
+                pipeline.publish(channel, data)
+            pipeline.execute()
+        except Exception:
+            logger.warning('Failed to publish a live event', exc_info=True)
+
+    def on_subscribe(self, channels: List[str]):
+        handlers = {channel: self.handle for channel in channels}
+        with self.lock:
+            if self.pubsub is None:
+                self.pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                self.pubsub.subscribe(**handlers)
+                self.thread = self.pubsub.run_in_thread(sleep_time=1, daemon=True)
+            else:
+                self.pubsub.subscribe(**handlers)
+
+    def on_unsubscribe(self, channels: List[str]):
+        with self.lock:
+            self.pubsub.unsubscribe(*channels)
+
+    def handle(self, message: Dict):
+        self.dispatch(message['channel'].decode(), message['data'].decode())
+
+
+@functools.lru_cache(maxsize=None)
+def get_broker() -> BaseBroker:
+    return import_string(settings.LIVE_BROKER)()
+
+
+def publish(channels: Iterable[str], event: Dict):
+    """
+    Publishes the event to listeners of the channels, nothing is published unless settings.LIVE_ENABLED.
+    """
+    if settings.LIVE_ENABLED:
+        get_broker().publish(list(channels), json.dumps(event))
+
+
+def publish_on_commit(channels: Iterable[str], event: Dict):
+    channels = list(channels)
+    transaction.on_commit(lambda: publish(channels, event))
+
+
+class LiveConsumer:
+    """
+    ASGI application of websocket connections receiving live events.
+
+    Connections are authenticated with the session cookie, so only pages of the same origin can connect.
+    Channels of the user are resolved when the connection is opened with `get_channels`, clients reconnect
+    to pick up changes of their memberships. Messages sent by clients are ignored.
+    """
+
+    async def __call__(self, scope: Dict, receive, send):
+        if (await receive())['type'] != 'websocket.connect':
+            return
+        user = await sync_to_async(self.authenticate)(scope)
+        if user is None:
+            await send({'type': 'websocket.close', 'code': 4401})
+            return
+        channels = await sync_to_async(self.get_channels)(user)
+        listener = Listener(asyncio.get_running_loop(), settings.LIVE_QUEUE_SIZE)
+        broker = get_broker()
+        await sync_to_async(broker.subscribe, thread_sensitive=False)(channels, listener)
+        try:
+            await send({'type': 'websocket.accept'})
+            await self.forward(receive, send, listener)
+        finally:
+            await sync_to_async(broker.unsubscribe, thread_sensitive=False)(channels, listener)
+
+    def get_channels(self, user) -> List[str]:
+        return [get_channel('user', user.pk)]
+
+    def authenticate(self, scope: Dict) -> Optional[AbstractBaseUser]:
+        headers = {name.decode('latin1'): value.decode('latin1') for name, value in scope.get('headers', ())}
+        if not self.is_same_origin(headers.get('origin', ''), headers.get('host', '')):
+            return None
+        request = HttpRequest()
+        session_key = parse_cookie(headers.get('cookie', '')).get(settings.SESSION_COOKIE_NAME)
+        request.session = import_module(settings.SESSION_ENGINE).SessionStore(session_key)
+        try:
+            user = auth.get_user(request)
+        finally:
+            close_old_connections()
+        return user if user.is_authenticated else None
+
+    def is_same_origin(self, origin: str, host: str) -> bool:
+        domain, port = split_domain_port(host)
+        return bool(domain) and urlparse(origin).netloc == host and validate_host(domain, settings.ALLOWED_HOSTS)
+
+    async def forward(self, receive, send, listener: Listener):
+        disconnected = asyncio.ensure_future(self.wait_disconnect(receive))
+        try:
+            while True:
+                event = asyncio.ensure_future(listener.queue.get())
+                done, _ = await asyncio.wait({disconnected, event}, return_when=asyncio.FIRST_COMPLETED)
+                if disconnected in done:
+                    event.cancel()
+                    return
+                await send({'type': 'websocket.send', 'text': event.result()})
+        finally:
+            disconnected.cancel()
+
+    async def wait_disconnect(self, receive):
+        while (await receive())['type'] != 'websocket.disconnect':
+            pass
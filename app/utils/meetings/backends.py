@@ -0,0 +1,99 @@
+import uuid
+from typing import Dict, List, NamedTuple, Optional, Union
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from googleapiclient.errors import HttpError
+
+from utils.meetings import meetings
+
+
+class CalendarOperation(NamedTuple):
+    """
+    A single change of the calendar, `action` is one of `create`, `update` or `delete`.
+    """
+    action: str
+    event_id: Optional[str] = None
+    body: Optional[Dict] = None
+
+
+CalendarResult = Union[Dict, Exception]
+
+
+class BaseCalendarBackend:
+    """
+    Calendar backends apply CalendarOperations in batches.
+    """
+
+    def execute(self, operations: List[CalendarOperation]) -> List[CalendarResult]:
+        """
+        Applies the operations and returns their results in the same order: the event's resource
+        (with at least `id` and optionally `hangoutLink`) or the exception raised by the operation.
+        """
+        raise NotImplementedError
+
+
+class GoogleCalendarBackend(BaseCalendarBackend):
+    """
+    Sends operations to the Google Calendar API as a single batch HTTP request.
+    Updates are sent as PATCH requests, so the event doesn't have to be fetched first.
+    """
+
+    def build_request(self, operation: CalendarOperation):
+        events = meetings.client.service.events()
+        if operation.action == 'create':
+            return events.insert(calendarId=meetings.client.calendar_id, body=operation.body, conferenceDataVersion=1)
+        if operation.action == 'update':
+            return events.patch(calendarId=meetings.client.calendar_id, eventId=operation.event_id, body=operation.body)
+        return events.delete(calendarId=meetings.client.calendar_id, eventId=operation.event_id)
+
+    def execute(self, operations: List[CalendarOperation]) -> List[CalendarResult]:
+        results = {}
+
+        def callback(request_id, response, exception):
+            operation = operations[int(request_id)]
+            # event deleted in the calendar by hand is as good as deleted by us
+            if isinstance(exception, HttpError) and operation.action == 'delete' and \
+                    exception.resp.status in (404, 410):
+                exception = None
+            results[request_id] = exception or response or {}
+
+        batch = meetings.client.service.new_batch_http_request(callback=callback)
+        for i, operation in enumerate(operations):
+            batch.add(self.build_request(operation), request_id=str(i))
+        batch.execute()
+        return [results[str(i)] for i in range(len(operations))]
+
+
+class LocalCalendarBackend(BaseCalendarBackend):
+    """
+    In-memory calendar used in tests and local development.
+    """
+    events: Dict[str, Dict] = {}
+    batches: List[List[CalendarOperation]] = []
+
+    @classmethod
+    def reset(cls):
+        cls.events.clear()
+        cls.batches.clear()
+
+    def execute(self, operations: List[CalendarOperation]) -> List[CalendarResult]:
+        self.batches.append(operations)
+        results = []
+        for operation in operations:
+            if operation.action == 'create':
+                event_id = uuid.uuid4().hex
+                self.events[event_id] = dict(operation.body, id=event_id, hangoutLink=f'https://meet.local/{event_id}')
+                results.append(self.events[event_id])
+            elif operation.event_id not in self.events:
+                results.append(KeyError(operation.event_id) if operation.action == 'update' else {})
+            elif operation.action == 'update':
+                self.events[operation.event_id].update(operation.body)
+                results.append(self.events[operation.event_id])
+            else:
+                results.append(self.events.pop(operation.event_id))
+        return results
+
+
+def get_backend() -> BaseCalendarBackend:
+    return import_string(settings.CALENDAR_SYNC_BACKEND)()
@@ -1,51 +1,131 @@
 import datetime
-from typing import Dict, List
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
 
+import pytz
 from apiclient.discovery import build
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from googleapiclient.discovery_cache.base import Cache
 
-if settings.USE_GOOGLE_API:
-    SERVICE = build('calendar', 'v3', credentials=settings.GOOGLE_API_CREDENTIALS)
-    CALENDAR_ID = SERVICE.calendarList().list().execute()['items'][0]['id']
 
+class FileDiscoveryCache(Cache):
+    """
+    Keeps discovery documents of google APIs on disk for settings.GOOGLE_API_DISCOVERY_CACHE_TTL seconds,
+    so they are downloaded once instead of by every process building a client.
+    """
 
-def delete_google_calendar_event(event_id: str) -> bool:
-    try:
-        SERVICE.events().delete(calendarId=CALENDAR_ID, eventId=event_id).execute()
-    except Exception:
-        return False
-    return True
+    def __init__(self, directory: str = None, ttl: int = None):
+        self.directory = directory or settings.GOOGLE_API_DISCOVERY_CACHE_DIR
+        self.ttl = ttl if ttl is not None else settings.GOOGLE_API_DISCOVERY_CACHE_TTL
 
+    def get_path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.md5(url.encode()).hexdigest() + '.json')
 
-def update_google_calendar_event(event_id: str, data: Dict) -> Dict:
-    event = SERVICE.events().get(calendarId=CALENDAR_ID, eventId=event_id).execute()
+    def get(self, url: str) -> Optional[str]:
+        path = self.get_path(url)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                return None
+            with open(path) as file:
+                return file.read()
+        except OSError:
+            return None
 
-    if data.get('start'):
-        event['start']['dateTime'] = data.get('start').strftime('%Y-%m-%dT%H:%M:%S')
-    if data.get('end'):
-        event['end']['dateTime'] = data.get('end').strftime('%Y-%m-%dT%H:%M:%S')
+    def set(self, url: str, content: str):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # written to a temporary file first, so other processes never read a partial document
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+            with os.fdopen(fd, 'w') as file:
+                file.write(content)
+            os.replace(tmp_path, self.get_path(url))
+        except OSError:
+            pass
 
-    event['description'] = data.get('description') or event.get('description')
-    event['attendees'] = data.get('attendees') or event.get('attendees')
-    event['summary'] = data.get('summary') or event.get('summary')
-    event['location'] = data.get('location') or event.get('location')
 
-    return SERVICE.events().update(calendarId=CALENDAR_ID, eventId=event_id, body=event).execute()
+class CalendarClient:
+    """
+    Lazily built Google Calendar client, nothing is loaded nor requested until the calendar is used.
 
+    Credentials and the calendar id are shared by all threads, while every thread gets
+    its own service object, as the underlying httplib2 connection isn't thread-safe.
+    """
 
-def create_google_calendar_event(title: str, location: str, description: str,
-                                 start_date: datetime.datetime, end_date: datetime.datetime,
-                                 organizer_email: str, attendees: List[str] = [], create_meet: bool = True) -> Dict:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._credentials = None
+        self._calendar_id = None
+
+    def load_credentials(self):
+        try:
+            with open(settings.GOOGLE_API_CREDENTIALS_PATH, 'rb') as file:
+                return pickle.load(file)
+        except (FileExistsError, FileNotFoundError):
+            raise ImproperlyConfigured(
+                f"Can't open '{settings.GOOGLE_API_CREDENTIALS_PATH}'. "
+                "Before using google API please generate your api token!"
+            )
+
+    @property
+    def credentials(self):
+        if self._credentials is None:
+            with self._lock:
+                if self._credentials is None:
+                    self._credentials = self.load_credentials()
+        return self._credentials
+
+    @property
+    def service(self):
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            service = build('calendar', 'v3', credentials=self.credentials, cache=FileDiscoveryCache())
+            self._local.service = service
+        return service
+
+    @property
+    def calendar_id(self) -> str:
+        if self._calendar_id is None:
+            with self._lock:
+                if self._calendar_id is None:
+                    self._calendar_id = settings.GOOGLE_CALENDAR_ID or \
+                        self.service.calendarList().list().execute()['items'][0]['id']
+        return self._calendar_id
+
+
+client = CalendarClient()
+
+
+def format_event_date(date: datetime.datetime) -> str:
+    """
+    Formats the date in settings.DEFAULT_TIMEZONE, which is sent as the event's timeZone.
+    """
+    if timezone.is_aware(date):
+        date = timezone.localtime(date, pytz.timezone(settings.DEFAULT_TIMEZONE))
+    return date.strftime('%Y-%m-%dT%H:%M:%S')
+
+
+def build_event_body(title: str, location: str, description: str,
+                     start_date: datetime.datetime, end_date: datetime.datetime,
+                     organizer_email: str, attendees: List[str] = [], create_meet: bool = True) -> Dict:
     event = {
         'summary': title,
         'location': location,
         'description': description,
         'start': {
-            'dateTime': start_date.strftime('%Y-%m-%dT%H:%M:%S'),
+            'dateTime': format_event_date(start_date),
             'timeZone': settings.DEFAULT_TIMEZONE,
         },
         'end': {
-            'dateTime': end_date.strftime('%Y-%m-%dT%H:%M:%S'),
+            'dateTime': format_event_date(end_date),
             'timeZone': settings.DEFAULT_TIMEZONE,
         },
         'attendees': [
@@ -59,14 +139,15 @@ def create_google_calendar_event(title: str, location: str, description: str,
             ],
         },
         'visibility': 'private',
-        "conferenceData": {
+    }
+    if create_meet:
+        event["conferenceData"] = {
             "createRequest": {
                 "conferenceSolutionKey": {
                     "type": "hangoutsMeet"
                 },
-                "requestId": CALENDAR_ID,
+                "requestId": str(uuid.uuid4()),
             }
         }
-    }
-    return SERVICE.events().insert(calendarId=CALENDAR_ID, body=event,
-                                   conferenceDataVersion=create_meet or None).execute()
+    return event
+
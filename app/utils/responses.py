@@ -0,0 +1,94 @@
+import mimetypes
+import re
+from typing import BinaryIO, Iterator, Optional, Tuple
+from urllib.parse import quote
+
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.http.response import HttpResponseBase
+from django.utils.http import quote_etag
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# number of bytes read at once from files of streamed responses
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Returns the first and the last byte of a single `bytes` range, None if the header isn't a single range.
+    Raises ValueError if the range can't be satisfied.
+    """
+    match = RANGE_RE.match(header.strip())
+    if match is None or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if not start:
+        # suffix range, the last `end` bytes
+        if not int(end) or not size:
+            raise ValueError(f'Range {header} of {size} bytes is not satisfiable')
+        return max(size - int(end), 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start > end:
+        raise ValueError(f'Range {header} of {size} bytes is not satisfiable')
+    return start, end
+
+
+def get_content_disposition(filename: str, as_attachment: bool) -> str:
+    disposition = 'attachment' if as_attachment else 'inline'
+    try:
+        filename.encode('ascii')
+        return f'{disposition}; filename="{filename}"'
+    except UnicodeEncodeError:
+        return f"{disposition}; filename*=utf-8''{quote(filename)}"
+
+
+def iter_file_range(file: BinaryIO, start: int, length: int) -> Iterator[bytes]:
+    try:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def ranged_file_response(request, file: BinaryIO, size: int, filename: str, etag: str = None,
+                         as_attachment: bool = False) -> HttpResponseBase:
+    """
+    Returns a streamed response of the file, or of the requested range of its bytes (206 Partial Content),
+    so downloads of large files can be paused and resumed and media players can seek.
+    """
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if header and (not if_range or (etag and if_range == quote_etag(etag))):
+        try:
+            byte_range = parse_range(header, size)
+        except ValueError:
+            file.close()
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        if byte_range is not None:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                iter_file_range(file, start, end - start + 1), status=206, content_type=content_type
+            )
+            response['Content-Length'] = end - start + 1
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Accept-Ranges'] = 'bytes'
+            if etag:
+                response['ETag'] = quote_etag(etag)
+            response['Content-Disposition'] = get_content_disposition(filename, as_attachment)
+            return response
+
+    response = FileResponse(file, as_attachment=as_attachment, filename=filename, content_type=content_type)
+    response.block_size = STREAM_CHUNK_SIZE
+    response['Accept-Ranges'] = 'bytes'
+    if etag:
+        response['ETag'] = quote_etag(etag)
+    return response
@@ -0,0 +1,26 @@
+import re
+import unicodedata
+from typing import List
+
+# letters which don't decompose into a base letter and a combining mark
+TRANSLITERATIONS = str.maketrans({'ł': 'l', 'ß': 'ss', 'æ': 'ae', 'ø': 'o', 'đ': 'd'})
+
+# maximal number of terms of a search query, further terms are ignored
+MAX_TERMS = 8
+
+
+def normalize(text: str) -> str:
+    """
+    Returns lowercase text without diacritics and punctuation, with single spaces between words,
+    so indexed documents and queries can be compared with plain `LIKE` patterns.
+    """
+    text = unicodedata.normalize('NFKD', (text or '').lower().translate(TRANSLITERATIONS))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(re.findall(r'\w+', text))
+
+
+def get_terms(text: str) -> List[str]:
+    """
+    Returns distinct normalized terms of the query, in order.
+    """
+    return list(dict.fromkeys(normalize(text).split()))[:MAX_TERMS]